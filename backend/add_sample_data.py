@@ -1,5 +1,7 @@
 from app import create_app, db
-from models import User, Patient, Doctor, Appointment
+from models import User, Patient, Doctor, Appointment, ArchivedAppointment
+from counters import rebuild_counters
+from rollups import rebuild_rollups
 from datetime import datetime, timedelta
 import random
 
@@ -9,6 +11,7 @@ def add_sample_data():
     with app.app_context():
         # Clear existing data to add Indian names
         Appointment.query.delete()
+        ArchivedAppointment.query.delete()
         Patient.query.delete()
         Doctor.query.delete()
         User.query.delete()
@@ -137,6 +140,9 @@ def add_sample_data():
             
             db.session.commit()
         
+        rebuild_counters()
+        rebuild_rollups()
+        
         print("Sample data added successfully!")
         print(f"Created {Patient.query.count()} patients")
         print(f"Created {Doctor.query.count()} doctors")
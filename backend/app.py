@@ -2,28 +2,53 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from config import Config
-from models import db
+from models import db, configure_sqlite
+from migrations import check_schema
+from cache import response_cache
+from json_provider import init_json
+from metrics import metrics
 
-def create_app():
+def create_app(schema_check=True, config=None):
     app = Flask(__name__)
     app.config.from_object(Config)
+    if config:
+        app.config.update(config)
+    init_json(app)
     
     db.init_app(app)
-    CORS(app)
+    response_cache.init_app(app)
+    metrics.init_app(app)
+    CORS(app, expose_headers=['X-Next-Cursor'])
     
     # Import and register blueprints
     from routes.auth import auth_bp
     from routes.patients import patients_bp
     from routes.doctors import doctors_bp
     from routes.appointments import appointments_bp
+    from routes.stats import stats_bp
+    from routes.imports import imports_bp
+    from routes.exports import exports_bp
+    from routes.search import search_bp
+    from routes.analytics import analytics_bp
+    from routes.metrics import metrics_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(patients_bp, url_prefix='/api/patients')
     app.register_blueprint(doctors_bp, url_prefix='/api/doctors')
     app.register_blueprint(appointments_bp, url_prefix='/api/appointments')
+    app.register_blueprint(stats_bp, url_prefix='/api/stats')
+    app.register_blueprint(imports_bp, url_prefix='/api/import')
+    app.register_blueprint(exports_bp, url_prefix='/api/export')
+    app.register_blueprint(search_bp, url_prefix='/api/search')
+    app.register_blueprint(analytics_bp, url_prefix='/api/analytics')
+    if metrics.enabled:
+        app.register_blueprint(metrics_bp, url_prefix='/api/metrics')
     
     with app.app_context():
-        db.create_all()
+        configure_sqlite(db.engine, app.config)
+        if schema_check:
+            check_schema()
+        metrics.instrument(db.engine)
     
     return app
 
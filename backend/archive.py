@@ -0,0 +1,67 @@
+from datetime import datetime, time, timedelta
+from flask import current_app
+from sqlalchemy import func, select
+from models import Appointment, ArchivedAppointment, db
+from rollups import refresh_rollups, _closed_until
+
+# Appointments in these statuses never change again, so they can leave the hot table
+ARCHIVED_STATUSES = ('completed', 'cancelled')
+
+ARCHIVED_COLUMNS = [column.key for column in Appointment.__table__.columns]
+
+
+# Date of the latest archived appointment, or NULL while the archive is empty (one index lookup)
+ARCHIVE_BOUNDARY = select(func.max(ArchivedAppointment.appointment_date))
+
+
+def archive_boundary():
+    return db.session.execute(ARCHIVE_BOUNDARY).scalar()
+
+
+def appointment_models(boundary, status=None, date_from=None):
+    """Tables a read filtered by ``status`` and ``from`` has to look at, given the archive boundary.
+
+    The hot table always; the archive only when the requested range reaches into it.
+    """
+    if boundary is None or (status and status not in ARCHIVED_STATUSES):
+        return (Appointment,)
+    if date_from is not None and date_from > boundary:
+        return (Appointment,)
+    return (Appointment, ArchivedAppointment)
+
+
+def archive_appointments(days=None, chunk_size=None):
+    """Move finished appointments older than ``days`` into the archive, one chunk per transaction.
+
+    Only days already folded into the analytics rollup are archived, so the
+    rollup never has to be recomputed from the hot table alone. Each chunk is
+    copied with INSERT ... SELECT and deleted by id in the same transaction,
+    so readers see every appointment in exactly one of the two tables.
+    """
+    days = current_app.config['ARCHIVE_AFTER_DAYS'] if days is None else days
+    chunk_size = chunk_size or current_app.config['ARCHIVE_CHUNK_SIZE']
+
+    refresh_rollups()
+    cutoff = datetime.combine(datetime.utcnow().date() - timedelta(days=days), time.min)
+    closed_until = _closed_until()
+    if closed_until is not None:
+        cutoff = min(cutoff, datetime.combine(closed_until, time.min))
+
+    summary = {'archived': 0, 'chunks': 0, 'cutoff': cutoff.isoformat()}
+    while True:
+        ids = [row.id for row in db.session.query(Appointment.id).filter(
+            Appointment.appointment_date < cutoff,
+            Appointment.status.in_(ARCHIVED_STATUSES)
+        ).order_by(Appointment.appointment_date).limit(chunk_size)]
+        if not ids:
+            break
+        db.session.execute(ArchivedAppointment.__table__.insert().from_select(
+            ARCHIVED_COLUMNS,
+            select(*[Appointment.__table__.c[name] for name in ARCHIVED_COLUMNS]).where(Appointment.id.in_(ids))
+        ))
+        Appointment.query.filter(Appointment.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        summary['archived'] += len(ids)
+        summary['chunks'] += 1
+
+    return summary
@@ -0,0 +1,22 @@
+import argparse
+import json
+from app import create_app
+from archive import archive_appointments
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Move completed and cancelled appointments older than a horizon into the archive table.'
+    )
+    parser.add_argument('--days', type=int, help='archive appointments older than this (default: ARCHIVE_AFTER_DAYS)')
+    parser.add_argument('--chunk-size', type=int, help='appointments per transaction (default: ARCHIVE_CHUNK_SIZE)')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        summary = archive_appointments(args.days, args.chunk_size)
+    print(json.dumps(summary))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+from asgiref.wsgi import WsgiToAsgi
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import RequestRedirect
+from werkzeug.test import EnvironBuilder
+from app import create_app
+from async_views import ASYNC_VIEWS
+from models import db, configure_sqlite
+from metrics import metrics
+
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'mysql': 'mysql+aiomysql',
+}
+
+
+def async_engine(app):
+    with app.app_context():
+        url = db.engine.url
+    if app.config['ASYNC_DATABASE_URL']:
+        url = app.config['ASYNC_DATABASE_URL']
+    else:
+        url = url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()])
+
+    options = {k: v for k, v in app.config['SQLALCHEMY_ENGINE_OPTIONS'].items()
+               if k not in ('poolclass', 'connect_args')}
+    if 'pool_size' in options:
+        options['poolclass'] = AsyncAdaptedQueuePool
+    engine = create_async_engine(url, **options)
+    configure_sqlite(engine.sync_engine, app.config)
+    metrics.instrument(engine.sync_engine)
+    return engine
+
+
+class AsyncApp:
+    """ASGI entry point serving the blueprints' endpoints.
+
+    GET endpoints listed in ASYNC_VIEWS run natively on the event loop with
+    an async SQLAlchemy session; everything else is handed to the regular
+    Flask app through asgiref's WSGI adapter. Either way the ASGI server
+    owns the socket, so slow clients hold a coroutine rather than a thread.
+    """
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi = WsgiToAsgi(flask_app)
+        self.engine = async_engine(flask_app)
+        self.sessions = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        self.urls = flask_app.url_map.bind('')
+
+    def resolve(self, scope):
+        if scope['type'] != 'http' or scope['method'] not in ('GET', 'HEAD'):
+            return None, None
+        try:
+            endpoint, values = self.urls.match(scope['path'], method='GET')
+        except (HTTPException, RequestRedirect):
+            return None, None
+        return ASYNC_VIEWS.get(endpoint), values
+
+    def handle_exception(self, e):
+        # As in Flask.full_dispatch_request: registered error handlers first, then the app's 500 handling
+        try:
+            return self.flask_app.handle_user_exception(e)
+        except Exception as unhandled:
+            return self.flask_app.handle_exception(unhandled)
+
+    async def __call__(self, scope, receive, send):
+        view, values = self.resolve(scope)
+        if view is None:
+            await self.wsgi(scope, receive, send)
+            return
+
+        environ = EnvironBuilder(
+            path=scope['path'],
+            method=scope['method'],
+            query_string=scope['query_string'].decode('latin-1'),
+            headers=[(k.decode('latin-1'), v.decode('latin-1')) for k, v in scope['headers']]
+        ).get_environ()
+        with self.flask_app.request_context(environ):
+            try:
+                response = self.flask_app.preprocess_request()
+                if response is None:
+                    async with self.sessions() as session:
+                        response = await view(session, **values)
+            except Exception as e:
+                response = self.handle_exception(e)
+            response = self.flask_app.process_response(self.flask_app.make_response(response))
+
+        body = response.get_data() if scope['method'] == 'GET' else b''
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in response.headers]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+
+app = AsyncApp(create_app())
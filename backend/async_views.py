@@ -0,0 +1,62 @@
+from models import Appointment, ArchivedAppointment, Patient
+from changes import changed_since
+from pagination import keyset_query, split_page, paginated_response
+from serializers import APPOINTMENT, PATIENT_APPOINTMENT, DOCTOR_APPOINTMENT, PATIENT_LIST
+from routes.appointments import appointment_page, reachable_models
+from archive import ARCHIVE_BOUNDARY
+from routes.patients import filter_patients
+from flask import abort, jsonify
+
+# Async counterparts of the read-heavy blueprint views, keyed by Flask endpoint.
+# They build the same statements and responses as the sync views and run
+# inside a pushed request context, so request.args, abort() and jsonify work.
+
+
+async def _page(session, statement, projection, columns):
+    statement, limit = keyset_query(statement, columns)
+    rows = (await session.execute(statement)).all()
+    rows, next_cursor = split_page(rows, columns, limit)
+    return paginated_response(projection.dump_all(rows), next_cursor)
+
+
+async def _appointment_page(session, projection, scope=None, since=False):
+    models = reachable_models((await session.execute(ARCHIVE_BOUNDARY)).scalar())
+    statement, page_key, limit = appointment_page(projection, scope, since, models)
+    rows = (await session.execute(statement)).all()
+    rows, next_cursor = split_page(rows, page_key, limit)
+    return paginated_response(projection.dump_all(rows), next_cursor)
+
+
+async def get_appointments(session):
+    return await _appointment_page(session, APPOINTMENT, since=True)
+
+
+async def get_appointment(session, appointment_id):
+    for model in (Appointment, ArchivedAppointment):
+        statement = APPOINTMENT.over(model).select().filter(model.id == appointment_id)
+        row = (await session.execute(statement)).first()
+        if row is not None:
+            return jsonify(APPOINTMENT.dump(row))
+    abort(404)
+
+
+async def get_patient_appointments(session, patient_id):
+    return await _appointment_page(session, PATIENT_APPOINTMENT, lambda model: model.patient_id == patient_id)
+
+
+async def get_doctor_appointments(session, doctor_id):
+    return await _appointment_page(session, DOCTOR_APPOINTMENT, lambda model: model.doctor_id == doctor_id)
+
+
+async def get_patients(session):
+    statement, page_key = changed_since(filter_patients(PATIENT_LIST.select()), Patient, (Patient.id,))
+    return await _page(session, statement, PATIENT_LIST, page_key)
+
+
+ASYNC_VIEWS = {
+    'appointments.get_appointments': get_appointments,
+    'appointments.get_appointment': get_appointment,
+    'appointments.get_patient_appointments': get_patient_appointments,
+    'appointments.get_doctor_appointments': get_doctor_appointments,
+    'patients.get_patients': get_patients,
+}
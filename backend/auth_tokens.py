@@ -0,0 +1,69 @@
+import time
+from functools import wraps
+from flask import current_app, g, jsonify, request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from cache import MemoryCacheBackend
+from pagination import error_response
+
+# Verified claims per token, so repeat requests skip the HMAC check as well as the database
+verified_tokens = MemoryCacheBackend(max_entries=10000)
+
+
+# Never sign with these: anyone could forge tokens for any user and role
+INSECURE_SECRET_KEYS = (None, '', 'your-secret-key-here')
+
+
+def signing_key():
+    """The configured SECRET_KEY; aborts with 503 if it is unset or a placeholder."""
+    secret_key = current_app.config['SECRET_KEY']
+    if secret_key in INSECURE_SECRET_KEYS:
+        current_app.logger.error('SECRET_KEY is unset or a placeholder; refusing to issue or verify tokens')
+        error_response('Authentication is unavailable: the server has no SECRET_KEY configured', 503)
+    return secret_key
+
+
+def _serializer():
+    return URLSafeTimedSerializer(signing_key(), salt='auth-token')
+
+
+def issue_token(user):
+    return _serializer().dumps({'user_id': user.id, 'username': user.username, 'role': user.role})
+
+
+def verify_token(token):
+    """Return the claims of a valid token, or None if it is forged or expired."""
+    serializer = _serializer()
+    claims = verified_tokens.get(token)
+    if claims is not None:
+        return claims
+
+    max_age = current_app.config['AUTH_TOKEN_MAX_AGE']
+    try:
+        claims, issued = serializer.loads(token, max_age=max_age, return_timestamp=True)
+    except BadSignature:
+        return None
+
+    remaining = issued.timestamp() + max_age - time.time()
+    if remaining > 0:
+        verified_tokens.set(token, claims, remaining)
+    return claims
+
+
+def token_required(*roles):
+    """Require a valid ``Authorization: Bearer`` token, optionally with one of ``roles``."""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            header = request.headers.get('Authorization', '')
+            if not header.startswith('Bearer '):
+                return jsonify({'error': 'Authentication required'}), 401
+            claims = verify_token(header[len('Bearer '):])
+            if claims is None:
+                return jsonify({'error': 'Invalid or expired token'}), 401
+            if roles and claims['role'] not in roles:
+                return jsonify({'error': 'Insufficient permissions'}), 403
+            g.current_user = claims
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,98 @@
+from bisect import bisect_right, insort
+from datetime import timedelta
+from flask import current_app
+from sqlalchemy import or_, text
+from models import Appointment, Doctor, db
+
+
+def slot_length():
+    return timedelta(minutes=current_app.config['APPOINTMENT_DURATION_MINUTES'])
+
+
+def occupies_slot(status):
+    return status != 'cancelled'
+
+
+def lock_schedules(doctor_ids=()):
+    """Serialize bookings until the session commits or rolls back.
+
+    SQLite has no row locks, so the database write lock is taken up front with
+    BEGIN IMMEDIATE; other databases lock the doctors' rows. Conflict checks
+    made after this see every committed booking and no other writer can add
+    one before this transaction ends.
+    """
+    if db.engine.dialect.name == 'sqlite':
+        # pysqlite only opens a transaction before the first write
+        if not db.session.connection().connection.in_transaction:
+            db.session.execute(text('BEGIN IMMEDIATE'))
+        return
+    ids = sorted(set(doctor_ids))
+    if ids:
+        db.session.query(Doctor.id).filter(Doctor.id.in_(ids)).order_by(Doctor.id).with_for_update().all()
+
+
+def bookings(doctor_id, start, end):
+    """``(start, id)`` of the doctor's bookings overlapping ``[start, end)``, read from the doctor/date index.
+
+    Every booking lasts one slot, so a booking at s overlaps exactly when
+    start - length < s < end. Read on every call, so bookings made by other
+    processes are always seen.
+    """
+    return db.session.query(Appointment.appointment_date, Appointment.id).filter(
+        Appointment.doctor_id == doctor_id,
+        Appointment.appointment_date > start - slot_length(),
+        Appointment.appointment_date < end,
+        or_(Appointment.status.is_(None), Appointment.status != 'cancelled')
+    ).order_by(Appointment.appointment_date, Appointment.id)
+
+
+def find_conflict(doctor_id, start, exclude_id=None, ignore=()):
+    """Id of a stored booking overlapping one at ``start``.
+
+    ``ignore`` holds ids whose slots are being released in the same
+    transaction. Call under ``lock_schedules`` so the answer stays true until commit.
+    """
+    for _, appointment_id in bookings(doctor_id, start, start + slot_length()):
+        if appointment_id != exclude_id and appointment_id not in ignore:
+            return appointment_id
+    return None
+
+
+def free_slots(doctor_id, start, end, duration):
+    schedule = DoctorSchedule(bookings(doctor_id, start, end).all())
+    return schedule.free_slots(start, end, duration, slot_length(), current_app.config['PAGE_SIZE_MAX'])
+
+
+class DoctorSchedule:
+    """Start times of one doctor's bookings in a window, kept sorted for bisection."""
+
+    def __init__(self, entries):
+        self.entries = sorted(entries)
+
+    def overlapping(self, start, length, exclude_id=None, ignore=()):
+        # Every booking lasts `length`, so a booking at s overlaps [start, start + length)
+        # exactly when start - length < s < start + length
+        i = bisect_right(self.entries, (start - length, float('inf')))
+        while i < len(self.entries) and self.entries[i][0] < start + length:
+            if self.entries[i][1] != exclude_id and self.entries[i][1] not in ignore:
+                return self.entries[i][1]
+            i += 1
+        return None
+
+    def add(self, start, appointment_id):
+        insort(self.entries, (start, appointment_id))
+
+    def free_slots(self, start, end, duration, length, max_slots):
+        slots = []
+        i = bisect_right(self.entries, (start - length, float('inf')))
+        t = start
+        while t + duration <= end and len(slots) < max_slots:
+            # Skip bookings that finish before this candidate slot begins
+            while i < len(self.entries) and self.entries[i][0] + length <= t:
+                i += 1
+            if i < len(self.entries) and self.entries[i][0] < t + duration:
+                t = self.entries[i][0] + length
+                continue
+            slots.append((t, t + duration))
+            t += duration
+        return slots
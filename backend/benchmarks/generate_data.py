@@ -0,0 +1,179 @@
+"""Seeded synthetic data generator for performance work.
+
+Run from the backend directory against the database named by DATABASE_URL:
+
+    DATABASE_URL=sqlite:////tmp/bench.db python -m benchmarks.generate_data \
+        --patients 1000000 --doctors 2000 --appointments 5000000
+
+Dates are laid out around ``--anchor`` rather than today, so one seed gives
+the same rows whenever it is run.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from werkzeug.security import generate_password_hash
+from app import create_app
+from models import User, Patient, Doctor, Appointment, db
+from counters import rebuild_counters
+from rollups import rebuild_rollups
+
+FIRST_NAMES = [
+    'Aarav', 'Aditi', 'Amit', 'Ananya', 'Anjali', 'Arjun', 'Ashok', 'Deepa', 'Divya', 'Farhan',
+    'Gaurav', 'Ishaan', 'Kavya', 'Kiran', 'Meera', 'Neha', 'Nikhil', 'Pooja', 'Priya', 'Rahul',
+    'Rajesh', 'Ritu', 'Rohan', 'Sanjay', 'Shreya', 'Sneha', 'Suresh', 'Tanvi', 'Varun', 'Vikram'
+]
+LAST_NAMES = [
+    'Agarwal', 'Bose', 'Chopra', 'Das', 'Desai', 'Gupta', 'Iyer', 'Jain', 'Joshi', 'Kapoor',
+    'Khan', 'Kumar', 'Menon', 'Mishra', 'Nair', 'Patel', 'Pillai', 'Rao', 'Reddy', 'Shah',
+    'Sharma', 'Singh', 'Verma', 'Yadav'
+]
+SPECIALIZATIONS = [
+    'Cardiology', 'Dermatology', 'ENT', 'General Medicine', 'Gynecology', 'Neurology',
+    'Oncology', 'Ophthalmology', 'Orthopedics', 'Pediatrics', 'Psychiatry', 'Radiology'
+]
+# Fixed "today" of the generated data; load_test.py draws its date windows from the same day
+DEFAULT_ANCHOR = '2026-01-05'
+
+REASONS = [
+    'Regular health checkup', 'Chest pain consultation', 'Headache and migraine',
+    'Fever and body pain', 'Back pain treatment', 'Diabetes follow-up visit',
+    'Blood pressure check', 'Skin allergy treatment', 'Joint pain consultation'
+]
+
+
+def anchor_date(value):
+    """``--anchor`` argument type: a YYYY-MM-DD day, as a datetime at midnight."""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' is not a YYYY-MM-DD date")
+
+
+def phone(rng):
+    return f'+91-{rng.randint(7000000000, 9999999999)}'
+
+
+def next_id(model):
+    return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+
+def insert_chunked(model, rows, chunk_size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            db.session.execute(model.__table__.insert(), chunk)
+            db.session.commit()
+            chunk = []
+    if chunk:
+        db.session.execute(model.__table__.insert(), chunk)
+        db.session.commit()
+
+
+def generate(patients, doctors, appointments, seed, chunk_size, anchor):
+    rng = random.Random(seed)
+    password_hash = generate_password_hash('benchmark')
+    now = anchor
+
+    # Explicit primary keys let related rows be generated without reading ids back
+    first_user = next_id(User)
+    first_patient = next_id(Patient)
+    first_doctor = next_id(Doctor)
+
+    def users():
+        for i in range(patients + doctors):
+            role = 'patient' if i < patients else 'doctor'
+            yield {
+                'id': first_user + i,
+                'username': f'bench_{role}_{first_user + i}',
+                'email': f'bench{first_user + i}@example.com',
+                'password_hash': password_hash,
+                'role': role
+            }
+
+    def patient_rows():
+        for i in range(patients):
+            yield {
+                'id': first_patient + i,
+                'user_id': first_user + i,
+                'first_name': rng.choice(FIRST_NAMES),
+                'last_name': rng.choice(LAST_NAMES),
+                'date_of_birth': (now - timedelta(days=rng.randint(365, 90 * 365))).date(),
+                'gender': rng.choice(('Male', 'Female')),
+                'phone': phone(rng),
+                'address': f'{rng.randint(1, 999)}, MG Road, Bangalore - 5600{rng.randint(10, 99)}',
+                'emergency_contact': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}: {phone(rng)}'
+            }
+
+    def doctor_rows():
+        for i in range(doctors):
+            yield {
+                'id': first_doctor + i,
+                'user_id': first_user + patients + i,
+                'first_name': rng.choice(FIRST_NAMES),
+                'last_name': rng.choice(LAST_NAMES),
+                'specialization': rng.choice(SPECIALIZATIONS),
+                'license_number': f'BENCH-{first_doctor + i}',
+                'phone': phone(rng),
+                'email': f'doctor{first_doctor + i}@hospital.example.com'
+            }
+
+    def appointment_rows():
+        # Two years of history and three months ahead, on half-hour slots in clinic hours
+        for _ in range(appointments):
+            day = now + timedelta(days=rng.randint(-730, 90))
+            start = day.replace(hour=rng.randint(9, 17), minute=rng.choice((0, 30)))
+            if start > now:
+                status = 'scheduled'
+            else:
+                status = rng.choices(('completed', 'cancelled', 'scheduled'), (85, 10, 5))[0]
+            yield {
+                'patient_id': first_patient + rng.randrange(patients),
+                'doctor_id': first_doctor + rng.randrange(doctors),
+                'appointment_date': start,
+                'reason': rng.choice(REASONS),
+                'status': status,
+                'notes': f'Generated appointment, seed {seed}'
+            }
+
+    for label, model, rows in (
+        ('users', User, users()),
+        ('patients', Patient, patient_rows()),
+        ('doctors', Doctor, doctor_rows()),
+        ('appointments', Appointment, appointment_rows() if patients and doctors else ()),
+    ):
+        started = time.perf_counter()
+        insert_chunked(model, rows, chunk_size)
+        print(f'{label:<13} {time.perf_counter() - started:8.1f}s')
+
+    if db.engine.dialect.name == 'postgresql':
+        for model in (User, Patient, Doctor):
+            table = model.__tablename__
+            db.session.execute(db.text(
+                f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), (SELECT max(id) FROM \"{table}\"))"
+            ))
+        db.session.commit()
+    rebuild_counters()
+    rebuild_rollups()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate reproducible synthetic patients, doctors and appointments.')
+    parser.add_argument('--patients', type=int, default=10000)
+    parser.add_argument('--doctors', type=int, default=100)
+    parser.add_argument('--appointments', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--anchor', type=anchor_date, default=DEFAULT_ANCHOR,
+                        help=f'day the generated history ends and the future begins (default {DEFAULT_ANCHOR})')
+    parser.add_argument('--chunk-size', type=int, default=10000, help='rows per executemany INSERT')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        generate(args.patients, args.doctors, args.appointments, args.seed, args.chunk_size, args.anchor)
+
+
+if __name__ == '__main__':
+    main()
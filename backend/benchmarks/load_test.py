@@ -0,0 +1,226 @@
+"""Local load driver for the /api endpoints.
+
+Starts the app on a local port, measures each endpoint in turn and writes the
+results as JSON so runs can be compared:
+
+    DATABASE_URL=sqlite:////tmp/bench.db python -m benchmarks.load_test \
+        --duration 10 --concurrency 8 --output results.json --compare baseline.json
+"""
+import argparse
+import http.client
+import json
+import logging
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import event, func
+from werkzeug.serving import make_server
+from app import create_app
+from models import Patient, Doctor, Appointment, db
+from benchmarks.generate_data import DEFAULT_ANCHOR, anchor_date
+
+ENDPOINTS = [
+    ('appointments_list', '/api/appointments/?limit=50'),
+    ('appointments_filtered', '/api/appointments/?status=scheduled&from={from}&to={to}&limit=50'),
+    ('appointment_detail', '/api/appointments/{appointment_id}'),
+    ('patient_appointments', '/api/appointments/patient/{patient_id}?limit=50'),
+    ('doctor_appointments', '/api/appointments/doctor/{doctor_id}?limit=50'),
+    ('patients_list', '/api/patients/?limit=50'),
+    ('patient_detail', '/api/patients/{patient_id}'),
+    ('doctors_list', '/api/doctors/?limit=50'),
+    ('doctor_detail', '/api/doctors/{doctor_id}'),
+    ('doctor_free_slots', '/api/doctors/{doctor_id}/free-slots?from={from}&to={to}'),
+    ('dashboard_stats', '/api/stats/dashboard'),
+    ('search', '/api/search/?q={search}&limit=10'),
+]
+
+SEARCH_TERMS = ['sha', 'pri', 'kum', 'card', 'neu', 'rah', 'pat', 'ort']
+
+
+def sample_ids(model, count, rng):
+    # Seeded picks from the id range, kept only where the row exists, so runs hit the same rows
+    low, high = db.session.query(func.min(model.id), func.max(model.id)).one()
+    if low is None:
+        return [1]
+    candidates = {rng.randint(low, high) for _ in range(count)}
+    ids = sorted(id_ for (id_,) in db.session.query(model.id).filter(model.id.in_(candidates)))
+    return ids or [low]
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self)
+
+    def __call__(self, *args):
+        self.count += 1
+
+
+class Target:
+    def __init__(self, app, seed, anchor):
+        self.rng = random.Random(seed)
+        self.anchor = anchor
+        with app.app_context():
+            self.patient_ids = sample_ids(Patient, 1000, self.rng)
+            self.doctor_ids = sample_ids(Doctor, 1000, self.rng)
+            self.appointment_ids = sample_ids(Appointment, 1000, self.rng)
+        self.lock = threading.Lock()
+
+    def url(self, template):
+        with self.lock:
+            day = self.anchor.replace(hour=9) + timedelta(days=self.rng.randint(-30, 30))
+            return template.format(
+                patient_id=self.rng.choice(self.patient_ids),
+                doctor_id=self.rng.choice(self.doctor_ids),
+                appointment_id=self.rng.choice(self.appointment_ids),
+                search=self.rng.choice(SEARCH_TERMS),
+                **{'from': day.isoformat(), 'to': (day + timedelta(hours=9)).isoformat()}
+            )
+
+
+def get(port, url):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        conn.request('GET', url)
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    finally:
+        conn.close()
+
+
+def measure(port, target, template, duration, concurrency):
+    latencies, errors = [], []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        while time.perf_counter() < deadline:
+            url = target.url(template)
+            started = time.perf_counter()
+            status = get(port, url)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                if status >= 400 and status != 404:
+                    errors.append(status)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'throughput_rps': round(len(latencies) / wall, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2) if latencies else None,
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path) as f:
+        baseline = json.load(f)['endpoints']
+    regressions = 0
+    print(f"\n{'endpoint':<24}{'p95 before':>12}{'p95 after':>12}{'change':>9}")
+    for name, result in results.items():
+        before = baseline.get(name, {}).get('p95_ms')
+        after = result['p95_ms']
+        if not before or after is None:
+            continue
+        change = (after - before) / before
+        flag = '  REGRESSION' if change > threshold else ''
+        regressions += bool(flag)
+        print(f'{name:<24}{before:>12.2f}{after:>12.2f}{change:>+9.0%}{flag}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure latency, throughput and SQL count per /api endpoint.')
+    parser.add_argument('--duration', type=float, default=5, help='seconds per endpoint')
+    parser.add_argument('--concurrency', type=int, default=4, help='concurrent client threads')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--anchor', type=anchor_date, default=DEFAULT_ANCHOR,
+                        help='--anchor the data was generated with; date windows are drawn around it')
+    parser.add_argument('--only', action='append', help='endpoint name to run (repeatable)')
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--compare', help='baseline JSON file to compare p95 latency against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='p95 slowdown reported as a regression (default 0.2 = 20%%)')
+    args = parser.parse_args()
+
+    app = create_app()
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+
+    target = Target(app, args.seed, args.anchor)
+    with app.app_context():
+        counter = QueryCounter(db.engine)
+        row_counts = {
+            'patients': db.session.query(func.count(Patient.id)).scalar(),
+            'doctors': db.session.query(func.count(Doctor.id)).scalar(),
+            'appointments': db.session.query(func.count(Appointment.id)).scalar(),
+        }
+
+    results = {}
+    print(f"{'endpoint':<24}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}{'errors':>8}")
+    for name, template in ENDPOINTS:
+        if args.only and name not in args.only:
+            continue
+        # One warm-up request on its own gives an exact per-request statement count
+        counter.count = 0
+        get(port, target.url(template))
+        queries = counter.count
+
+        result = measure(port, target, template, args.duration, args.concurrency)
+        result['queries_per_request'] = queries
+        results[name] = result
+        print(f"{name:<24}{result['throughput_rps']:>9}{result['p50_ms']:>9}{result['p95_ms']:>9}"
+              f"{result['p99_ms']:>9}{queries:>9}{result['errors']:>8}")
+
+    server.shutdown()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+                'git_revision': git_revision(),
+                'database': app.config['SQLALCHEMY_DATABASE_URI'],
+                'row_counts': row_counts,
+                'settings': {'duration': args.duration, 'concurrency': args.concurrency, 'seed': args.seed,
+                             'anchor': args.anchor.date().isoformat()},
+                'endpoints': results
+            }, f, indent=2)
+        print(f'\nResults written to {args.output}')
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
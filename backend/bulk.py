@@ -0,0 +1,252 @@
+from collections import Counter, defaultdict
+from datetime import datetime
+from flask import current_app
+from models import Appointment, ArchivedAppointment, db
+from counters import adjust, PENDING_APPOINTMENTS
+from rollups import adjust_rollups, rollup_key
+from changes import record_deletions
+from availability import occupies_slot, slot_length, lock_schedules, find_conflict, DoctorSchedule
+from importer import APPOINTMENT_STATUSES
+
+UPDATABLE_FIELDS = ('appointment_date', 'status', 'reason', 'notes')
+
+# Ids per IN list, well below the bound parameter limit of every supported database
+ID_CHUNK_SIZE = 500
+
+CURRENT_COLUMNS = (
+    Appointment.id, Appointment.patient_id, Appointment.doctor_id, Appointment.appointment_date,
+    Appointment.reason, Appointment.status, Appointment.notes, Appointment.updated_at
+)
+
+
+def chunked(values, size=ID_CHUNK_SIZE):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _id(value):
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError("'id' must be an integer")
+    return value
+
+
+def _datetime(value, name, fmt=None):
+    try:
+        return datetime.strptime(value, fmt) if fmt else datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid '{name}' datetime")
+
+
+def parse_changes(data, fields=UPDATABLE_FIELDS):
+    """Validate ``{field: new value}``; dates use the same format as PUT /api/appointments/<id>."""
+    if not isinstance(data, dict):
+        raise ValueError('Changes must be an object')
+    unknown = sorted(set(data) - set(fields))
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    if not data:
+        raise ValueError('No fields to change')
+    changes = dict(data)
+    if 'appointment_date' in changes:
+        changes['appointment_date'] = _datetime(changes['appointment_date'], 'appointment_date', '%Y-%m-%d %H:%M')
+    if 'status' in changes and changes['status'] not in APPOINTMENT_STATUSES:
+        raise ValueError(f"'status' must be one of {', '.join(APPOINTMENT_STATUSES)}")
+    for field in ('reason', 'notes'):
+        if changes.get(field) is not None and not isinstance(changes[field], str):
+            raise ValueError(f"'{field}' must be a string")
+    return changes
+
+
+def filter_query(criteria):
+    """Hot appointments matching a ``{doctor_id, patient_id, status, from, to}`` filter; ``from`` and ``to`` are required."""
+    if not isinstance(criteria, dict):
+        raise ValueError("'filter' must be an object")
+    unknown = sorted(set(criteria) - {'doctor_id', 'patient_id', 'status', 'from', 'to'})
+    if unknown:
+        raise ValueError(f"Unknown filter(s): {', '.join(unknown)}")
+    if 'from' not in criteria or 'to' not in criteria:
+        raise ValueError("'filter' needs 'from' and 'to'")
+    query = db.session.query(Appointment.id).filter(
+        Appointment.appointment_date >= _datetime(criteria['from'], 'from'),
+        Appointment.appointment_date < _datetime(criteria['to'], 'to')
+    )
+    for name in ('doctor_id', 'patient_id'):
+        if criteria.get(name) is not None:
+            query = query.filter(getattr(Appointment, name) == _id(criteria[name]))
+    if criteria.get('status'):
+        query = query.filter(Appointment.status == criteria['status'])
+    return query.order_by(Appointment.appointment_date, Appointment.id)
+
+
+class BulkMutation:
+    """Apply many appointment updates and deletes as set-based statements in one transaction.
+
+    Every item is checked before anything is written. Items that fail (unknown
+    or archived id, invalid value, slot conflict) are reported and the rest are
+    applied together: one UPDATE per distinct set of new values and one DELETE
+    per chunk of ids, with counters, rollups and tombstones adjusted in the
+    same transaction. With ``atomic`` a single failure cancels the whole batch.
+    """
+
+    def __init__(self, atomic=False):
+        self.atomic = atomic
+        self.results = []
+        self.updated = 0
+        self.deleted = 0
+        self.failed = 0
+        self.applied = False
+
+    def run(self, updates=(), deletes=()):
+        planned = []
+        for item in updates:
+            item_id = item.get('id') if isinstance(item, dict) else None
+            try:
+                if not isinstance(item, dict):
+                    raise ValueError('Item is not a valid object')
+                planned.append(self._plan('update', _id(item_id), parse_changes(
+                    {field: value for field, value in item.items() if field != 'id'}
+                )))
+            except ValueError as e:
+                planned.append(self._fail('update', item_id, str(e)))
+        for item_id in deletes:
+            try:
+                planned.append(self._plan('delete', _id(item_id)))
+            except ValueError as e:
+                planned.append(self._fail('delete', item_id, str(e)))
+        return self._apply(planned)
+
+    def run_filter(self, criteria, changes=None, delete=False):
+        if delete == bool(changes):
+            raise ValueError("Give either 'set' or 'delete'")
+        changes = None if delete else parse_changes(changes)
+        maximum = current_app.config['PAGE_SIZE_MAX']
+        # Matched under the write lock, so no row can start or stop matching before the batch is written
+        lock_schedules()
+        ids = [row.id for row in filter_query(criteria).limit(maximum + 1)]
+        if len(ids) > maximum:
+            db.session.rollback()
+            raise ValueError(f'The filter matches more than {maximum} appointments; narrow it down')
+        return self._apply([self._plan('delete' if delete else 'update', id_, changes) for id_ in ids])
+
+    def summary(self):
+        return {
+            'applied': self.applied,
+            'updated': self.updated,
+            'deleted': self.deleted,
+            'failed': self.failed,
+            'results': self.results
+        }
+
+    def _plan(self, action, item_id, changes=None):
+        result = {'id': item_id, 'action': action, 'result': None}
+        self.results.append(result)
+        return result, changes
+
+    def _fail(self, action, item_id, error, **extra):
+        result, _ = self._plan(action, item_id)
+        self._reject(result, error, **extra)
+        return result, None
+
+    def _reject(self, result, error, **extra):
+        result.update(result='failed', error=error, **extra)
+        self.failed += 1
+
+    def _apply(self, planned):
+        pending = [(result, changes) for result, changes in planned if result['result'] is None]
+        seen = set()
+        for result, _ in pending:
+            if result['id'] in seen:
+                self._reject(result, 'Duplicate id')
+            seen.add(result['id'])
+        pending = [(result, changes) for result, changes in pending if result['result'] is None]
+
+        ids = [result['id'] for result, _ in pending]
+        current = {}
+        # On SQLite the write lock is taken before the rows are read
+        lock_schedules()
+        for chunk in chunked(ids):
+            # Locked on servers so concurrent writes cannot skew the counter and rollup deltas
+            for row in db.session.query(*CURRENT_COLUMNS).filter(Appointment.id.in_(chunk)).with_for_update():
+                current[row.id] = row
+        lock_schedules({row.doctor_id for row in current.values()})
+        missing = [id_ for id_ in ids if id_ not in current]
+        archived = set()
+        for chunk in chunked(missing):
+            archived.update(id_ for (id_,) in db.session.query(ArchivedAppointment.id).filter(
+                ArchivedAppointment.id.in_(chunk)
+            ))
+
+        # Slots released by this batch may be taken by other items in it
+        released = {
+            result['id'] for result, changes in pending
+            if result['id'] in current and (changes is None or not occupies_slot(changes.get('status', current[result['id']].status)))
+        }
+        placed = defaultdict(lambda: DoctorSchedule([]))
+        accepted = []
+        for result, changes in pending:
+            row = current.get(result['id'])
+            if row is None:
+                self._reject(result, 'Archived appointments are read-only' if result['id'] in archived
+                             else 'Appointment not found')
+                continue
+            if changes is not None:
+                new_date = changes.get('appointment_date', row.appointment_date)
+                new_status = changes.get('status', row.status)
+                moves_in = new_date != row.appointment_date or not occupies_slot(row.status)
+                if occupies_slot(new_status) and moves_in:
+                    conflict = find_conflict(row.doctor_id, new_date, row.id, released) \
+                        or placed[row.doctor_id].overlapping(new_date, slot_length())
+                    if conflict:
+                        self._reject(result, 'Doctor already has an appointment at this time',
+                                     conflicting_appointment_id=conflict)
+                        continue
+                    placed[row.doctor_id].add(new_date, row.id)
+            accepted.append((result, changes, row))
+
+        if self.atomic and self.failed:
+            for result, _, _ in accepted:
+                result['result'] = 'skipped'
+        elif accepted:
+            self._write(accepted)
+        # Releases the write lock when nothing was written
+        db.session.rollback()
+        return self.summary()
+
+    def _write(self, accepted):
+        now = datetime.utcnow()
+        groups = defaultdict(list)
+        deletes = []
+        pending_delta = 0
+        rollups = Counter()
+        for result, changes, row in accepted:
+            rollups[rollup_key(row.appointment_date, row.doctor_id, row.status)] -= 1
+            pending_delta -= row.status == 'scheduled'
+            if changes is None:
+                deletes.append(row.id)
+                continue
+            # Items with the same new values share one UPDATE ... WHERE id IN (...)
+            groups[tuple(sorted(changes.items()))].append(row.id)
+            new_status = changes.get('status', row.status)
+            rollups[rollup_key(changes.get('appointment_date', row.appointment_date), row.doctor_id, new_status)] += 1
+            pending_delta += new_status == 'scheduled'
+
+        for values, ids in groups.items():
+            for chunk in chunked(ids):
+                Appointment.query.filter(Appointment.id.in_(chunk)).update(
+                    {**dict(values), 'updated_at': now}, synchronize_session=False
+                )
+        for chunk in chunked(deletes):
+            Appointment.query.filter(Appointment.id.in_(chunk)).delete(synchronize_session=False)
+        record_deletions('appointment', deletes)
+        adjust(PENDING_APPOINTMENTS, pending_delta)
+        adjust_rollups(rollups)
+        db.session.commit()
+        self.applied = True
+
+        for result, changes, row in accepted:
+            if changes is None:
+                result['result'] = 'deleted'
+                self.deleted += 1
+            else:
+                result['result'] = 'updated'
+                self.updated += 1
@@ -0,0 +1,160 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, request
+
+
+class MemoryCacheBackend:
+    """LRU cache with per-entry expiry, local to one worker process."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCacheBackend:
+    """LRU cache with expiry stored in a local SQLite file, shared by every worker on the host."""
+
+    def __init__(self, path, max_entries):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL, accessed REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_cache_accessed ON cache (accessed)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def get(self, key):
+        conn = self._connect()
+        row = conn.execute('SELECT value, expires FROM cache WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] < time.time():
+            conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+            return None
+        conn.execute('UPDATE cache SET accessed = ? WHERE key = ?', (time.time(), key))
+        return pickle.loads(row[0])
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            'INSERT OR REPLACE INTO cache (key, value, expires, accessed) VALUES (?, ?, ?, ?)',
+            (key, pickle.dumps(value), now + ttl, now)
+        )
+        conn.execute(
+            'DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)',
+            (self.max_entries,)
+        )
+
+    def clear(self):
+        self._connect().execute('DELETE FROM cache')
+
+
+class ResponseCache:
+    """Caches GET responses under namespaces that write handlers invalidate.
+
+    Each namespace has a generation token stored in the backend; cache keys
+    embed it, so invalidating a namespace is a single write that orphans
+    every cached variant (query strings, pages) at once.
+    """
+
+    def __init__(self):
+        self.backend = None
+        self.ttl = 0
+
+    def init_app(self, app):
+        config = app.config
+        self.ttl = config['CACHE_TTL_SECONDS']
+        if config['CACHE_BACKEND'] == 'sqlite':
+            path = config['CACHE_PATH'] or os.path.join(app.instance_path, 'response_cache.db')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.backend = SQLiteCacheBackend(path, config['CACHE_MAX_ENTRIES'])
+        elif config['CACHE_BACKEND'] == 'memory':
+            self.backend = MemoryCacheBackend(config['CACHE_MAX_ENTRIES'])
+        else:
+            self.backend = None
+
+    def _generation(self, namespace):
+        key = f'generation:{namespace}'
+        generation = self.backend.get(key)
+        if generation is None:
+            generation = uuid.uuid4().hex
+            self.backend.set(key, generation, self.ttl)
+        return generation
+
+    def invalidate(self, *namespaces):
+        if self.backend is None:
+            return
+        for namespace in namespaces:
+            self.backend.set(f'generation:{namespace}', uuid.uuid4().hex, self.ttl)
+
+    def cached(self, namespace):
+        """Cache a GET view under ``namespace`` (a string, or a callable taking the view kwargs)."""
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if self.backend is None:
+                    return view(*args, **kwargs)
+
+                name = namespace(**kwargs) if callable(namespace) else namespace
+                key = f'response:{name}:{self._generation(name)}:{request.full_path}'
+                entry = self.backend.get(key)
+                if entry is None:
+                    response = view(*args, **kwargs)
+                    if not isinstance(response, Response) or response.status_code != 200:
+                        return response
+                    body = response.get_data()
+                    entry = (body, response.status_code, list(response.headers),
+                             hashlib.sha1(body).hexdigest())
+                    self.backend.set(key, entry, self.ttl)
+
+                body, status, headers, etag = entry
+                response = Response(body, status, headers)
+                response.set_etag(etag)
+                return response.make_conditional(request)
+            return wrapper
+        return decorator
+
+
+response_cache = ResponseCache()
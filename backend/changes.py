@@ -0,0 +1,42 @@
+from models import Tombstone, db
+from pagination import keyset_paginate, paginated_response, parse_timestamp_arg
+from serializers import plain
+
+
+def changed_since(query, model, page_key):
+    """Apply ``?updated_since=`` to a list query.
+
+    Without it the query and ``page_key`` are returned unchanged. With it
+    only rows updated after the timestamp are kept and pages follow
+    ``(updated_at, id)``, so a client can replay every change in order.
+    """
+    since = parse_timestamp_arg('updated_since')
+    if since is None:
+        return query, page_key
+    return query.filter(model.updated_at > since), (model.updated_at, model.id)
+
+
+def record_deletion(entity, entity_id):
+    # Added to the caller's transaction, so the tombstone commits with the delete
+    db.session.add(Tombstone(entity=entity, entity_id=entity_id))
+
+
+def record_deletions(entity, entity_ids):
+    if entity_ids:
+        db.session.execute(Tombstone.__table__.insert(), [
+            {'entity': entity, 'entity_id': entity_id} for entity_id in entity_ids
+        ])
+
+
+def tombstones_response(entity):
+    """Ids of ``entity`` records deleted after ``?updated_since=``, oldest first, keyset paginated."""
+    query = db.session.query(Tombstone.id, Tombstone.entity_id, Tombstone.deleted_at).filter(
+        Tombstone.entity == entity
+    )
+    since = parse_timestamp_arg('updated_since')
+    if since is not None:
+        query = query.filter(Tombstone.deleted_at > since)
+    rows, next_cursor = keyset_paginate(query, (Tombstone.deleted_at, Tombstone.id))
+    return paginated_response([
+        {'id': row.entity_id, 'deleted_at': plain(row.deleted_at)} for row in rows
+    ], next_cursor)
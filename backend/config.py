@@ -1,6 +1,56 @@
 import os
+from sqlalchemy.pool import QueuePool
+
+def engine_options(uri):
+    # SQLite has no server to pool connections to; keep a small pool of file
+    # handles shared across threads and let the busy timeout absorb lock waits
+    if uri.startswith('sqlite'):
+        if ':memory:' in uri or uri in ('sqlite://', 'sqlite:///'):
+            return {}
+        return {
+            'poolclass': QueuePool,
+            'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+            'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+            'connect_args': {'check_same_thread': False}
+        }
+    return {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', '1') == '1'
+    }
+
 
 class Config:
-    SECRET_KEY = os.environ.get('SECRET_KEY') or 'your-secret-key-here'
+    SECRET_KEY = os.environ.get('SECRET_KEY')
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///database.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 20000))
+    PAGE_SIZE_DEFAULT = int(os.environ.get('PAGE_SIZE_DEFAULT', 50))
+    PAGE_SIZE_MAX = int(os.environ.get('PAGE_SIZE_MAX', 500))
+    APPOINTMENT_DURATION_MINUTES = int(os.environ.get('APPOINTMENT_DURATION_MINUTES', 30))
+    FREE_SLOTS_MAX_DAYS = int(os.environ.get('FREE_SLOTS_MAX_DAYS', 31))
+    IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', 1000))
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')  # 'memory', 'sqlite' or 'none'
+    CACHE_PATH = os.environ.get('CACHE_PATH')
+    CACHE_TTL_SECONDS = int(os.environ.get('CACHE_TTL_SECONDS', 300))
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 1024))
+    AUTH_TOKEN_MAX_AGE = int(os.environ.get('AUTH_TOKEN_MAX_AGE', 12 * 60 * 60))
+    FAST_JSON = os.environ.get('FAST_JSON', '1') == '1'
+    SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND', 'auto')  # 'auto', 'fts5' or 'like'
+    ASYNC_DATABASE_URL = os.environ.get('ASYNC_DATABASE_URL')
+    MIGRATE_ON_START = os.environ.get('MIGRATE_ON_START', '0') == '1'
+    MIGRATION_BATCH_SIZE = int(os.environ.get('MIGRATION_BATCH_SIZE', 10000))
+    MIGRATION_LOCK_TIMEOUT = float(os.environ.get('MIGRATION_LOCK_TIMEOUT', 60))
+    ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 365))
+    ARCHIVE_CHUNK_SIZE = int(os.environ.get('ARCHIVE_CHUNK_SIZE', 1000))
+    SSE_POLL_SECONDS = float(os.environ.get('SSE_POLL_SECONDS', 2))
+    SSE_HEARTBEAT_SECONDS = int(os.environ.get('SSE_HEARTBEAT_SECONDS', 15))
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '0') == '1'
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 100))
+    SLOW_QUERY_SAMPLES = int(os.environ.get('SLOW_QUERY_SAMPLES', 50))
@@ -0,0 +1,44 @@
+from sqlalchemy import func
+from models import StatCounter, Patient, Doctor, Appointment, db
+
+PATIENTS = 'patients'
+DOCTORS = 'doctors'
+PENDING_APPOINTMENTS = 'pending_appointments'
+COUNTER_NAMES = (PATIENTS, DOCTORS, PENDING_APPOINTMENTS)
+
+
+def _recount():
+    return {
+        PATIENTS: db.session.query(func.count(Patient.id)).scalar(),
+        DOCTORS: db.session.query(func.count(Doctor.id)).scalar(),
+        PENDING_APPOINTMENTS: db.session.query(func.count(Appointment.id))
+            .filter(Appointment.status == 'scheduled').scalar(),
+    }
+
+
+def rebuild_counters():
+    """Recompute every counter from the base tables (used on first boot and after bulk jobs)."""
+    for name, value in _recount().items():
+        db.session.merge(StatCounter(name=name, value=value))
+    db.session.commit()
+
+
+def ensure_counters():
+    if StatCounter.query.count() < len(COUNTER_NAMES):
+        rebuild_counters()
+
+
+def adjust(name, delta):
+    # Relative UPDATE inside the caller's transaction, so concurrent writers never lose increments
+    if delta:
+        StatCounter.query.filter_by(name=name).update(
+            {StatCounter.value: StatCounter.value + delta}, synchronize_session=False
+        )
+
+
+def adjust_pending(old_status, new_status):
+    adjust(PENDING_APPOINTMENTS, (new_status == 'scheduled') - (old_status == 'scheduled'))
+
+
+def read_counters():
+    return {c.name: c.value for c in StatCounter.query.all()}
@@ -0,0 +1,33 @@
+import argparse
+import getpass
+import sys
+from sqlalchemy.exc import IntegrityError
+from werkzeug.security import generate_password_hash
+from app import create_app
+from models import User, db
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Create an admin user. Admins cannot register through the API.')
+    parser.add_argument('username')
+    parser.add_argument('email')
+    args = parser.parse_args()
+
+    password = getpass.getpass('Password: ')
+    if not password or password != getpass.getpass('Repeat password: '):
+        sys.exit('passwords are empty or do not match')
+
+    app = create_app()
+    with app.app_context():
+        user = User(username=args.username, email=args.email,
+                    password_hash=generate_password_hash(password), role='admin')
+        db.session.add(user)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            sys.exit('username or email already exists')
+        print(f'created admin {args.username} (id {user.id})')
+
+
+if __name__ == '__main__':
+    main()
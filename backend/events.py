@@ -0,0 +1,109 @@
+import json
+import time
+from datetime import date, datetime
+from sqlalchemy import select, tuple_
+from models import Appointment, Tombstone, db
+from pagination import encode_cursor, decode_cursor
+
+# Columns sent with an appointment.changed event
+EVENT_COLUMNS = (
+    Appointment.id, Appointment.patient_id, Appointment.doctor_id, Appointment.appointment_date,
+    Appointment.reason, Appointment.status, Appointment.notes, Appointment.updated_at
+)
+# An event id holds the last (updated_at, id) change and (deleted_at, id) deletion sent
+POSITION_COLUMNS = (Appointment.updated_at, Appointment.id, Tombstone.deleted_at, Tombstone.id)
+START = (datetime.min, 0)
+
+
+def _json_default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def _frame(position, event, data):
+    return f'id: {encode_cursor(position)}\nevent: {event}\ndata: {json.dumps(data, default=_json_default)}\n\n'
+
+
+class AppointmentFeed:
+    """Server-sent appointment events tailed from the database.
+
+    Each stream polls the ``(updated_at, id)`` index of the appointment table
+    and the tombstone index, so it sees writes made by every worker process,
+    imports and bulk changes included. The event id is the position reached
+    in both; a client that reconnects with Last-Event-ID resumes from it.
+    """
+
+    def __init__(self, doctor_id=None, patient_id=None, batch_size=500):
+        self.doctor_id = doctor_id
+        self.patient_id = patient_id
+        self.batch_size = batch_size
+
+    def latest_position(self):
+        # Where a new stream starts: after the newest change and the newest deletion (two index lookups)
+        with db.engine.connect() as conn:
+            return self._latest_position(conn)
+
+    def _latest_position(self, conn):
+        changed = conn.execute(select(Appointment.updated_at, Appointment.id).order_by(
+            Appointment.updated_at.desc(), Appointment.id.desc()
+        ).limit(1)).first()
+        deleted = conn.execute(select(Tombstone.deleted_at, Tombstone.id).filter(
+            Tombstone.entity == 'appointment'
+        ).order_by(Tombstone.deleted_at.desc(), Tombstone.id.desc()).limit(1)).first()
+        return tuple(changed or START) + tuple(deleted or START)
+
+    def resume_position(self, last_event_id):
+        # Aborts with 400 if the id was not sent by this feed
+        return decode_cursor(last_event_id, POSITION_COLUMNS) if last_event_id else None
+
+    def matches(self, row):
+        return all(wanted is None or row[key] == wanted
+                   for key, wanted in (('doctor_id', self.doctor_id), ('patient_id', self.patient_id)))
+
+    def changes(self, conn, position):
+        """The position after the next ``batch_size`` changes and deletions, and their events as SSE frames.
+
+        Changes to other doctors' or patients' appointments are skipped in
+        Python but still move the position, so each poll only reads new rows.
+        """
+        changed_at, changed_id, deleted_at, deleted_id = position
+        frames = []
+        rows = conn.execute(select(*EVENT_COLUMNS).filter(
+            tuple_(Appointment.updated_at, Appointment.id) > (changed_at, changed_id)
+        ).order_by(Appointment.updated_at, Appointment.id).limit(self.batch_size)).all()
+        for row in rows:
+            changed_at, changed_id = row.updated_at, row.id
+            data = dict(row._mapping)
+            if self.matches(data):
+                frames.append(_frame((changed_at, changed_id, deleted_at, deleted_id), 'appointment.changed', data))
+
+        # Tombstones do not say whose appointment it was, so deletions go to every stream
+        tombstones = conn.execute(select(Tombstone.deleted_at, Tombstone.id, Tombstone.entity_id).filter(
+            Tombstone.entity == 'appointment',
+            tuple_(Tombstone.deleted_at, Tombstone.id) > (deleted_at, deleted_id)
+        ).order_by(Tombstone.deleted_at, Tombstone.id).limit(self.batch_size)).all()
+        for row in tombstones:
+            deleted_at, deleted_id = row.deleted_at, row.id
+            frames.append(_frame((changed_at, changed_id, deleted_at, deleted_id), 'appointment.deleted',
+                                 {'id': row.entity_id, 'deleted_at': row.deleted_at}))
+
+        more = len(rows) == self.batch_size or len(tombstones) == self.batch_size
+        return (changed_at, changed_id, deleted_at, deleted_id), frames, more
+
+    def stream(self, position, poll=2, heartbeat=15):
+        """Yield SSE frames until the client disconnects, checking for changes every ``poll`` seconds."""
+        yield 'retry: 3000\n\n'
+        idle = 0
+        while True:
+            # A short-lived connection per check, so no read transaction stays open between polls
+            with db.engine.connect() as conn:
+                position, frames, more = self.changes(conn, position)
+            yield from frames
+            if more:
+                continue
+            idle = 0 if frames else idle + poll
+            if idle >= heartbeat:
+                yield ': keepalive\n\n'
+                idle = 0
+            time.sleep(poll)
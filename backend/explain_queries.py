@@ -0,0 +1,97 @@
+import argparse
+import re
+import sys
+from sqlalchemy import event
+from app import create_app
+from models import db
+
+
+# Plan steps that are the intended shape of a route, so --fail-on-scan passes on a clean tree
+EXPECTED_PLANS = {
+    # Groups the bounded live days by date, doctor and status, then merges them with the rollup
+    '/api/analytics/appointments': ('USE TEMP B-TREE FOR GROUP BY', 'SCAN anon_1'),
+    # Streams every patient by design
+    '/api/export/patients': ('SCAN patient',),
+    # Counts every patient by birth year and gender; cached until a patient changes
+    '/api/stats/patients': ('SCAN patient', 'USE TEMP B-TREE FOR GROUP BY'),
+    # Once rows are archived, each table is paged on its own index and only
+    # the two LIMITed pages are sorted together
+    '/api/appointments/': ('USE TEMP B-TREE FOR ORDER BY',),
+    '/api/appointments/doctor/1': ('USE TEMP B-TREE FOR ORDER BY',),
+    '/api/appointments/patient/1': ('USE TEMP B-TREE FOR ORDER BY',),
+    '/api/patients/1/chart': ('USE TEMP B-TREE FOR ORDER BY',),
+}
+
+
+def route_urls(app):
+    # Every parameterless-or-int GET route, with id placeholders filled in
+    urls = []
+    for rule in app.url_map.iter_rules():
+        if 'GET' not in rule.methods or rule.endpoint == 'static':
+            continue
+        url = re.sub(r'<int:[^>]+>', '1', rule.rule)
+        if '<' not in url:
+            urls.append(url)
+    return sorted(urls)
+
+
+def is_full_scan(detail, statement, allowed_tables):
+    # A rowid-ordered SCAN under LIMIT stops after one page, so only unbounded
+    # scans that do not walk an index count as regressions
+    if not detail.startswith('SCAN') or 'INDEX' in detail:
+        return False
+    if detail.split()[1] in allowed_tables:
+        return False
+    return ' LIMIT ' not in statement
+
+
+def capture_statements(app, url):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        app.test_client().get(url)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    return statements
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Print EXPLAIN QUERY PLAN for the SQL issued by each GET route.')
+    parser.add_argument('urls', nargs='*', help='URLs to explain (default: every GET route)')
+    parser.add_argument('--fail-on-scan', action='store_true',
+                        help='exit with status 1 if any plan contains a full table scan or sort')
+    parser.add_argument('--allow', action='append', default=['stat_counter'], metavar='TABLE',
+                        help='small table that may be scanned (repeatable)')
+    args = parser.parse_args()
+
+    app = create_app()
+    scans = 0
+    with app.app_context():
+        if db.engine.dialect.name != 'sqlite':
+            sys.exit('EXPLAIN QUERY PLAN is only supported on SQLite')
+        for url in args.urls or route_urls(app):
+            print(f'== GET {url}')
+            for statement, parameters in capture_statements(app, url):
+                print('  ' + ' '.join(statement.split()))
+                with db.engine.connect() as conn:
+                    plan = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+                for row in plan:
+                    detail = row[-1]
+                    flagged = is_full_scan(detail, statement, args.allow) or 'TEMP B-TREE' in detail
+                    if flagged and detail in EXPECTED_PLANS.get(url.split('?')[0], ()):
+                        print(f'    -> {detail}  (expected)')
+                        continue
+                    scans += flagged
+                    print(f"    {'!!' if flagged else '->'} {detail}")
+    if args.fail_on_scan and scans:
+        print(f'{scans} full table scan(s) or temp sort(s) found')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+import csv
+import heapq
+import io
+import json
+from flask import current_app
+from models import db
+from serializers import plain
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def stream_rows(statement, batch_size):
+    result = db.session.execute(statement.execution_options(stream_results=True))
+    yield from result.yield_per(batch_size)
+
+
+def iter_export(statements, fields, fmt, key=None):
+    """Serialize column selects row by row, yielding text chunks of about EXPORT_BATCH_SIZE rows.
+
+    Rows are fetched from server-side cursors in batches of the same size, so
+    memory stays flat no matter how many rows match. Several selects, each
+    already ordered by ``key``, are merged as they stream, so reading across
+    tables needs no sort in the database.
+    """
+    batch_size = current_app.config['EXPORT_BATCH_SIZE']
+    streams = [stream_rows(statement, batch_size) for statement in statements]
+    rows = streams[0] if len(streams) == 1 else heapq.merge(*streams, key=key)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == 'csv' else None
+    if writer:
+        writer.writerow(fields)
+
+    for count, row in enumerate(rows, start=1):
+        values = [plain(v) for v in row]
+        if writer:
+            writer.writerow(values)
+        else:
+            buffer.write(json.dumps(dict(zip(fields, values))))
+            buffer.write('\n')
+        if count % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
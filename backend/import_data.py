@@ -0,0 +1,33 @@
+import argparse
+import json
+import sys
+from app import create_app
+from importer import Importer, iter_records, ENTITIES
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk import patients, doctors or appointments from CSV or NDJSON.')
+    parser.add_argument('entity', choices=sorted(ENTITIES))
+    parser.add_argument('path', help="input file, or '-' for stdin")
+    parser.add_argument('--format', choices=('csv', 'ndjson'),
+                        help='input format (default: from the file extension)')
+    parser.add_argument('--chunk-size', type=int, help='rows per INSERT batch (default: IMPORT_CHUNK_SIZE)')
+    args = parser.parse_args()
+
+    fmt = args.format or ('csv' if args.path.endswith('.csv') else 'ndjson')
+    app = create_app()
+    with app.app_context():
+        if args.path == '-':
+            summary = Importer(args.entity, args.chunk_size).run(iter_records(sys.stdin.buffer, fmt))
+        else:
+            with open(args.path, 'rb') as stream:
+                summary = Importer(args.entity, args.chunk_size).run(iter_records(stream, fmt))
+
+    for error in summary['errors']:
+        print(f"row {error['row']}: {error['error']}", file=sys.stderr)
+    print(json.dumps({k: v for k, v in summary.items() if k != 'errors'}))
+    sys.exit(1 if summary['errors'] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+import csv
+import json
+import re
+from collections import Counter
+from datetime import datetime
+from flask import current_app
+from sqlalchemy.exc import DBAPIError
+from models import User, Patient, Doctor, Appointment, db
+from counters import adjust, PATIENTS, DOCTORS, PENDING_APPOINTMENTS
+from rollups import adjust_rollups, rollup_key
+from cache import response_cache
+
+APPOINTMENT_STATUSES = ('scheduled', 'completed', 'cancelled')
+
+
+class InvalidRecord(ValueError):
+    """Yielded by ``iter_records`` in place of a record that could not be read; reported against its row."""
+
+
+# Undecodable bytes, as left by the surrogateescape error handler
+UNDECODABLE = re.compile('[\udc80-\udcff]')
+
+
+def _decoded_lines(stream):
+    # Invalid bytes are kept as surrogates so the CSV reader stays in step and the record can be rejected
+    for line in stream:
+        yield line.decode('utf-8', errors='surrogateescape')
+
+
+def _csv_records(stream):
+    reader = csv.DictReader(_decoded_lines(stream))
+    while True:
+        try:
+            record = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            # The reader resumes at the next line
+            yield InvalidRecord(f'Malformed CSV: {e}')
+            continue
+        if any(isinstance(value, str) and UNDECODABLE.search(value) for value in record.values()):
+            yield InvalidRecord('Row is not valid UTF-8')
+        else:
+            yield record
+
+
+def iter_records(stream, fmt):
+    """Yield ``(row_number, record)`` pairs from a binary CSV or NDJSON stream without buffering it.
+
+    A row that is not valid UTF-8 or cannot be parsed yields an
+    ``InvalidRecord`` (CSV) or ``None`` (NDJSON that is not JSON), and
+    reading carries on with the next row.
+    """
+    if fmt == 'csv':
+        yield from enumerate(_csv_records(stream), start=1)
+    elif fmt == 'ndjson':
+        for number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line.decode('utf-8'))
+            except UnicodeDecodeError:
+                record = InvalidRecord('Row is not valid UTF-8')
+            except ValueError:
+                record = None
+            yield number, record
+    else:
+        raise ValueError(f"Unsupported format '{fmt}'")
+
+
+def _value(record, field, required=False):
+    value = record.get(field)
+    if isinstance(value, str):
+        value = value.strip()
+    if value in (None, ''):
+        if required:
+            raise ValueError(f"'{field}' is required")
+        return None
+    return value
+
+
+def _str(record, field, required=False):
+    # NDJSON can carry objects and lists, which the driver cannot bind
+    value = _value(record, field, required)
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"'{field}' must be a string")
+    return str(value)
+
+
+def _int(record, field):
+    value = _value(record, field, required=True)
+    if isinstance(value, bool) or not isinstance(value, (str, int)):
+        raise ValueError(f"'{field}' must be an integer")
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"'{field}' must be an integer")
+
+
+def _datetime(record, field):
+    try:
+        return datetime.fromisoformat(str(_value(record, field, required=True)))
+    except ValueError:
+        raise ValueError(f"'{field}' must be an ISO date or datetime")
+
+
+def parse_patient(record):
+    return {
+        'user_id': _int(record, 'user_id'),
+        'first_name': _str(record, 'first_name', required=True),
+        'last_name': _str(record, 'last_name', required=True),
+        'date_of_birth': _datetime(record, 'date_of_birth').date(),
+        'gender': _str(record, 'gender', required=True),
+        'phone': _str(record, 'phone'),
+        'address': _str(record, 'address'),
+        'emergency_contact': _str(record, 'emergency_contact')
+    }
+
+
+def parse_doctor(record):
+    return {
+        'user_id': _int(record, 'user_id'),
+        'first_name': _str(record, 'first_name', required=True),
+        'last_name': _str(record, 'last_name', required=True),
+        'specialization': _str(record, 'specialization', required=True),
+        'license_number': _str(record, 'license_number', required=True),
+        'phone': _str(record, 'phone'),
+        'email': _str(record, 'email')
+    }
+
+
+def parse_appointment(record):
+    status = _str(record, 'status') or 'scheduled'
+    if status not in APPOINTMENT_STATUSES:
+        raise ValueError(f"'status' must be one of {', '.join(APPOINTMENT_STATUSES)}")
+    return {
+        'patient_id': _int(record, 'patient_id'),
+        'doctor_id': _int(record, 'doctor_id'),
+        'appointment_date': _datetime(record, 'appointment_date'),
+        'reason': _str(record, 'reason'),
+        'status': status,
+        'notes': _str(record, 'notes')
+    }
+
+
+# entity name -> (model, row parser, {foreign key column: referenced model})
+ENTITIES = {
+    'patients': (Patient, parse_patient, {'user_id': User}),
+    'doctors': (Doctor, parse_doctor, {'user_id': User}),
+    'appointments': (Appointment, parse_appointment, {'patient_id': Patient, 'doctor_id': Doctor}),
+}
+
+
+def _adjust_counters(entity, rows):
+    if entity == 'patients':
+        adjust(PATIENTS, len(rows))
+    elif entity == 'doctors':
+        adjust(DOCTORS, len(rows))
+    else:
+        adjust(PENDING_APPOINTMENTS, sum(row['status'] == 'scheduled' for row in rows))
+        adjust_rollups(Counter(
+            rollup_key(row['appointment_date'], row['doctor_id'], row['status']) for row in rows
+        ))
+
+
+class Importer:
+    """Validate records as they stream in and insert them in executemany batches.
+
+    A batch that violates a database constraint is retried row by row so that
+    only the offending rows are reported and the rest of the load goes through.
+    """
+
+    def __init__(self, entity, chunk_size=None):
+        self.entity = entity
+        self.model, self.parse, self.foreign_keys = ENTITIES[entity]
+        self.chunk_size = chunk_size or current_app.config['IMPORT_CHUNK_SIZE']
+        self.processed = 0
+        self.imported = 0
+        self.errors = []
+
+    def run(self, records):
+        chunk = []
+        for number, record in records:
+            self.processed += 1
+            try:
+                if isinstance(record, InvalidRecord):
+                    raise record
+                if not isinstance(record, dict):
+                    raise ValueError('Row is not a valid object')
+                chunk.append((number, self.parse(record)))
+            except ValueError as e:
+                self.errors.append({'row': number, 'error': str(e)})
+            if len(chunk) >= self.chunk_size:
+                self._flush(chunk)
+                chunk = []
+        if chunk:
+            self._flush(chunk)
+        if self.entity == 'doctors' and self.imported:
+            response_cache.invalidate('doctors')
+        elif self.entity == 'patients' and self.imported:
+            response_cache.invalidate('patient-stats')
+        return self.summary()
+
+    def summary(self):
+        return {
+            'entity': self.entity,
+            'processed': self.processed,
+            'imported': self.imported,
+            'failed': len(self.errors),
+            'errors': sorted(self.errors, key=lambda e: e['row'])
+        }
+
+    def _flush(self, chunk):
+        chunk = self._check_foreign_keys(chunk)
+        if not chunk:
+            return
+        try:
+            self._insert([row for _, row in chunk])
+        except DBAPIError:
+            db.session.rollback()
+            for number, row in chunk:
+                try:
+                    self._insert([row])
+                except DBAPIError as e:
+                    db.session.rollback()
+                    self.errors.append({'row': number, 'error': str(e.orig)})
+
+    def _insert(self, rows):
+        db.session.execute(self.model.__table__.insert(), rows)
+        _adjust_counters(self.entity, rows)
+        db.session.commit()
+        self.imported += len(rows)
+
+    def _check_foreign_keys(self, chunk):
+        # One IN query per foreign key per chunk, since SQLite does not enforce them by default
+        missing = {}
+        for column, target in self.foreign_keys.items():
+            wanted = {row[column] for _, row in chunk}
+            found = {id_ for (id_,) in db.session.query(target.id).filter(target.id.in_(wanted))}
+            missing[column] = wanted - found
+        valid = []
+        for number, row in chunk:
+            bad = [column for column, ids in missing.items() if row[column] in ids]
+            if bad:
+                self.errors.append({'row': number, 'error': f"Unknown {', '.join(bad)}"})
+            else:
+                valid.append((number, row))
+        return valid
@@ -0,0 +1,215 @@
+import re
+import threading
+import time
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_sql(statement):
+    """Collapse literals and IN lists so one query shape is one sample."""
+    sql = STRING_LITERAL.sub('?', statement)
+    sql = NUMBER_LITERAL.sub('?', sql)
+    sql = re.sub(r'%\(\w+\)s|:\w+|%s', '?', sql)
+    sql = PLACEHOLDER_LIST.sub('(?, ...)', sql)
+    return WHITESPACE.sub(' ', sql).strip()[:1000]
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def labels(**values):
+    return '{' + ','.join(f'{k}="{escape_label(v)}"' for k, v in values.items()) + '}'
+
+
+class Histogram:
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def copy(self):
+        histogram = Histogram()
+        histogram.counts, histogram.total, histogram.count = list(self.counts), self.total, self.count
+        return histogram
+
+    def observe(self, value):
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+
+    def lines(self, name, **label_values):
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{labels(**label_values, le=bound)} {cumulative}'
+        yield f'{name}_bucket{labels(**label_values, le="+Inf")} {self.count}'
+        yield f'{name}_sum{labels(**label_values)} {self.total:.6f}'
+        yield f'{name}_count{labels(**label_values)} {self.count}'
+
+
+class Metrics:
+    """In-process request and SQL metrics, rendered in Prometheus text format.
+
+    Request hooks time each view; engine listeners attribute every statement
+    to the request that ran it. Everything is kept per worker process, so a
+    scraper should collect each worker (or run a single worker).
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.slow_query_seconds = 0.0
+        self.max_slow_queries = 0
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.latency = {}       # (endpoint, method) -> Histogram
+            self.responses = {}     # (endpoint, method, status) -> count
+            self.queries = {}       # endpoint -> [statements, seconds]
+            self.slow_queries = {}  # normalized sql -> [count, seconds, max seconds, endpoint]
+            self.started = time.time()
+
+    def init_app(self, app):
+        self.enabled = app.config['METRICS_ENABLED']
+        if not self.enabled:
+            return
+        self.slow_query_seconds = app.config['SLOW_QUERY_MS'] / 1000
+        self.max_slow_queries = app.config['SLOW_QUERY_SAMPLES']
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def instrument(self, engine):
+        if not self.enabled:
+            return
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def _before_request(self):
+        g.metrics_started = time.perf_counter()
+        g.metrics_queries = 0
+        g.metrics_query_seconds = 0.0
+
+    def _after_request(self, response):
+        started = g.get('metrics_started')
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        endpoint = request.endpoint or 'unmatched'
+        method = request.method
+        with self._lock:
+            histogram = self.latency.get((endpoint, method))
+            if histogram is None:
+                histogram = self.latency[(endpoint, method)] = Histogram()
+            histogram.observe(elapsed)
+            key = (endpoint, method, response.status_code)
+            self.responses[key] = self.responses.get(key, 0) + 1
+            totals = self.queries.setdefault(endpoint, [0, 0.0])
+            totals[0] += g.metrics_queries
+            totals[1] += g.metrics_query_seconds
+        return response
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # Kept on the statement's own context, so a statement that raises leaves nothing behind
+        if context is not None:
+            context.metrics_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, 'metrics_started', None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        in_request = has_request_context() and 'metrics_queries' in g
+        if in_request:
+            g.metrics_queries += 1
+            g.metrics_query_seconds += elapsed
+        if elapsed < self.slow_query_seconds:
+            return
+        sql = normalize_sql(statement)
+        endpoint = request.endpoint if in_request else 'background'
+        with self._lock:
+            sample = self.slow_queries.get(sql)
+            if sample is None:
+                if len(self.slow_queries) >= self.max_slow_queries:
+                    # Keep the slowest shapes: replace the fastest sample if this one beats it
+                    fastest = min(self.slow_queries, key=lambda k: self.slow_queries[k][2])
+                    if self.slow_queries[fastest][2] >= elapsed:
+                        return
+                    del self.slow_queries[fastest]
+                sample = self.slow_queries[sql] = [0, 0.0, 0.0, endpoint]
+            sample[0] += 1
+            sample[1] += elapsed
+            sample[2] = max(sample[2], elapsed)
+            sample[3] = endpoint
+
+    def render(self):
+        with self._lock:
+            latency = {key: histogram.copy() for key, histogram in self.latency.items()}
+            responses = dict(self.responses)
+            queries = {key: tuple(value) for key, value in self.queries.items()}
+            slow_queries = {key: tuple(value) for key, value in self.slow_queries.items()}
+
+        lines = [
+            '# HELP http_request_duration_seconds Request latency by endpoint.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for (endpoint, method), histogram in sorted(latency.items()):
+            lines.extend(histogram.lines('http_request_duration_seconds', endpoint=endpoint, method=method))
+
+        lines += [
+            '# HELP http_responses_total Responses by endpoint and status code.',
+            '# TYPE http_responses_total counter',
+        ]
+        for (endpoint, method, status), count in sorted(responses.items()):
+            lines.append(f'http_responses_total{labels(endpoint=endpoint, method=method, status=status)} {count}')
+
+        lines += [
+            '# HELP db_queries_total SQL statements executed by endpoint.',
+            '# TYPE db_queries_total counter',
+        ]
+        lines += [f'db_queries_total{labels(endpoint=endpoint)} {count}'
+                  for endpoint, (count, _) in sorted(queries.items())]
+        lines += [
+            '# HELP db_query_duration_seconds_total Time spent executing SQL by endpoint.',
+            '# TYPE db_query_duration_seconds_total counter',
+        ]
+        lines += [f'db_query_duration_seconds_total{labels(endpoint=endpoint)} {seconds:.6f}'
+                  for endpoint, (_, seconds) in sorted(queries.items())]
+
+        lines += [
+            f'# HELP db_slow_queries_total Statements slower than {self.slow_query_seconds * 1000:g} ms, by normalized SQL.',
+            '# TYPE db_slow_queries_total counter',
+        ]
+        ranked = sorted(slow_queries.items(), key=lambda item: -item[1][2])
+        for sql, (count, _, _, endpoint) in ranked:
+            lines.append(f'db_slow_queries_total{labels(endpoint=endpoint, sql=sql)} {count}')
+        lines += [
+            '# HELP db_slow_query_max_seconds Slowest observed run of each slow statement.',
+            '# TYPE db_slow_query_max_seconds gauge',
+        ]
+        for sql, (_, _, slowest, endpoint) in ranked:
+            lines.append(f'db_slow_query_max_seconds{labels(endpoint=endpoint, sql=sql)} {slowest:.6f}')
+
+        lines += [
+            '# HELP metrics_start_time_seconds Unix time this process started collecting.',
+            '# TYPE metrics_start_time_seconds gauge',
+            f'metrics_start_time_seconds {self.started:.3f}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
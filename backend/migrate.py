@@ -0,0 +1,30 @@
+import argparse
+from app import create_app
+from migrations import MIGRATIONS, LATEST_VERSION, migrate, schema_version, release_lock
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply versioned schema migrations to the configured database.')
+    parser.add_argument('command', nargs='?', default='upgrade', choices=('upgrade', 'status', 'unlock'),
+                        help='upgrade (default) applies pending migrations, status lists them, '
+                             'unlock clears a lock left by a crashed migration')
+    parser.add_argument('--to', type=int, help='stop after this version (default: latest)')
+    args = parser.parse_args()
+
+    app = create_app(schema_check=False)
+    with app.app_context():
+        current = schema_version()
+        if args.command == 'status':
+            print(f'schema version {current} of {LATEST_VERSION}')
+            for version, description, _ in MIGRATIONS:
+                print(f"{'applied' if version <= current else 'pending':>8}  {version:>3}  {description}")
+        elif args.command == 'unlock':
+            print('lock cleared' if release_lock() else 'no lock held')
+        else:
+            for version, description, seconds in migrate(args.to):
+                print(f'applied {version:>3}  {description}  ({seconds:.1f}s)')
+            print(f'schema version {schema_version()} of {LATEST_VERSION}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+import os
+import re
+import socket
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import exc, func, select
+from sqlalchemy.schema import CreateIndex
+from models import SchemaVersion, SchemaLock, Patient, Doctor, Appointment, ArchivedAppointment, Tombstone, db
+from counters import ensure_counters
+from rollups import ensure_rollups
+from search import search_index
+
+# Schema changes are numbered migrations, applied once each and recorded in
+# schema_version. A new database gets the current models from migration 1, so
+# every later migration must check before it alters (add_column and
+# create_index do) and must be safe to re-run after an interruption.
+
+
+def add_column(model, name):
+    """ALTER TABLE ... ADD COLUMN for a column declared on ``model``, unless the table already has it."""
+    table = model.__table__
+    if name in {column['name'] for column in db.inspect(db.engine).get_columns(table.name)}:
+        return False
+    quote = db.engine.dialect.identifier_preparer.quote
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql(
+            f'ALTER TABLE {quote(table.name)} ADD COLUMN {quote(name)} '
+            f'{table.c[name].type.compile(db.engine.dialect)}'
+        )
+    return True
+
+
+def backfill(model, name, value, batch_size=None):
+    """Set ``name`` to ``value`` where it is NULL, one primary key range per transaction.
+
+    Each batch holds its locks for a bounded number of rows, so live traffic
+    keeps flowing while a large table is backfilled.
+    """
+    table = model.__table__
+    batch_size = batch_size or current_app.config['MIGRATION_BATCH_SIZE']
+    with db.engine.connect() as conn:
+        low, high = conn.execute(select(func.min(table.c.id), func.max(table.c.id))).first()
+    updated = 0
+    if low is None:
+        return updated
+    for start in range(low, high + 1, batch_size):
+        with db.engine.begin() as conn:
+            updated += conn.execute(table.update().where(
+                table.c.id >= start, table.c.id < start + batch_size, table.c[name].is_(None)
+            ).values({name: value})).rowcount
+    return updated
+
+
+def create_index(index):
+    """Build a declared index unless it exists; concurrently on PostgreSQL so writes are not blocked."""
+    if db.engine.dialect.name != 'postgresql':
+        index.create(db.engine, checkfirst=True)
+        return
+    ddl = str(CreateIndex(index).compile(dialect=db.engine.dialect))
+    ddl = re.sub(r'^CREATE (UNIQUE )?INDEX', r'CREATE \1INDEX CONCURRENTLY IF NOT EXISTS', ddl)
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        conn.exec_driver_sql(ddl)
+
+
+def _create_tables():
+    db.create_all()
+
+
+def _add_update_timestamps():
+    # Patients and doctors predating delta queries start with updated_at = created_at
+    for model in (Patient, Doctor):
+        add_column(model, 'updated_at')
+        backfill(model, 'updated_at', model.__table__.c.created_at)
+
+
+def _create_indexes():
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            create_index(index)
+
+
+def _autoincrement_appointment_ids():
+    # Without AUTOINCREMENT SQLite hands out max(id) + 1, reusing the ids of
+    # archived and deleted appointments. The table is rebuilt in one transaction.
+    if db.engine.dialect.name != 'sqlite':
+        return
+    table = Appointment.__table__
+    with db.engine.begin() as conn:
+        # pysqlite does not open a transaction before DDL by itself
+        conn.exec_driver_sql('BEGIN IMMEDIATE')
+        ddl = conn.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table.name,)
+        ).scalar()
+        if 'AUTOINCREMENT' in ddl.upper():
+            return
+        for index in table.indexes:
+            conn.exec_driver_sql(f'DROP INDEX IF EXISTS {index.name}')
+        conn.exec_driver_sql(f'ALTER TABLE {table.name} RENAME TO {table.name}_old')
+        table.create(conn)
+        columns = ', '.join(column.name for column in table.columns)
+        conn.exec_driver_sql(f'INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {table.name}_old')
+        conn.exec_driver_sql(f'DROP TABLE {table.name}_old')
+        high = max(conn.execute(query).scalar() or 0 for query in (
+            select(func.max(Appointment.id)),
+            select(func.max(ArchivedAppointment.id)),
+            select(func.max(Tombstone.entity_id)).where(Tombstone.entity == 'appointment'),
+        ))
+        conn.exec_driver_sql('DELETE FROM sqlite_sequence WHERE name = ?', (table.name,))
+        conn.exec_driver_sql('INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)', (table.name, high))
+
+
+MIGRATIONS = (
+    (1, 'Create tables', _create_tables),
+    (2, 'Add and backfill patient and doctor updated_at', _add_update_timestamps),
+    (3, 'Create declared indexes', _create_indexes),
+    (4, 'Stop SQLite reusing appointment ids', _autoincrement_appointment_ids),
+)
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+# Idempotent steps run after every migrate call, whether or not a migration was pending
+REPEATABLE = (
+    ('stat counters', ensure_counters),
+    ('appointment rollups', ensure_rollups),
+    ('search index', lambda: search_index().install()),
+)
+
+
+def schema_version():
+    """Version recorded in the database, 0 when it has never been migrated (one query).
+
+    Any other failure, such as a locked database, is raised rather than
+    mistaken for an empty schema.
+    """
+    try:
+        with db.engine.connect() as conn:
+            return conn.execute(select(func.max(SchemaVersion.version))).scalar() or 0
+    except (exc.OperationalError, exc.ProgrammingError):
+        if db.inspect(db.engine).has_table(SchemaVersion.__tablename__):
+            raise
+        return 0
+
+
+def _create_bookkeeping_table(model):
+    try:
+        model.__table__.create(db.engine, checkfirst=True)
+    except (exc.OperationalError, exc.ProgrammingError):
+        # Another process booting at the same time created it between the check and the CREATE
+        if not db.inspect(db.engine).has_table(model.__tablename__):
+            raise
+
+
+@contextmanager
+def migration_lock(timeout=None):
+    """Hold the single schema_lock row so concurrent processes migrate one at a time."""
+    timeout = current_app.config['MIGRATION_LOCK_TIMEOUT'] if timeout is None else timeout
+    _create_bookkeeping_table(SchemaLock)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(SchemaLock.__table__.insert().values(
+                    id=1, owner=f'{socket.gethostname()}:{os.getpid()}', locked_at=datetime.utcnow()
+                ))
+            break
+        except exc.IntegrityError:
+            if time.monotonic() > deadline:
+                raise RuntimeError(
+                    'Timed out waiting for the migration lock; if no migration is running, '
+                    'clear it with `python migrate.py unlock`'
+                )
+            time.sleep(0.5)
+    try:
+        yield
+    finally:
+        release_lock()
+
+
+def release_lock():
+    _create_bookkeeping_table(SchemaLock)
+    with db.engine.begin() as conn:
+        return conn.execute(SchemaLock.__table__.delete()).rowcount
+
+
+def migrate(target=None):
+    """Apply pending migrations up to ``target`` (default: all), then the repeatable steps.
+
+    Returns ``(version, description, seconds)`` for each migration applied.
+    """
+    _create_bookkeeping_table(SchemaVersion)
+    applied = []
+    with migration_lock():
+        # Read again under the lock: another process may have just finished
+        current = schema_version()
+        for version, description, upgrade in MIGRATIONS:
+            if version <= current or (target is not None and version > target):
+                continue
+            started = time.perf_counter()
+            upgrade()
+            with db.engine.begin() as conn:
+                conn.execute(SchemaVersion.__table__.insert().values(
+                    version=version, description=description, applied_at=datetime.utcnow()
+                ))
+            applied.append((version, description, time.perf_counter() - started))
+        for name, step in REPEATABLE:
+            step()
+    return applied
+
+
+def check_schema():
+    """Startup check: one query when the schema is current.
+
+    A database behind the code is migrated in place when MIGRATE_ON_START is
+    set; otherwise the process refuses to start until ``python migrate.py``
+    has been run.
+    """
+    current = schema_version()
+    if current >= LATEST_VERSION:
+        return
+    if not current_app.config['MIGRATE_ON_START']:
+        raise RuntimeError(
+            f'Database schema is at version {current}, this code needs {LATEST_VERSION}; '
+            'run `python migrate.py`'
+        )
+    migrate()
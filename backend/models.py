@@ -1,4 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 from datetime import datetime
 
 db = SQLAlchemy()
@@ -16,6 +17,10 @@ class User(db.Model):
     patient_profile = db.relationship('Patient', backref='user', uselist=False)
 
 class Patient(db.Model):
+    __table_args__ = (
+        db.Index('ix_patient_updated', 'updated_at', 'id'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     first_name = db.Column(db.String(50), nullable=False)
@@ -26,25 +31,41 @@ class Patient(db.Model):
     address = db.Column(db.Text)
     emergency_contact = db.Column(db.String(100))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     appointments = db.relationship('Appointment', backref='patient', lazy=True)
 
 class Doctor(db.Model):
+    __table_args__ = (
+        db.Index('ix_doctor_updated', 'updated_at', 'id'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     first_name = db.Column(db.String(50), nullable=False)
     last_name = db.Column(db.String(50), nullable=False)
-    specialization = db.Column(db.String(100), nullable=False)
+    specialization = db.Column(db.String(100), nullable=False, index=True)
     license_number = db.Column(db.String(50), unique=True, nullable=False)
     phone = db.Column(db.String(20))
     email = db.Column(db.String(120))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     appointments = db.relationship('Appointment', backref='doctor', lazy=True)
 
 class Appointment(db.Model):
+    __table_args__ = (
+        db.Index('ix_appointment_date', 'appointment_date'),
+        db.Index('ix_appointment_doctor_date', 'doctor_id', 'appointment_date'),
+        db.Index('ix_appointment_patient_date', 'patient_id', 'appointment_date'),
+        db.Index('ix_appointment_status_date', 'status', 'appointment_date'),
+        db.Index('ix_appointment_updated', 'updated_at', 'id'),
+        # Never hand out the id of an archived or deleted appointment again
+        {'sqlite_autoincrement': True},
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     patient_id = db.Column(db.Integer, db.ForeignKey('patient.id'), nullable=False)
     doctor_id = db.Column(db.Integer, db.ForeignKey('doctor.id'), nullable=False)
@@ -54,3 +75,81 @@ class Appointment(db.Model):
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ArchivedAppointment(db.Model):
+    # Finished appointments moved out of the hot table by the archival job; same columns and ids
+    __tablename__ = 'appointment_archive'
+    __table_args__ = (
+        db.Index('ix_appointment_archive_date', 'appointment_date'),
+        db.Index('ix_appointment_archive_doctor_date', 'doctor_id', 'appointment_date'),
+        db.Index('ix_appointment_archive_patient_date', 'patient_id', 'appointment_date'),
+        db.Index('ix_appointment_archive_status_date', 'status', 'appointment_date'),
+        db.Index('ix_appointment_archive_updated', 'updated_at', 'id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    patient_id = db.Column(db.Integer, db.ForeignKey('patient.id'), nullable=False)
+    doctor_id = db.Column(db.Integer, db.ForeignKey('doctor.id'), nullable=False)
+    appointment_date = db.Column(db.DateTime, nullable=False)
+    reason = db.Column(db.Text)
+    status = db.Column(db.String(20))
+    notes = db.Column(db.Text)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Tombstone(db.Model):
+    # One row per deleted record, so delta queries can report deletions
+    __table_args__ = (
+        db.Index('ix_tombstone_entity_deleted', 'entity', 'deleted_at', 'id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class StatCounter(db.Model):
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+class AppointmentRollup(db.Model):
+    # Appointments per day, doctor and status for days before RollupState.closed_until
+    day = db.Column(db.Date, primary_key=True)
+    doctor_id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class RollupState(db.Model):
+    name = db.Column(db.String(50), primary_key=True)
+    closed_until = db.Column(db.Date, nullable=False)
+
+class SchemaVersion(db.Model):
+    # One row per applied migration; the highest version is the schema version
+    __tablename__ = 'schema_version'
+    
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    description = db.Column(db.String(200), nullable=False)
+    applied_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class SchemaLock(db.Model):
+    # At most one row, held by the process applying migrations
+    __tablename__ = 'schema_lock'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    owner = db.Column(db.String(100))
+    locked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+def configure_sqlite(engine, config):
+    if engine.dialect.name != 'sqlite':
+        return
+    
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={config['SQLITE_JOURNAL_MODE']}")
+        cursor.execute(f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS']}")
+        cursor.execute(f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}")
+        # A negative cache_size is in KiB rather than pages
+        cursor.execute(f"PRAGMA cache_size=-{int(config['SQLITE_CACHE_SIZE_KB'])}")
+        cursor.close()
@@ -0,0 +1,127 @@
+import base64
+import json
+from datetime import datetime, timezone
+from flask import request, jsonify, abort, current_app
+from sqlalchemy import tuple_
+from models import db
+
+
+def error_response(message, status=400):
+    response = jsonify({'error': message})
+    response.status_code = status
+    abort(response)
+
+
+def parse_datetime_arg(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    if value.endswith(('Z', 'z')):
+        # JavaScript's toISOString(); fromisoformat only reads a Z suffix from Python 3.11
+        value = value[:-1] + '+00:00'
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        error_response(f"Invalid '{name}' datetime")
+
+
+def parse_timestamp_arg(name):
+    # Stored timestamps are naive UTC; an explicit offset is converted, a bare value is taken as UTC
+    value = parse_datetime_arg(name)
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def parse_int_arg(name):
+    value = request.args.get(name)
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        error_response(f"Invalid '{name}' value")
+
+
+def parse_id_list(name='ids'):
+    # Comma-separated ids, de-duplicated in order and capped at PAGE_SIZE_MAX
+    try:
+        ids = [int(v) for v in request.args.get(name, '').split(',') if v.strip()]
+    except ValueError:
+        error_response(f"Invalid '{name}' value")
+    if not ids:
+        error_response(f"'{name}' is required")
+    ids = list(dict.fromkeys(ids))
+    maximum = current_app.config['PAGE_SIZE_MAX']
+    if len(ids) > maximum:
+        error_response(f"At most {maximum} '{name}' per request")
+    return ids
+
+
+def get_limit():
+    default = current_app.config['PAGE_SIZE_DEFAULT']
+    maximum = current_app.config['PAGE_SIZE_MAX']
+    limit = parse_int_arg('limit') or default
+    return max(1, min(limit, maximum))
+
+
+def encode_cursor(values):
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor, columns):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if len(payload) != len(columns):
+            raise ValueError
+        return tuple(
+            datetime.fromisoformat(v) if isinstance(c.type, db.DateTime) else v
+            for c, v in zip(columns, payload)
+        )
+    except (ValueError, TypeError):
+        error_response('Invalid cursor')
+
+
+def keyset_query(query, columns):
+    """Restrict ``query`` to the page after the request's cursor, ordered by ``columns``.
+
+    The cursor holds the key of the last row returned, so every page is a
+    bounded index range scan no matter how deep the client has paged. Works
+    on ORM queries and Core selects alike; returns the query and page size.
+    """
+    limit = get_limit()
+    order = request.args.get('order', 'asc')
+    if order not in ('asc', 'desc'):
+        error_response("Invalid 'order' value")
+    descending = order == 'desc'
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        key = tuple_(*columns)
+        values = decode_cursor(cursor, columns)
+        query = query.filter(key < values if descending else key > values)
+
+    query = query.order_by(*[c.desc() if descending else c.asc() for c in columns])
+    return query.limit(limit + 1), limit
+
+
+def split_page(rows, columns, limit):
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([getattr(rows[-1], c.key) for c in columns])
+    return rows, next_cursor
+
+
+def keyset_paginate(query, columns):
+    """Return one page of ``query`` ordered by ``columns`` and the cursor for the next page."""
+    query, limit = keyset_query(query, columns)
+    return split_page(query.all(), columns, limit)
+
+
+def paginated_response(items, next_cursor):
+    response = jsonify(items)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
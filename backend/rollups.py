@@ -0,0 +1,196 @@
+from collections import Counter
+from datetime import date, datetime, time
+from sqlalchemy import func, select, union_all
+from models import AppointmentRollup, RollupState, Appointment, ArchivedAppointment, Doctor, db
+from serializers import full_name, plain
+
+APPOINTMENTS = 'appointments'
+UNKNOWN_STATUS = 'unknown'
+
+BUCKETS = ('day', 'week', 'month')
+
+
+def _bucket_sqlite(day, bucket):
+    if bucket == 'week':
+        return func.date(day, 'weekday 0', '-6 days')
+    if bucket == 'month':
+        return func.strftime('%Y-%m-01', day)
+    return func.date(day)
+
+
+def _bucket_postgresql(day, bucket):
+    return func.date(func.date_trunc(bucket, day))
+
+
+# First day of the week (Monday) or month containing ``day``; date_trunc for servers
+BUCKET_START = {
+    'sqlite': _bucket_sqlite,
+}
+
+GROUP_COLUMNS = {
+    'doctor': lambda rows: (rows.c.doctor_id.label('doctor_id'), full_name(Doctor).label('doctor_name')),
+    'specialization': lambda rows: (Doctor.specialization.label('specialization'),),
+    'status': lambda rows: (rows.c.status.label('status'),),
+}
+
+
+def rollup_key(appointment_date, doctor_id, status):
+    return appointment_date.date(), doctor_id, status or UNKNOWN_STATUS
+
+
+def _closed_until(lock=False):
+    query = db.session.query(RollupState.closed_until).filter(RollupState.name == APPOINTMENTS)
+    if lock:
+        # Shared lock on servers: writers run concurrently but wait for a refresh in progress
+        query = query.with_for_update(read=True)
+    return query.scalar()
+
+
+def _status_column(model=Appointment):
+    return func.coalesce(model.status, UNKNOWN_STATUS)
+
+
+def _aggregate(start, end):
+    # One INSERT ... SELECT GROUP BY; the database does all the counting.
+    # Archived appointments count too, so a rebuild after archival loses nothing
+    branches = [
+        select(model.appointment_date.label('appointment_date'), model.doctor_id.label('doctor_id'),
+               _status_column(model).label('status')).where(
+            model.appointment_date >= datetime.combine(start, time.min),
+            model.appointment_date < datetime.combine(end, time.min)
+        )
+        for model in (Appointment, ArchivedAppointment)
+    ]
+    rows = union_all(*branches).subquery()
+    day = func.date(rows.c.appointment_date)
+    counts = select(day, rows.c.doctor_id, rows.c.status, func.count()).group_by(
+        day, rows.c.doctor_id, rows.c.status
+    )
+    db.session.execute(AppointmentRollup.__table__.insert().from_select(
+        ['day', 'doctor_id', 'status', 'count'], counts
+    ))
+
+
+def ensure_rollups():
+    if db.session.get(RollupState, APPOINTMENTS) is None:
+        first = min(filter(None, (
+            db.session.query(func.min(model.appointment_date)).scalar()
+            for model in (Appointment, ArchivedAppointment)
+        )), default=None)
+        db.session.add(RollupState(name=APPOINTMENTS, closed_until=first.date() if first else date.today()))
+        db.session.commit()
+
+
+def refresh_rollups():
+    """Fold every day that has ended since the last refresh into the rollup table."""
+    today = date.today()
+    closed_until = _closed_until()
+    if closed_until is None or closed_until >= today:
+        return
+    # Moving the watermark first takes the write lock, so no appointment can
+    # land in the days being folded between the aggregate and the commit
+    claimed = RollupState.query.filter(
+        RollupState.name == APPOINTMENTS, RollupState.closed_until == closed_until
+    ).update({RollupState.closed_until: today}, synchronize_session=False)
+    if not claimed:
+        db.session.rollback()
+        return
+    _aggregate(closed_until, today)
+    db.session.commit()
+
+
+def rebuild_rollups():
+    """Recompute the rollup from the base table (used after bulk jobs that bypass the write handlers)."""
+    AppointmentRollup.query.delete(synchronize_session=False)
+    RollupState.query.filter(RollupState.name == APPOINTMENTS).delete(synchronize_session=False)
+    db.session.commit()
+    ensure_rollups()
+    refresh_rollups()
+
+
+def adjust_rollups(changes):
+    """Apply ``{(day, doctor_id, status): delta}`` to closed days inside the caller's transaction.
+
+    Days from today on are still read from the appointment table, so changes
+    that only touch them cost no query at all.
+    """
+    today = date.today()
+    changes = {key: delta for key, delta in changes.items() if delta and key[0] < today}
+    if not changes:
+        return
+    closed_until = _closed_until(lock=True)
+    if closed_until is None:
+        return
+    for (day, doctor_id, status), delta in changes.items():
+        if day >= closed_until:
+            continue
+        updated = AppointmentRollup.query.filter_by(day=day, doctor_id=doctor_id, status=status).update(
+            {AppointmentRollup.count: AppointmentRollup.count + delta}, synchronize_session=False
+        )
+        if not updated and delta > 0:
+            db.session.add(AppointmentRollup(day=day, doctor_id=doctor_id, status=status, count=delta))
+
+
+def adjust_rollup(old_key, new_key):
+    changes = Counter()
+    if old_key:
+        changes[old_key] -= 1
+    if new_key:
+        changes[new_key] += 1
+    adjust_rollups(changes)
+
+
+def appointment_series(bucket, group_by, start, end=None, status=None, doctor_id=None, specialization=None):
+    """Appointment counts per ``bucket`` period and ``group_by`` keys between two dates (``end`` exclusive).
+
+    Closed days come from the rollup table and the rest from the appointment
+    table; both are unioned and grouped in one statement.
+    """
+    refresh_rollups()
+    closed_until = _closed_until()
+
+    branches = []
+    if start < closed_until:
+        rolled = select(
+            AppointmentRollup.day.label('day'), AppointmentRollup.doctor_id.label('doctor_id'),
+            AppointmentRollup.status.label('status'), AppointmentRollup.count.label('count')
+        ).where(AppointmentRollup.day >= start, AppointmentRollup.day < min(end or closed_until, closed_until))
+        if status:
+            rolled = rolled.where(AppointmentRollup.status == status)
+        if doctor_id is not None:
+            rolled = rolled.where(AppointmentRollup.doctor_id == doctor_id)
+        branches.append(rolled)
+
+    if end is None or end > closed_until:
+        day = func.date(Appointment.appointment_date)
+        live = select(
+            day.label('day'), Appointment.doctor_id.label('doctor_id'),
+            _status_column().label('status'), func.count().label('count')
+        ).where(Appointment.appointment_date >= datetime.combine(max(start, closed_until), time.min))
+        if end:
+            live = live.where(Appointment.appointment_date < datetime.combine(end, time.min))
+        if status:
+            live = live.where(_status_column() == status)
+        if doctor_id is not None:
+            live = live.where(Appointment.doctor_id == doctor_id)
+        branches.append(live.group_by(day, Appointment.doctor_id, _status_column()))
+
+    if not branches:
+        return []
+    rows = (union_all(*branches) if len(branches) > 1 else branches[0]).subquery()
+
+    period = BUCKET_START.get(db.engine.dialect.name, _bucket_postgresql)(rows.c.day, bucket).label('period')
+    columns = [column for group in group_by for column in GROUP_COLUMNS[group](rows)]
+    statement = select(period, *columns, func.sum(rows.c.count).label('count')).select_from(rows)
+    if specialization or {'doctor', 'specialization'} & set(group_by):
+        statement = statement.join(Doctor, Doctor.id == rows.c.doctor_id)
+    if specialization:
+        statement = statement.where(Doctor.specialization == specialization)
+    statement = statement.group_by(period, *columns).order_by(period, *columns)
+
+    names = ['period'] + [column.name for column in columns] + ['count']
+    return [
+        {name: plain(value) for name, value in zip(names, row)}
+        for row in db.session.execute(statement)
+        if row[-1]
+    ]
@@ -0,0 +1,34 @@
+from flask import Blueprint, request, jsonify
+from datetime import date, timedelta
+from pagination import error_response, parse_datetime_arg, parse_int_arg
+from rollups import appointment_series, BUCKETS, GROUP_COLUMNS
+
+analytics_bp = Blueprint('analytics', __name__)
+
+@analytics_bp.route('/appointments', methods=['GET'])
+def get_appointment_analytics():
+    bucket = request.args.get('bucket', 'day')
+    if bucket not in BUCKETS:
+        error_response("'bucket' must be day, week or month")
+    group_by = [g for g in request.args.get('group_by', '').split(',') if g]
+    if any(g not in GROUP_COLUMNS for g in group_by):
+        error_response("'group_by' must be a comma-separated list of doctor, specialization and status")
+    
+    date_from = parse_datetime_arg('from')
+    date_to = parse_datetime_arg('to')
+    start = date_from.date() if date_from else date.today() - timedelta(days=365)
+    end = date_to.date() if date_to else None
+    
+    series = appointment_series(
+        bucket, group_by, start, end,
+        status=request.args.get('status'),
+        doctor_id=parse_int_arg('doctor_id'),
+        specialization=request.args.get('specialization')
+    )
+    return jsonify({
+        'bucket': bucket,
+        'group_by': group_by,
+        'from': start.isoformat(),
+        'to': end.isoformat() if end else None,
+        'series': series
+    })
@@ -1,23 +1,114 @@
-from flask import Blueprint, request, jsonify
-from models import Appointment, db
+from flask import Blueprint, Response, request, jsonify, current_app, abort, stream_with_context
+from sqlalchemy import select, union_all
+from models import Appointment, ArchivedAppointment, db
+from pagination import (error_response, keyset_query, split_page, paginated_response, parse_timestamp_arg,
+                        parse_int_arg, parse_id_list)
+from counters import adjust_pending
+from rollups import adjust_rollup, rollup_key
+from changes import changed_since, record_deletion, tombstones_response
+from events import AppointmentFeed
+from availability import occupies_slot, lock_schedules, find_conflict
+from archive import appointment_models, archive_boundary
+from bulk import BulkMutation
+from auth_tokens import token_required
+from serializers import APPOINTMENT, PATIENT_APPOINTMENT, DOCTOR_APPOINTMENT
 from datetime import datetime
 
 appointments_bp = Blueprint('appointments', __name__)
 
+def appointment_window():
+    # Compared with the stored naive times, so an offset or Z is converted to naive UTC
+    return parse_timestamp_arg('from'), parse_timestamp_arg('to')
+
+def filter_appointments(query, model=Appointment, window=None):
+    status = request.args.get('status')
+    if status:
+        query = query.filter(model.status == status)
+    doctor_id = parse_int_arg('doctor_id')
+    if doctor_id is not None:
+        query = query.filter(model.doctor_id == doctor_id)
+    patient_id = parse_int_arg('patient_id')
+    if patient_id is not None:
+        query = query.filter(model.patient_id == patient_id)
+    date_from, date_to = window or appointment_window()
+    if date_from:
+        query = query.filter(model.appointment_date >= date_from)
+    if date_to:
+        query = query.filter(model.appointment_date < date_to)
+    return query
+
+def reachable_models(boundary, window=None):
+    date_from, _ = window or appointment_window()
+    return appointment_models(boundary, request.args.get('status'), date_from)
+
+def appointment_selects(projection, scope=None, models=None):
+    """Filtered selects of ``projection`` per table the request can reach: the hot table, then the archive.
+
+    ``scope(model)`` adds a criterion of the calling view, such as one patient.
+    """
+    window = appointment_window()
+    for model in models or reachable_models(archive_boundary(), window):
+        statement = filter_appointments(projection.over(model).select(), model, window)
+        if scope is not None:
+            statement = statement.filter(scope(model))
+        yield model, statement
+
+def appointment_page(projection, scope=None, since=False, models=None):
+    """One keyset page of appointments; returns the statement, its key columns and the page size.
+
+    Each table is paged on its own indexes and only the two short pages are
+    merged, so reading through the archive costs one more index range scan.
+    """
+    branches = []
+    for model, statement in appointment_selects(projection, scope, models):
+        page_key = (model.appointment_date, model.id)
+        if since:
+            statement, page_key = changed_since(statement, model, page_key)
+        statement, limit = keyset_query(statement, page_key)
+        branches.append(statement)
+    if len(branches) == 1:
+        return branches[0], page_key, limit
+    rows = union_all(*[select(branch.subquery()) for branch in branches]).subquery()
+    page_key = [rows.c[column.key] for column in page_key]
+    statement, limit = keyset_query(select(rows), page_key)
+    return statement, page_key, limit
+
+def appointments_response(projection, scope=None, since=False):
+    statement, page_key, limit = appointment_page(projection, scope, since)
+    appointments, next_cursor = split_page(db.session.execute(statement).all(), page_key, limit)
+    return paginated_response(projection.dump_all(appointments), next_cursor)
+
+def find_appointments(projection, ids):
+    # Hot table first; ids it does not have are looked up in the archive
+    found = {}
+    for model in (Appointment, ArchivedAppointment):
+        missing = [id_ for id_ in ids if id_ not in found]
+        if not missing:
+            break
+        for row in projection.over(model).query().filter(model.id.in_(missing)):
+            found[row.id] = row
+    return [projection.dump(found[id_]) for id_ in ids if id_ in found]
+
+def writable_appointment_or_404(appointment_id):
+    """The hot row to change, read under the write lock so its status and date are current until commit."""
+    # On SQLite the write lock is taken before the row is read; servers lock the row itself
+    lock_schedules()
+    appointment = db.session.get(Appointment, appointment_id, with_for_update=True)
+    if appointment is None:
+        if db.session.get(ArchivedAppointment, appointment_id) is not None:
+            error_response('Archived appointments are read-only', 409)
+        abort(404)
+    return appointment
+
+def conflict_response(conflict_id):
+    return jsonify({
+        'error': 'Doctor already has an appointment at this time',
+        'conflicting_appointment_id': conflict_id
+    }), 409
+
 @appointments_bp.route('/', methods=['GET'])
 def get_appointments():
-    appointments = Appointment.query.all()
-    return jsonify([{
-        'id': a.id,
-        'patient_id': a.patient_id,
-        'doctor_id': a.doctor_id,
-        'patient_name': f"{a.patient.first_name} {a.patient.last_name}",
-        'doctor_name': f"{a.doctor.first_name} {a.doctor.last_name}",
-        'appointment_date': a.appointment_date.isoformat(),
-        'reason': a.reason,
-        'status': a.status,
-        'notes': a.notes
-    } for a in appointments])
+    return appointments_response(APPOINTMENT, since=True)
 
 @appointments_bp.route('/', methods=['POST'])
 def create_appointment():
@@ -32,37 +123,101 @@ def create_appointment():
         notes=data.get('notes')
     )
     
+    if occupies_slot(appointment.status):
+        lock_schedules([appointment.doctor_id])
+        conflict_id = find_conflict(appointment.doctor_id, appointment.appointment_date)
+        if conflict_id:
+            db.session.rollback()
+            return conflict_response(conflict_id)
+    
     db.session.add(appointment)
+    adjust_pending(None, appointment.status)
+    adjust_rollup(None, rollup_key(appointment.appointment_date, appointment.doctor_id, appointment.status))
     db.session.commit()
     
     return jsonify({'message': 'Appointment created successfully', 'appointment_id': appointment.id}), 201
 
+@appointments_bp.route('/deleted', methods=['GET'])
+def get_deleted_appointments():
+    return tombstones_response('appointment')
+
+@appointments_bp.route('/stream', methods=['GET'])
+def stream_appointments():
+    feed = AppointmentFeed(parse_int_arg('doctor_id'), parse_int_arg('patient_id'),
+                           current_app.config['PAGE_SIZE_MAX'])
+    # A new stream starts after the latest change, a reconnecting one where it left off
+    position = feed.resume_position(request.headers.get('Last-Event-ID')) or feed.latest_position()
+    events = feed.stream(position, current_app.config['SSE_POLL_SECONDS'], current_app.config['SSE_HEARTBEAT_SECONDS'])
+    return Response(stream_with_context(events), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@appointments_bp.route('/batch', methods=['GET'])
+def get_appointments_batch():
+    return jsonify(find_appointments(APPOINTMENT, parse_id_list()))
+
+@appointments_bp.route('/bulk', methods=['POST'])
+@token_required('admin')
+def bulk_appointments():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        error_response('Expected a JSON object')
+    
+    bulk = BulkMutation(atomic=bool(data.get('atomic')))
+    try:
+        if 'filter' in data:
+            if 'updates' in data or 'deletes' in data:
+                error_response("Give either 'filter' or 'updates'/'deletes'")
+            bulk.run_filter(data['filter'], data.get('set'), bool(data.get('delete')))
+        else:
+            updates = data.get('updates', [])
+            deletes = data.get('deletes', [])
+            if not isinstance(updates, list) or not isinstance(deletes, list):
+                error_response("'updates' and 'deletes' must be lists")
+            if not updates and not deletes:
+                error_response("Give 'updates', 'deletes' or a 'filter'")
+            maximum = current_app.config['PAGE_SIZE_MAX']
+            if len(updates) + len(deletes) > maximum:
+                error_response(f'At most {maximum} items per request; use a filter for larger changes')
+            bulk.run(updates, deletes)
+    except ValueError as e:
+        error_response(str(e))
+    
+    return jsonify(bulk.summary()), 409 if bulk.atomic and bulk.failed else 200
+
 @appointments_bp.route('/<int:appointment_id>', methods=['GET'])
 def get_appointment(appointment_id):
-    appointment = Appointment.query.get_or_404(appointment_id)
-    return jsonify({
-        'id': appointment.id,
-        'patient_id': appointment.patient_id,
-        'doctor_id': appointment.doctor_id,
-        'patient_name': f"{appointment.patient.first_name} {appointment.patient.last_name}",
-        'doctor_name': f"{appointment.doctor.first_name} {appointment.doctor.last_name}",
-        'appointment_date': appointment.appointment_date.isoformat(),
-        'reason': appointment.reason,
-        'status': appointment.status,
-        'notes': appointment.notes
-    })
+    found = find_appointments(APPOINTMENT, [appointment_id])
+    if not found:
+        abort(404)
+    return jsonify(found[0])
 
 @appointments_bp.route('/<int:appointment_id>', methods=['PUT'])
 def update_appointment(appointment_id):
-    appointment = Appointment.query.get_or_404(appointment_id)
+    appointment = writable_appointment_or_404(appointment_id)
     data = request.get_json()
     
+    old_date = appointment.appointment_date
+    new_date = old_date
     if 'appointment_date' in data:
-        appointment.appointment_date = datetime.strptime(data['appointment_date'], '%Y-%m-%d %H:%M')
+        new_date = datetime.strptime(data['appointment_date'], '%Y-%m-%d %H:%M')
+    
+    # Only a new date, or leaving the cancelled status, takes a slot; other edits keep the booking as it is
+    moves_in = new_date != old_date or not occupies_slot(appointment.status)
+    if occupies_slot(data.get('status', appointment.status)) and moves_in:
+        lock_schedules([appointment.doctor_id])
+        conflict_id = find_conflict(appointment.doctor_id, new_date, exclude_id=appointment.id)
+        if conflict_id:
+            db.session.rollback()
+            return conflict_response(conflict_id)
     
+    old_key = rollup_key(old_date, appointment.doctor_id, appointment.status)
+    appointment.appointment_date = new_date
+    old_status = appointment.status
     appointment.reason = data.get('reason', appointment.reason)
     appointment.status = data.get('status', appointment.status)
     appointment.notes = data.get('notes', appointment.notes)
+    adjust_pending(old_status, appointment.status)
+    adjust_rollup(old_key, rollup_key(new_date, appointment.doctor_id, appointment.status))
     
     db.session.commit()
     
@@ -70,34 +225,19 @@ def update_appointment(appointment_id):
 
 @appointments_bp.route('/<int:appointment_id>', methods=['DELETE'])
 def delete_appointment(appointment_id):
-    appointment = Appointment.query.get_or_404(appointment_id)
+    appointment = writable_appointment_or_404(appointment_id)
     db.session.delete(appointment)
+    adjust_pending(appointment.status, None)
+    adjust_rollup(rollup_key(appointment.appointment_date, appointment.doctor_id, appointment.status), None)
+    record_deletion('appointment', appointment_id)
     db.session.commit()
     
     return jsonify({'message': 'Appointment deleted successfully'})
 
 @appointments_bp.route('/patient/<int:patient_id>', methods=['GET'])
 def get_patient_appointments(patient_id):
-    appointments = Appointment.query.filter_by(patient_id=patient_id).all()
-    return jsonify([{
-        'id': a.id,
-        'doctor_id': a.doctor_id,
-        'doctor_name': f"{a.doctor.first_name} {a.doctor.last_name}",
-        'appointment_date': a.appointment_date.isoformat(),
-        'reason': a.reason,
-        'status': a.status,
-        'notes': a.notes
-    } for a in appointments])
+    return appointments_response(PATIENT_APPOINTMENT, lambda model: model.patient_id == patient_id)
 
 @appointments_bp.route('/doctor/<int:doctor_id>', methods=['GET'])
 def get_doctor_appointments(doctor_id):
-    appointments = Appointment.query.filter_by(doctor_id=doctor_id).all()
-    return jsonify([{
-        'id': a.id,
-        'patient_id': a.patient_id,
-        'patient_name': f"{a.patient.first_name} {a.patient.last_name}",
-        'appointment_date': a.appointment_date.isoformat(),
-        'reason': a.reason,
-        'status': a.status,
-        'notes': a.notes
-    } for a in appointments])
+    return appointments_response(DOCTOR_APPOINTMENT, lambda model: model.doctor_id == doctor_id)
@@ -1,18 +1,22 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, g
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
 from models import User, db
 from werkzeug.security import generate_password_hash, check_password_hash
+from auth_tokens import issue_token, signing_key, token_required
 
 auth_bp = Blueprint('auth', __name__)
 
+# Admin accounts are created with create_admin.py, never through the API
+SELF_SERVICE_ROLES = ('patient', 'doctor')
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     data = request.get_json()
-    
-    if User.query.filter_by(username=data['username']).first():
-        return jsonify({'error': 'Username already exists'}), 400
-    
-    if User.query.filter_by(email=data['email']).first():
-        return jsonify({'error': 'Email already exists'}), 400
+    # A new user could not sign in, so do not create one
+    signing_key()
+    if data['role'] not in SELF_SERVICE_ROLES:
+        return jsonify({'error': 'Role must be patient or doctor'}), 403
     
     user = User(
         username=data['username'],
@@ -22,7 +26,17 @@ def register():
     )
     
     db.session.add(user)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # The unique constraints do the duplicate check; only look up which one failed
+        db.session.rollback()
+        existing = User.query.filter(
+            or_(User.username == data['username'], User.email == data['email'])
+        ).all()
+        if any(u.username == data['username'] for u in existing):
+            return jsonify({'error': 'Username already exists'}), 400
+        return jsonify({'error': 'Email already exists'}), 400
     
     return jsonify({'message': 'User created successfully', 'user_id': user.id}), 201
 
@@ -37,7 +51,14 @@ def login():
             'message': 'Login successful',
             'user_id': user.id,
             'username': user.username,
-            'role': user.role
+            'role': user.role,
+            'token': issue_token(user),
+            'expires_in': current_app.config['AUTH_TOKEN_MAX_AGE']
         }), 200
     
     return jsonify({'error': 'Invalid credentials'}), 401
+
+@auth_bp.route('/me', methods=['GET'])
+@token_required()
+def me():
+    return jsonify(g.current_user)
@@ -1,21 +1,27 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from models import Doctor, db
-from datetime import datetime
+from pagination import keyset_paginate, paginated_response, error_response, parse_timestamp_arg, parse_int_arg, parse_id_list
+from counters import adjust, DOCTORS
+from availability import free_slots
+from cache import response_cache
+from serializers import DOCTOR
+from changes import changed_since, record_deletion, tombstones_response
+from datetime import datetime, timedelta
 
 doctors_bp = Blueprint('doctors', __name__)
 
+MAX_SLOT_MINUTES = 24 * 60
+
 @doctors_bp.route('/', methods=['GET'])
+@response_cache.cached('doctors')
 def get_doctors():
-    doctors = Doctor.query.all()
-    return jsonify([{
-        'id': d.id,
-        'first_name': d.first_name,
-        'last_name': d.last_name,
-        'specialization': d.specialization,
-        'license_number': d.license_number,
-        'phone': d.phone,
-        'email': d.email
-    } for d in doctors])
+    query = DOCTOR.query()
+    specialization = request.args.get('specialization')
+    if specialization:
+        query = query.filter(Doctor.specialization == specialization)
+    query, page_key = changed_since(query, Doctor, (Doctor.id,))
+    doctors, next_cursor = keyset_paginate(query, page_key)
+    return paginated_response(DOCTOR.dump_all(doctors), next_cursor)
 
 @doctors_bp.route('/', methods=['POST'])
 def create_doctor():
@@ -32,22 +38,24 @@ def create_doctor():
     )
     
     db.session.add(doctor)
+    adjust(DOCTORS, 1)
     db.session.commit()
+    response_cache.invalidate('doctors')
     
     return jsonify({'message': 'Doctor created successfully', 'doctor_id': doctor.id}), 201
 
+@doctors_bp.route('/deleted', methods=['GET'])
+def get_deleted_doctors():
+    return tombstones_response('doctor')
+
+@doctors_bp.route('/batch', methods=['GET'])
+def get_doctors_batch():
+    return jsonify(DOCTOR.get_many(parse_id_list()))
+
 @doctors_bp.route('/<int:doctor_id>', methods=['GET'])
+@response_cache.cached(lambda doctor_id: f'doctor:{doctor_id}')
 def get_doctor(doctor_id):
-    doctor = Doctor.query.get_or_404(doctor_id)
-    return jsonify({
-        'id': doctor.id,
-        'first_name': doctor.first_name,
-        'last_name': doctor.last_name,
-        'specialization': doctor.specialization,
-        'license_number': doctor.license_number,
-        'phone': doctor.phone,
-        'email': doctor.email
-    })
+    return jsonify(DOCTOR.get_or_404(doctor_id))
 
 @doctors_bp.route('/<int:doctor_id>', methods=['PUT'])
 def update_doctor(doctor_id):
@@ -61,6 +69,7 @@ def update_doctor(doctor_id):
     doctor.email = data.get('email', doctor.email)
     
     db.session.commit()
+    response_cache.invalidate('doctors', f'doctor:{doctor_id}')
     
     return jsonify({'message': 'Doctor updated successfully'})
 
@@ -68,6 +77,32 @@ def update_doctor(doctor_id):
 def delete_doctor(doctor_id):
     doctor = Doctor.query.get_or_404(doctor_id)
     db.session.delete(doctor)
+    adjust(DOCTORS, -1)
+    record_deletion('doctor', doctor_id)
     db.session.commit()
+    response_cache.invalidate('doctors', f'doctor:{doctor_id}')
     
     return jsonify({'message': 'Doctor deleted successfully'})
+
+@doctors_bp.route('/<int:doctor_id>/free-slots', methods=['GET'])
+def get_free_slots(doctor_id):
+    Doctor.query.get_or_404(doctor_id)
+    
+    # Compared with the stored naive times, so an offset or Z is converted to naive UTC
+    start = parse_timestamp_arg('from')
+    end = parse_timestamp_arg('to')
+    if not start or not end or end <= start:
+        error_response("'from' and 'to' are required and 'to' must be after 'from'")
+    max_days = current_app.config['FREE_SLOTS_MAX_DAYS']
+    if end - start > timedelta(days=max_days):
+        error_response(f"'from' and 'to' must be at most {max_days} days apart")
+    
+    duration = parse_int_arg('duration') or current_app.config['APPOINTMENT_DURATION_MINUTES']
+    if duration <= 0 or duration > MAX_SLOT_MINUTES:
+        error_response(f"'duration' must be between 1 and {MAX_SLOT_MINUTES} minutes")
+    
+    slots = free_slots(doctor_id, start, end, timedelta(minutes=duration))
+    return jsonify([{
+        'start': slot_start.isoformat(),
+        'end': slot_end.isoformat()
+    } for slot_start, slot_end in slots])
@@ -0,0 +1,33 @@
+from flask import Blueprint, Response, request, stream_with_context
+from models import Patient
+from exporter import iter_export, CONTENT_TYPES
+from serializers import APPOINTMENT_EXPORT, PATIENT_EXPORT
+from pagination import error_response
+from routes.appointments import appointment_selects
+from routes.patients import filter_patients
+
+exports_bp = Blueprint('exports', __name__)
+
+def export_response(statements, projection, name, key=None):
+    fmt = request.args.get('format', 'csv')
+    if fmt not in CONTENT_TYPES:
+        error_response("'format' must be csv or ndjson")
+    
+    return Response(
+        stream_with_context(iter_export(statements, projection.names, fmt, key)),
+        mimetype=CONTENT_TYPES[fmt],
+        headers={'Content-Disposition': f'attachment; filename={name}.{fmt}'}
+    )
+
+@exports_bp.route('/appointments', methods=['GET'])
+def export_appointments():
+    # Each table streams in its date index order and the rows are merged in Python
+    statements = [statement.order_by(model.appointment_date, model.id)
+                  for model, statement in appointment_selects(APPOINTMENT_EXPORT)]
+    return export_response(statements, APPOINTMENT_EXPORT, 'appointments',
+                           key=lambda row: (row.appointment_date, row.id))
+
+@exports_bp.route('/patients', methods=['GET'])
+def export_patients():
+    statement = filter_patients(PATIENT_EXPORT.select()).order_by(Patient.id)
+    return export_response([statement], PATIENT_EXPORT, 'patients')
@@ -0,0 +1,31 @@
+from flask import Blueprint, request, jsonify
+from importer import Importer, iter_records, ENTITIES
+from pagination import error_response, parse_int_arg
+from auth_tokens import token_required
+
+imports_bp = Blueprint('imports', __name__)
+
+def request_format():
+    fmt = request.args.get('format')
+    if fmt:
+        return fmt
+    if request.mimetype in ('text/csv', 'application/csv'):
+        return 'csv'
+    return 'ndjson'
+
+@imports_bp.route('/<entity>', methods=['POST'])
+@token_required('admin')
+def import_entity(entity):
+    if entity not in ENTITIES:
+        return jsonify({'error': f"Unknown entity '{entity}'"}), 404
+    
+    fmt = request_format()
+    if fmt not in ('csv', 'ndjson'):
+        error_response("'format' must be csv or ndjson")
+    
+    chunk_size = parse_int_arg('chunk_size')
+    if chunk_size is not None and chunk_size <= 0:
+        error_response("'chunk_size' must be positive")
+    
+    summary = Importer(entity, chunk_size).run(iter_records(request.stream, fmt))
+    return jsonify(summary)
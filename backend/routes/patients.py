@@ -1,21 +1,26 @@
 from flask import Blueprint, request, jsonify
 from models import Patient, db
+from pagination import keyset_paginate, split_page, paginated_response, parse_id_list
+from counters import adjust, PATIENTS
+from cache import response_cache
+from serializers import PATIENT_LIST, PATIENT_DETAIL, PATIENT_APPOINTMENT
+from routes.appointments import appointment_page
+from changes import changed_since, record_deletion, tombstones_response
 from datetime import datetime
 
 patients_bp = Blueprint('patients', __name__)
 
+def filter_patients(query):
+    gender = request.args.get('gender')
+    if gender:
+        query = query.filter(Patient.gender == gender)
+    return query
+
 @patients_bp.route('/', methods=['GET'])
 def get_patients():
-    patients = Patient.query.all()
-    return jsonify([{
-        'id': p.id,
-        'first_name': p.first_name,
-        'last_name': p.last_name,
-        'date_of_birth': p.date_of_birth.isoformat(),
-        'gender': p.gender,
-        'phone': p.phone,
-        'email': p.user.email if p.user else None
-    } for p in patients])
+    query, page_key = changed_since(filter_patients(PATIENT_LIST.query()), Patient, (Patient.id,))
+    patients, next_cursor = keyset_paginate(query, page_key)
+    return paginated_response(PATIENT_LIST.dump_all(patients), next_cursor)
 
 @patients_bp.route('/', methods=['POST'])
 def create_patient():
@@ -33,24 +38,35 @@ def create_patient():
     )
     
     db.session.add(patient)
+    adjust(PATIENTS, 1)
     db.session.commit()
+    response_cache.invalidate('patient-stats')
     
     return jsonify({'message': 'Patient created successfully', 'patient_id': patient.id}), 201
 
 @patients_bp.route('/<int:patient_id>', methods=['GET'])
+@response_cache.cached(lambda patient_id: f'patient:{patient_id}')
 def get_patient(patient_id):
-    patient = Patient.query.get_or_404(patient_id)
-    return jsonify({
-        'id': patient.id,
-        'first_name': patient.first_name,
-        'last_name': patient.last_name,
-        'date_of_birth': patient.date_of_birth.isoformat(),
-        'gender': patient.gender,
-        'phone': patient.phone,
-        'address': patient.address,
-        'emergency_contact': patient.emergency_contact,
-        'email': patient.user.email if patient.user else None
-    })
+    return jsonify(PATIENT_DETAIL.get_or_404(patient_id))
+
+@patients_bp.route('/deleted', methods=['GET'])
+def get_deleted_patients():
+    return tombstones_response('patient')
+
+@patients_bp.route('/batch', methods=['GET'])
+def get_patients_batch():
+    return jsonify(PATIENT_DETAIL.get_many(parse_id_list()))
+
+@patients_bp.route('/<int:patient_id>/chart', methods=['GET'])
+def get_patient_chart(patient_id):
+    # Patient, email and one page of appointments with doctor names: two queries in total
+    patient = PATIENT_DETAIL.get_or_404(patient_id)
+    statement, page_key, limit = appointment_page(PATIENT_APPOINTMENT, lambda model: model.patient_id == patient_id)
+    appointments, next_cursor = split_page(db.session.execute(statement).all(), page_key, limit)
+    return paginated_response({
+        'patient': patient,
+        'appointments': PATIENT_APPOINTMENT.dump_all(appointments)
+    }, next_cursor)
 
 @patients_bp.route('/<int:patient_id>', methods=['PUT'])
 def update_patient(patient_id):
@@ -67,6 +83,7 @@ def update_patient(patient_id):
         patient.date_of_birth = datetime.strptime(data['date_of_birth'], '%Y-%m-%d').date()
     
     db.session.commit()
+    response_cache.invalidate(f'patient:{patient_id}', 'patient-stats')
     
     return jsonify({'message': 'Patient updated successfully'})
 
@@ -74,6 +91,9 @@ def update_patient(patient_id):
 def delete_patient(patient_id):
     patient = Patient.query.get_or_404(patient_id)
     db.session.delete(patient)
+    adjust(PATIENTS, -1)
+    record_deletion('patient', patient_id)
     db.session.commit()
+    response_cache.invalidate(f'patient:{patient_id}', 'patient-stats')
     
     return jsonify({'message': 'Patient deleted successfully'})
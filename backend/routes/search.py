@@ -0,0 +1,23 @@
+from flask import Blueprint, request, jsonify
+from search import search_index, SEARCH_FIELDS
+from pagination import error_response, get_limit
+
+search_bp = Blueprint('search', __name__)
+
+@search_bp.route('/', methods=['GET'])
+def search():
+    q = request.args.get('q', '').strip()
+    entity = request.args.get('type')
+    if entity and entity not in SEARCH_FIELDS:
+        error_response("'type' must be patient or doctor")
+    
+    entities = [entity] if entity else list(SEARCH_FIELDS)
+    rows = search_index().search(q, entities, get_limit())
+    return jsonify([{
+        'type': r.type,
+        'id': r.id,
+        'first_name': r.first_name,
+        'last_name': r.last_name,
+        'phone': r.phone,
+        'specialization': r.specialization
+    } for r in rows])
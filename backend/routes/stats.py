@@ -0,0 +1,38 @@
+from flask import Blueprint, jsonify
+from sqlalchemy import extract, func
+from models import Appointment, Patient, db
+from counters import read_counters, PATIENTS, DOCTORS, PENDING_APPOINTMENTS
+from cache import response_cache
+from datetime import datetime, date, time, timedelta
+
+stats_bp = Blueprint('stats', __name__)
+
+@stats_bp.route('/dashboard', methods=['GET'])
+def get_dashboard_stats():
+    counters = read_counters()
+    day_start = datetime.combine(date.today(), time.min)
+    today_appointments = db.session.query(func.count(Appointment.id)).filter(
+        Appointment.appointment_date >= day_start,
+        Appointment.appointment_date < day_start + timedelta(days=1)
+    ).scalar()
+    
+    return jsonify({
+        'total_patients': counters.get(PATIENTS, 0),
+        'total_doctors': counters.get(DOCTORS, 0),
+        'today_appointments': today_appointments,
+        'pending_appointments': counters.get(PENDING_APPOINTMENTS, 0)
+    })
+
+@stats_bp.route('/patients', methods=['GET'])
+@response_cache.cached('patient-stats')
+def get_patient_stats():
+    # One row per birth year and gender, few enough for the client to group into age bands
+    birth_year = extract('year', Patient.date_of_birth)
+    rows = db.session.query(birth_year, Patient.gender, func.count(Patient.id)).group_by(
+        birth_year, Patient.gender
+    ).order_by(birth_year, Patient.gender)
+    
+    return jsonify([
+        {'birth_year': int(year), 'gender': gender, 'count': count}
+        for year, gender, count in rows
+    ])
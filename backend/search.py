@@ -0,0 +1,117 @@
+import re
+from flask import current_app
+from sqlalchemy import or_, literal, null, func
+from models import Patient, Doctor, db
+
+# Searchable columns per entity; the FTS tables mirror these names
+SEARCH_FIELDS = {
+    'patient': (Patient, ('first_name', 'last_name', 'phone', 'emergency_contact')),
+    'doctor': (Doctor, ('first_name', 'last_name', 'specialization', 'license_number')),
+}
+
+TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(q):
+    return TOKEN.findall(q.lower())
+
+
+class SQLiteFTSIndex:
+    """FTS5 index kept in sync by triggers, so every write path (ORM, bulk
+    insert, raw SQL) updates it in the same transaction."""
+
+    name = 'fts5'
+
+    def install(self):
+        with db.engine.begin() as conn:
+            for entity, (model, fields) in SEARCH_FIELDS.items():
+                table = model.__tablename__
+                fts = f'{table}_fts'
+                exists = conn.exec_driver_sql(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts,)
+                ).first()
+                if exists:
+                    continue
+                columns = ', '.join(fields)
+                new_values = ', '.join(f'new.{f}' for f in fields)
+                old_values = ', '.join(f'old.{f}' for f in fields)
+                conn.exec_driver_sql(
+                    f"CREATE VIRTUAL TABLE {fts} USING fts5({columns}, content='{table}', "
+                    f"content_rowid='id', prefix='2 3')"
+                )
+                conn.exec_driver_sql(
+                    f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+                    f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+                )
+                conn.exec_driver_sql(
+                    f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+                    f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); END"
+                )
+                conn.exec_driver_sql(
+                    f"CREATE TRIGGER {fts}_au AFTER UPDATE ON {table} BEGIN "
+                    f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); "
+                    f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+                )
+                conn.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+    def search(self, q, entities, limit):
+        terms = tokenize(q)
+        if not terms:
+            return []
+        # Every term must match; each one as a prefix so partial input works for typeahead
+        match = ' '.join(f'"{term}"*' for term in terms)
+        selects = []
+        for entity in entities:
+            model, _ = SEARCH_FIELDS[entity]
+            table = model.__tablename__
+            selects.append(
+                f"SELECT '{entity}' AS type, m.id, m.first_name, m.last_name, m.phone, "
+                f"{'m.specialization' if entity == 'doctor' else 'NULL'} AS specialization, "
+                f"bm25({table}_fts) AS rank "
+                f"FROM {table}_fts JOIN {table} AS m ON m.id = {table}_fts.rowid "
+                f"WHERE {table}_fts MATCH :match"
+            )
+        sql = ' UNION ALL '.join(selects) + ' ORDER BY rank LIMIT :limit'
+        return db.session.execute(db.text(sql), {'match': match, 'limit': limit}).fetchall()
+
+
+class LikeSearchIndex:
+    """Portable fallback for databases without FTS5: case-insensitive prefix
+    matching on the indexed columns. Swap in an engine-specific index
+    (e.g. a PostgreSQL tsvector) by implementing install() and search()."""
+
+    name = 'like'
+
+    def install(self):
+        pass
+
+    def search(self, q, entities, limit):
+        terms = tokenize(q)
+        if not terms:
+            return []
+        selects = []
+        for entity in entities:
+            model, fields = SEARCH_FIELDS[entity]
+            query = db.session.query(
+                literal(entity).label('type'), model.id, model.first_name, model.last_name, model.phone,
+                (model.specialization if entity == 'doctor' else null()).label('specialization'),
+                literal(0).label('rank')
+            )
+            for term in terms:
+                query = query.filter(or_(*[
+                    func.lower(getattr(model, f)).like(term.replace('_', '\\_') + '%', escape='\\')
+                    for f in fields
+                ]))
+            selects.append(query)
+        query = selects[0].union_all(*selects[1:]) if len(selects) > 1 else selects[0]
+        return query.limit(limit).all()
+
+
+INDEXES = {index.name: index for index in (SQLiteFTSIndex(), LikeSearchIndex())}
+
+
+def search_index():
+    backend = current_app.config['SEARCH_BACKEND']
+    if backend == 'auto':
+        backend = 'fts5' if db.engine.dialect.name == 'sqlite' else 'like'
+    return INDEXES[backend]
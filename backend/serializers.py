@@ -0,0 +1,189 @@
+from datetime import date
+from flask import abort
+from sqlalchemy import select, Column
+from sqlalchemy.sql.visitors import replacement_traverse
+from models import User, Patient, Doctor, Appointment, db
+
+
+def plain(value):
+    return value.isoformat() if isinstance(value, date) else value
+
+
+def full_name(model):
+    return model.first_name + ' ' + model.last_name
+
+
+def _swap_table(clause, source, target):
+    # Rewrite references to ``source`` columns as the same-named ``target`` columns
+    def replace(element):
+        if isinstance(element, Column) and element.table is source:
+            return target.c[element.key]
+        return None
+    clause = clause.__clause_element__() if hasattr(clause, '__clause_element__') else clause
+    return replacement_traverse(clause, {}, replace)
+
+
+class Projection:
+    """The columns one view returns, queried as plain rows instead of ORM entities."""
+
+    def __init__(self, model, fields, joins=(), outerjoins=()):
+        self.model = model
+        self.fields = fields
+        self.names = tuple(fields)
+        self.joins = joins
+        self.outerjoins = outerjoins
+        self._variants = {}
+
+    def over(self, model):
+        """The same projection read from ``model``, a table with the same column names (e.g. an archive)."""
+        if model is self.model:
+            return self
+        if model not in self._variants:
+            source, target = self.model.__table__, model.__table__
+            self._variants[model] = Projection(
+                model,
+                {name: _swap_table(column, source, target) for name, column in self.fields.items()},
+                [(t, _swap_table(onclause, source, target)) for t, onclause in self.joins],
+                [(t, _swap_table(onclause, source, target)) for t, onclause in self.outerjoins]
+            )
+        return self._variants[model]
+
+    def query(self):
+        query = db.session.query(
+            *[column.label(name) for name, column in self.fields.items()]
+        ).select_from(self.model)
+        for target, onclause in self.joins:
+            query = query.join(target, onclause)
+        for target, onclause in self.outerjoins:
+            query = query.outerjoin(target, onclause)
+        return query
+
+    def select(self):
+        # Core equivalent of query(), for async sessions
+        statement = select(
+            *[column.label(name) for name, column in self.fields.items()]
+        ).select_from(self.model)
+        for target, onclause in self.joins:
+            statement = statement.join(target, onclause)
+        for target, onclause in self.outerjoins:
+            statement = statement.outerjoin(target, onclause)
+        return statement
+
+    def dump(self, row):
+        return {name: plain(value) for name, value in zip(self.names, row)}
+
+    def dump_all(self, rows):
+        return [self.dump(row) for row in rows]
+
+    def get_or_404(self, id_):
+        row = self.query().filter(self.model.id == id_).first()
+        if row is None:
+            abort(404)
+        return self.dump(row)
+
+    def get_many(self, ids):
+        # One IN query; rows come back in the order the ids were given, missing ids skipped
+        rows = {row.id: row for row in self.query().filter(self.model.id.in_(ids))}
+        return [self.dump(rows[id_]) for id_ in ids if id_ in rows]
+
+
+PATIENT_USER = ((User, Patient.user_id == User.id),)
+APPOINTMENT_PATIENT = ((Patient, Appointment.patient_id == Patient.id),)
+APPOINTMENT_DOCTOR = ((Doctor, Appointment.doctor_id == Doctor.id),)
+
+PATIENT_LIST = Projection(Patient, {
+    'id': Patient.id,
+    'first_name': Patient.first_name,
+    'last_name': Patient.last_name,
+    'date_of_birth': Patient.date_of_birth,
+    'gender': Patient.gender,
+    'phone': Patient.phone,
+    'email': User.email,
+    'updated_at': Patient.updated_at
+}, outerjoins=PATIENT_USER)
+
+PATIENT_DETAIL = Projection(Patient, {
+    'id': Patient.id,
+    'first_name': Patient.first_name,
+    'last_name': Patient.last_name,
+    'date_of_birth': Patient.date_of_birth,
+    'gender': Patient.gender,
+    'phone': Patient.phone,
+    'address': Patient.address,
+    'emergency_contact': Patient.emergency_contact,
+    'email': User.email
+}, outerjoins=PATIENT_USER)
+
+PATIENT_EXPORT = Projection(Patient, {
+    'id': Patient.id,
+    'user_id': Patient.user_id,
+    'first_name': Patient.first_name,
+    'last_name': Patient.last_name,
+    'date_of_birth': Patient.date_of_birth,
+    'gender': Patient.gender,
+    'phone': Patient.phone,
+    'address': Patient.address,
+    'emergency_contact': Patient.emergency_contact,
+    'email': User.email,
+    'created_at': Patient.created_at
+}, outerjoins=PATIENT_USER)
+
+DOCTOR = Projection(Doctor, {
+    'id': Doctor.id,
+    'first_name': Doctor.first_name,
+    'last_name': Doctor.last_name,
+    'specialization': Doctor.specialization,
+    'license_number': Doctor.license_number,
+    'phone': Doctor.phone,
+    'email': Doctor.email,
+    'updated_at': Doctor.updated_at
+})
+
+APPOINTMENT = Projection(Appointment, {
+    'id': Appointment.id,
+    'patient_id': Appointment.patient_id,
+    'doctor_id': Appointment.doctor_id,
+    'patient_name': full_name(Patient),
+    'doctor_name': full_name(Doctor),
+    'appointment_date': Appointment.appointment_date,
+    'reason': Appointment.reason,
+    'status': Appointment.status,
+    'notes': Appointment.notes,
+    'updated_at': Appointment.updated_at
+}, joins=APPOINTMENT_PATIENT + APPOINTMENT_DOCTOR)
+
+PATIENT_APPOINTMENT = Projection(Appointment, {
+    'id': Appointment.id,
+    'doctor_id': Appointment.doctor_id,
+    'doctor_name': full_name(Doctor),
+    'appointment_date': Appointment.appointment_date,
+    'reason': Appointment.reason,
+    'status': Appointment.status,
+    'notes': Appointment.notes
+}, joins=APPOINTMENT_DOCTOR)
+
+DOCTOR_APPOINTMENT = Projection(Appointment, {
+    'id': Appointment.id,
+    'patient_id': Appointment.patient_id,
+    'patient_name': full_name(Patient),
+    'appointment_date': Appointment.appointment_date,
+    'reason': Appointment.reason,
+    'status': Appointment.status,
+    'notes': Appointment.notes
+}, joins=APPOINTMENT_PATIENT)
+
+APPOINTMENT_EXPORT = Projection(Appointment, {
+    'id': Appointment.id,
+    'patient_id': Appointment.patient_id,
+    'doctor_id': Appointment.doctor_id,
+    'patient_first_name': Patient.first_name,
+    'patient_last_name': Patient.last_name,
+    'doctor_first_name': Doctor.first_name,
+    'doctor_last_name': Doctor.last_name,
+    'appointment_date': Appointment.appointment_date,
+    'reason': Appointment.reason,
+    'status': Appointment.status,
+    'notes': Appointment.notes,
+    'created_at': Appointment.created_at,
+    'updated_at': Appointment.updated_at
+}, joins=APPOINTMENT_PATIENT + APPOINTMENT_DOCTOR)
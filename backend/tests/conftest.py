@@ -0,0 +1,155 @@
+import asyncio
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+# Modules that build an app at import time (asgi.py) must never touch database.db
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'import.db')}")
+os.environ.setdefault('MIGRATE_ON_START', '1')
+
+import pytest
+from werkzeug.security import generate_password_hash
+from werkzeug.wrappers import Response
+from app import create_app
+from config import engine_options
+from models import User, Patient, Doctor, Appointment, db
+
+
+def database_config(path):
+    uri = f'sqlite:///{path}'
+    return {
+        'SQLALCHEMY_DATABASE_URI': uri,
+        'SQLALCHEMY_ENGINE_OPTIONS': engine_options(uri),
+        'SECRET_KEY': 'test-secret-key',
+        'MIGRATE_ON_START': True,
+        'TESTING': True,
+    }
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app(config=database_config(tmp_path / 'test.db'))
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+class AsgiClient:
+    """Drive ``asgi.AsyncApp`` like Flask's test client: one event loop, one request at a time."""
+
+    def __init__(self, asgi_app):
+        self.app = asgi_app
+        self.loop = asyncio.new_event_loop()
+
+    def open(self, path, method='GET', json_body=None, headers=None):
+        path, _, query = path.partition('?')
+        body = b'' if json_body is None else json.dumps(json_body).encode()
+        headers = dict(headers or {})
+        if json_body is not None:
+            headers.update({'Content-Type': 'application/json', 'Content-Length': str(len(body))})
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': method, 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+            'query_string': query.encode(), 'root_path': '',
+            'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers.items()],
+            'client': ('127.0.0.1', 1234), 'server': ('localhost', 80),
+        }
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+
+        async def send(message):
+            messages.append(message)
+
+        self.loop.run_until_complete(self.app(scope, receive, send))
+        start = next(m for m in messages if m['type'] == 'http.response.start')
+        return Response(
+            b''.join(m.get('body', b'') for m in messages if m['type'] == 'http.response.body'),
+            status=start['status'],
+            headers=[(k.decode('latin-1'), v.decode('latin-1')) for k, v in start['headers']]
+        )
+
+    def get(self, path, headers=None):
+        return self.open(path, headers=headers)
+
+    def post(self, path, json=None, headers=None):
+        return self.open(path, 'POST', json, headers)
+
+    def put(self, path, json=None, headers=None):
+        return self.open(path, 'PUT', json, headers)
+
+    def delete(self, path, headers=None):
+        return self.open(path, 'DELETE', headers=headers)
+
+    def close(self):
+        self.loop.run_until_complete(self.app.engine.dispose())
+        self.loop.close()
+
+
+@pytest.fixture(params=['wsgi', 'asgi'])
+def api(request, app):
+    """A client for the app served through WSGI (Flask's test client) or ASGI (``asgi.AsyncApp``)."""
+    if request.param == 'wsgi':
+        yield app.test_client()
+        return
+    # The async mode is optional; without its requirements only the WSGI half runs
+    pytest.importorskip('asgiref')
+    pytest.importorskip('aiosqlite')
+    from asgi import AsyncApp
+    client = AsgiClient(AsyncApp(app))
+    yield client
+    client.close()
+
+
+def add_appointments(count, start=None, patients=1, doctors=1):
+    """Create ``patients`` patients, ``doctors`` doctors and ``count`` appointments an hour apart."""
+    start = start or datetime(2030, 1, 7, 9, 0)
+    existing = User.query.count()
+    users = [
+        User(username=f'user{existing + i}', email=f'user{existing + i}@example.com',
+             password_hash='x', role='patient' if i < patients else 'doctor')
+        for i in range(patients + doctors)
+    ]
+    db.session.add_all(users)
+    db.session.flush()
+    patient_rows = [
+        Patient(user_id=user.id, first_name='Asha', last_name=f'Rao{i}',
+                date_of_birth=datetime(1990, 1, 1).date(), gender='F')
+        for i, user in enumerate(users[:patients])
+    ]
+    doctor_rows = [
+        Doctor(user_id=user.id, first_name='Vikram', last_name=f'Iyer{i}', specialization='Cardiology',
+               license_number=f'LIC-{user.id}')
+        for i, user in enumerate(users[patients:])
+    ]
+    db.session.add_all(patient_rows + doctor_rows)
+    db.session.flush()
+    db.session.add_all([
+        Appointment(patient_id=patient_rows[i % patients].id, doctor_id=doctor_rows[i % doctors].id,
+                    appointment_date=start + timedelta(hours=i), reason='Checkup', status='scheduled')
+        for i in range(count)
+    ])
+    db.session.commit()
+    return patient_rows, doctor_rows
+
+
+def add_user(username, role, password='secret'):
+    """Create a user directly, as ``create_admin.py`` does; the API only registers patients and doctors."""
+    user = User(username=username, email=f'{username}@example.com',
+                password_hash=generate_password_hash(password), role=role)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def auth_headers(client, username, password='secret'):
+    token = client.post('/api/auth/login', json={'username': username, 'password': password}).get_json()['token']
+    return {'Authorization': f'Bearer {token}'}
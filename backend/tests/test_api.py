@@ -0,0 +1,216 @@
+from datetime import date, datetime
+from sqlalchemy import text
+from models import RollupState, db
+from conftest import add_appointments
+
+# Every test runs twice: through Flask's WSGI test client and through asgi.AsyncApp
+
+
+def seed(app, count=3, patients=1):
+    with app.app_context():
+        patient_rows, doctor_rows = add_appointments(count, patients=patients)
+        return patient_rows[0].id, doctor_rows[0].id
+
+
+def test_list_appointments(app, api):
+    seed(app, 3)
+
+    response = api.get('/api/appointments/')
+
+    assert response.status_code == 200
+    appointments = response.get_json()
+    assert [a['appointment_date'] for a in appointments] == sorted(a['appointment_date'] for a in appointments)
+    assert len(appointments) == 3
+    assert appointments[0]['patient_name'] == 'Asha Rao0'
+    assert appointments[0]['doctor_name'] == 'Vikram Iyer0'
+
+
+def test_appointment_cursor_pages(app, api):
+    seed(app, 5)
+
+    first = api.get('/api/appointments/?limit=3')
+    cursor = first.headers['X-Next-Cursor']
+    second = api.get(f'/api/appointments/?limit=3&cursor={cursor}')
+
+    ids = [a['id'] for a in first.get_json() + second.get_json()]
+    assert len(first.get_json()) == 3
+    assert 'X-Next-Cursor' not in second.headers
+    assert len(ids) == len(set(ids)) == 5
+
+
+def test_patient_and_doctor_appointments(app, api):
+    patient_id, doctor_id = seed(app, 4)
+
+    by_patient = api.get(f'/api/appointments/patient/{patient_id}').get_json()
+    by_doctor = api.get(f'/api/appointments/doctor/{doctor_id}').get_json()
+
+    assert len(by_patient) == len(by_doctor) == 4
+    assert by_patient[0]['doctor_name'] == 'Vikram Iyer0'
+    assert by_doctor[0]['patient_name'] == 'Asha Rao0'
+
+
+def test_list_patients(app, api):
+    seed(app, 1, patients=3)
+
+    response = api.get('/api/patients/?limit=2')
+
+    assert response.status_code == 200
+    assert [p['last_name'] for p in response.get_json()] == ['Rao0', 'Rao1']
+    assert response.headers['X-Next-Cursor']
+
+
+def test_create_read_update_delete_appointment(app, api):
+    patient_id, doctor_id = seed(app, 0)
+
+    created = api.post('/api/appointments/', json={
+        'patient_id': patient_id, 'doctor_id': doctor_id,
+        'appointment_date': '2030-02-01 10:00', 'reason': 'Follow-up'
+    })
+    assert created.status_code == 201
+    appointment_id = created.get_json()['appointment_id']
+
+    assert api.get(f'/api/appointments/{appointment_id}').get_json()['reason'] == 'Follow-up'
+
+    assert api.put(f'/api/appointments/{appointment_id}', json={'status': 'completed'}).status_code == 200
+    assert api.get(f'/api/appointments/{appointment_id}').get_json()['status'] == 'completed'
+
+    assert api.delete(f'/api/appointments/{appointment_id}').status_code == 200
+    assert api.get(f'/api/appointments/{appointment_id}').status_code == 404
+
+
+def test_double_booking_is_rejected(app, api):
+    patient_id, doctor_id = seed(app, 1)
+
+    response = api.post('/api/appointments/', json={
+        'patient_id': patient_id, 'doctor_id': doctor_id, 'appointment_date': '2030-01-07 09:00'
+    })
+
+    assert response.status_code == 409
+
+
+def test_invalid_cursor(app, api):
+    seed(app, 1)
+
+    response = api.get('/api/appointments/?cursor=not-a-cursor')
+
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_unhandled_error_goes_through_the_error_handlers(app, api):
+    seed(app, 1)
+    app.config['PROPAGATE_EXCEPTIONS'] = False
+    app.register_error_handler(500, lambda e: ({'error': 'Internal server error'}, 500))
+    with app.app_context():
+        db.session.execute(text('DROP TABLE appointment'))
+        db.session.commit()
+
+    response = api.get('/api/appointments/')
+
+    assert response.status_code == 500
+    assert response.get_json() == {'error': 'Internal server error'}
+
+
+def test_doctor_list_etag_and_invalidation(app, api):
+    _, doctor_id = seed(app, 0)
+
+    first = api.get('/api/doctors/')
+    etag = first.headers['ETag']
+    assert api.get('/api/doctors/', headers={'If-None-Match': etag}).status_code == 304
+
+    assert api.put(f'/api/doctors/{doctor_id}', json={'specialization': 'Neurology'}).status_code == 200
+
+    changed = api.get('/api/doctors/', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert changed.get_json()[0]['specialization'] == 'Neurology'
+
+
+def test_patient_detail_is_invalidated_by_update(app, api):
+    patient_id, _ = seed(app, 0)
+    etag = api.get(f'/api/patients/{patient_id}').headers['ETag']
+
+    api.put(f'/api/patients/{patient_id}', json={'phone': '+91-9000000000'})
+
+    response = api.get(f'/api/patients/{patient_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['phone'] == '+91-9000000000'
+
+
+def test_patient_stats_group_by_birth_year_and_follow_writes(app, api):
+    patient_id, _ = seed(app, 0, patients=3)
+
+    assert api.get('/api/stats/patients').get_json() == [{'birth_year': 1990, 'gender': 'F', 'count': 3}]
+
+    api.put(f'/api/patients/{patient_id}', json={'date_of_birth': '1985-06-01'})
+
+    assert api.get('/api/stats/patients').get_json() == [
+        {'birth_year': 1985, 'gender': 'F', 'count': 1},
+        {'birth_year': 1990, 'gender': 'F', 'count': 2}
+    ]
+
+
+def test_search_prefixes_follow_writes(app, api):
+    patient_id, _ = seed(app, 0)
+
+    assert [(r['type'], r['id']) for r in api.get('/api/search/?q=ash ra').get_json()] == [('patient', patient_id)]
+    assert [r['type'] for r in api.get('/api/search/?q=card').get_json()] == ['doctor']
+
+    # Kept in step by the FTS triggers
+    api.put(f'/api/patients/{patient_id}', json={'last_name': 'Menon'})
+    assert api.get('/api/search/?q=rao&type=patient').get_json() == []
+    assert [r['id'] for r in api.get('/api/search/?q=men&type=patient').get_json()] == [patient_id]
+
+    api.delete(f'/api/patients/{patient_id}')
+    assert api.get('/api/search/?q=men&type=patient').get_json() == []
+
+
+def test_analytics_buckets_rollup_and_live_days(app, api):
+    patient_id, doctor_id = seed(app, 0)
+    # Past days are counted from the rollup, which the write handlers keep up to date
+    for when in ('2020-01-06 09:00', '2020-01-07 09:00', '2020-01-14 09:00'):
+        api.post('/api/appointments/', json={'patient_id': patient_id, 'doctor_id': doctor_id, 'appointment_date': when})
+    listed = api.get('/api/appointments/?to=2020-01-10').get_json()
+    api.put(f"/api/appointments/{listed[0]['id']}", json={'status': 'cancelled'})
+    # Future days are counted from the appointment table
+    api.post('/api/appointments/', json={'patient_id': patient_id, 'doctor_id': doctor_id, 'appointment_date': '2030-01-08 09:00'})
+
+    weekly = api.get('/api/analytics/appointments?bucket=week&group_by=status&from=2020-01-01&to=2020-02-01')
+    monthly = api.get('/api/analytics/appointments?bucket=month&from=2030-01-01&to=2030-02-01')
+
+    assert weekly.get_json()['series'] == [
+        {'period': '2020-01-06', 'status': 'cancelled', 'count': 1},
+        {'period': '2020-01-06', 'status': 'scheduled', 'count': 1},
+        {'period': '2020-01-13', 'status': 'scheduled', 'count': 1},
+    ]
+    assert monthly.get_json()['series'] == [{'period': '2030-01-01', 'count': 1}]
+
+
+def test_analytics_folds_days_behind_the_watermark(app, api):
+    with app.app_context():
+        # As if the rollup was last refreshed in 2019 and rows arrived without the write handlers
+        RollupState.query.update({'closed_until': date(2019, 1, 1)})
+        db.session.commit()
+        add_appointments(2, start=datetime(2020, 3, 2, 9, 0))
+
+    response = api.get('/api/analytics/appointments?bucket=month&from=2020-01-01&to=2020-12-31')
+
+    assert response.get_json()['series'] == [{'period': '2020-03-01', 'count': 2}]
+    with app.app_context():
+        assert db.session.get(RollupState, 'appointments').closed_until == date.today()
+
+
+def test_patient_chart_and_batch_lookups(app, api):
+    patient_id, doctor_id = seed(app, 2)
+
+    chart = api.get(f'/api/patients/{patient_id}/chart').get_json()
+    assert chart['patient']['email'] == 'user0@example.com'
+    assert [a['doctor_name'] for a in chart['appointments']] == ['Vikram Iyer0'] * 2
+    assert api.get('/api/patients/999/chart').status_code == 404
+
+    ids = [a['id'] for a in chart['appointments']]
+    by_ids = api.get(f'/api/appointments/batch?ids={ids[1]},999,{ids[0]}').get_json()
+    assert [a['id'] for a in by_ids] == [ids[1], ids[0]]
+    assert [p['id'] for p in api.get(f'/api/patients/batch?ids=999,{patient_id}').get_json()] == [patient_id]
+    assert api.get('/api/doctors/batch?ids=999').get_json() == []
+    assert api.get('/api/doctors/batch').status_code == 400
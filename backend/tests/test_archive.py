@@ -0,0 +1,54 @@
+import json
+from datetime import datetime
+from models import Appointment, ArchivedAppointment, db
+from archive import archive_appointments
+from conftest import add_appointments
+
+
+def test_archived_ids_are_not_reused(app):
+    with app.app_context():
+        patients, doctors = add_appointments(3, start=datetime(2020, 1, 6, 9, 0))
+        Appointment.query.update({'status': 'completed'})
+        db.session.commit()
+        newest = db.session.query(db.func.max(Appointment.id)).scalar()
+
+        summary = archive_appointments(days=0)
+
+        assert summary['archived'] == 3
+        assert Appointment.query.count() == 0
+        assert db.session.get(ArchivedAppointment, newest) is not None
+        appointment = Appointment(patient_id=patients[0].id, doctor_id=doctors[0].id,
+                                  appointment_date=datetime(2030, 1, 7, 9, 0), status='scheduled')
+        db.session.add(appointment)
+        db.session.commit()
+        assert appointment.id > newest
+
+
+def test_export_merges_hot_and_archived_rows_in_date_order(app, client):
+    with app.app_context():
+        add_appointments(4, start=datetime(2020, 1, 6, 9, 0))
+        ids = [a.id for a in Appointment.query.order_by(Appointment.appointment_date)]
+        Appointment.query.filter(Appointment.id.in_(ids[::2])).update({'status': 'completed'})
+        db.session.commit()
+        assert archive_appointments(days=0)['archived'] == 2
+
+    response = client.get('/api/export/appointments?format=ndjson')
+
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row['id'] for row in rows] == ids
+
+
+def test_list_window_with_offsets_reaches_into_the_archive(app, api):
+    with app.app_context():
+        add_appointments(4, start=datetime(2020, 1, 6, 9, 0))
+        ids = [a.id for a in Appointment.query.order_by(Appointment.appointment_date)]
+        Appointment.query.filter(Appointment.id.in_(ids[::2])).update({'status': 'completed'})
+        db.session.commit()
+        assert archive_appointments(days=0)['archived'] == 2
+
+    # 10:00 to 12:00 UTC: one hot and one archived row
+    response = api.get('/api/appointments/?from=2020-01-06T15:30:00%2B05:30&to=2020-01-06T12:00:00Z')
+
+    assert response.status_code == 200
+    assert [row['id'] for row in response.get_json()] == ids[1:3]
+    assert api.get('/api/appointments/?from=2020-01-06T09:00:00Z').get_json()[0]['id'] == ids[0]
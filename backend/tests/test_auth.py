@@ -0,0 +1,67 @@
+import pytest
+from models import User
+from conftest import add_user
+
+
+@pytest.fixture(autouse=True)
+def admin(app):
+    with app.app_context():
+        add_user('admin', 'admin')
+
+
+def login(client):
+    return client.post('/api/auth/login', json={'username': 'admin', 'password': 'secret'})
+
+
+def test_token_round_trip(client):
+    token = login(client).get_json()['token']
+
+    response = client.get('/api/auth/me', headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code == 200
+    assert response.get_json()['username'] == 'admin'
+
+
+@pytest.mark.parametrize('secret_key', [None, '', 'your-secret-key-here'])
+def test_tokens_refused_without_a_real_secret_key(app, client, secret_key):
+    token = login(client).get_json()['token']
+    assert client.get('/api/auth/me', headers={'Authorization': f'Bearer {token}'}).status_code == 200
+    app.config['SECRET_KEY'] = secret_key
+
+    assert login(client).status_code == 503
+    # Not even a token verified (and cached) earlier is accepted
+    assert client.get('/api/auth/me', headers={'Authorization': f'Bearer {token}'}).status_code == 503
+
+
+def test_register_refused_without_a_real_secret_key(app, client):
+    app.config['SECRET_KEY'] = None
+
+    response = client.post('/api/auth/register', json={
+        'username': 'asha', 'email': 'asha@example.com', 'password': 'secret', 'role': 'patient'
+    })
+
+    assert response.status_code == 503
+    with app.app_context():
+        assert User.query.count() == 1
+
+
+def test_register_as_patient(client):
+    response = client.post('/api/auth/register', json={
+        'username': 'asha', 'email': 'asha@example.com', 'password': 'secret', 'role': 'patient'
+    })
+
+    assert response.status_code == 201
+    token = client.post('/api/auth/login', json={'username': 'asha', 'password': 'secret'}).get_json()['token']
+    assert client.get('/api/auth/me', headers={'Authorization': f'Bearer {token}'}).get_json()['role'] == 'patient'
+
+
+@pytest.mark.parametrize('role', ['admin', 'superuser'])
+def test_self_registration_as_admin_is_refused(app, client, role):
+    response = client.post('/api/auth/register', json={
+        'username': 'mallory', 'email': 'mallory@example.com', 'password': 'secret', 'role': role
+    })
+
+    assert response.status_code == 403
+    assert response.get_json() == {'error': 'Role must be patient or doctor'}
+    with app.app_context():
+        assert User.query.filter_by(username='mallory').count() == 0
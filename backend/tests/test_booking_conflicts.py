@@ -0,0 +1,106 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from models import Appointment, db
+from conftest import add_appointments
+
+
+def book(client, patient_id, doctor_id, when):
+    return client.post('/api/appointments/', json={
+        'patient_id': patient_id, 'doctor_id': doctor_id, 'appointment_date': when
+    })
+
+
+def free_starts(client, doctor_id):
+    response = client.get(f'/api/doctors/{doctor_id}/free-slots?from=2030-01-08T09:00:00&to=2030-01-08T12:00:00')
+    return [slot['start'] for slot in response.get_json()]
+
+
+def test_booking_made_by_another_process_is_seen(app, client):
+    with app.app_context():
+        patients, doctors = add_appointments(1)
+        patient_id, doctor_id = patients[0].id, doctors[0].id
+    assert '2030-01-08T10:00:00' in free_starts(client, doctor_id)
+    # Written behind this process's back, as another worker or import_data.py would
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.execute(Appointment.__table__.insert().values(
+                patient_id=patient_id, doctor_id=doctor_id,
+                appointment_date=datetime(2030, 1, 8, 10, 0), status=None
+            ))
+
+    assert '2030-01-08T10:00:00' not in free_starts(client, doctor_id)
+    response = book(client, patient_id, doctor_id, '2030-01-08 10:00')
+    assert response.status_code == 409
+    assert response.get_json()['conflicting_appointment_id']
+
+
+def test_concurrent_bookings_of_one_slot(app):
+    with app.app_context():
+        patients, doctors = add_appointments(0)
+        patient_id, doctor_id = patients[0].id, doctors[0].id
+
+    def attempt(_):
+        return book(app.test_client(), patient_id, doctor_id, '2030-01-09 11:00').status_code
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        codes = sorted(pool.map(attempt, range(8)))
+
+    assert codes == [201] + [409] * 7
+    with app.app_context():
+        assert Appointment.query.filter_by(doctor_id=doctor_id).count() == 1
+
+
+def test_edits_that_keep_the_slot_skip_the_conflict_check(app, client):
+    with app.app_context():
+        patients, doctors = add_appointments(1)
+        appointment_id = Appointment.query.one().id
+        # Imports may bring in overlapping bookings
+        with db.engine.begin() as conn:
+            conn.execute(Appointment.__table__.insert().values(
+                patient_id=patients[0].id, doctor_id=doctors[0].id,
+                appointment_date=datetime(2030, 1, 7, 9, 0), status='scheduled'
+            ))
+
+    assert client.put(f'/api/appointments/{appointment_id}', json={'notes': 'Bring reports'}).status_code == 200
+    assert client.put(f'/api/appointments/{appointment_id}', json={'status': 'completed'}).status_code == 200
+    assert client.put(f'/api/appointments/{appointment_id}', json={'status': 'cancelled'}).status_code == 200
+    assert client.put(f'/api/appointments/{appointment_id}', json={'status': 'scheduled'}).status_code == 409
+
+
+def test_free_slot_duration_is_capped(app, client):
+    with app.app_context():
+        _, doctors = add_appointments(0)
+        doctor_id = doctors[0].id
+
+    response = client.get(f'/api/doctors/{doctor_id}/free-slots'
+                          f'?from=2030-01-08T09:00:00&to=2030-01-09T09:00:00&duration=99999999999')
+
+    assert response.status_code == 400
+    assert 'duration' in response.get_json()['error']
+
+
+def test_free_slot_window_is_capped(app, client):
+    with app.app_context():
+        _, doctors = add_appointments(0)
+        doctor_id = doctors[0].id
+
+    response = client.get(f'/api/doctors/{doctor_id}/free-slots?from=2030-01-01T00:00:00&to=2033-01-01T00:00:00&duration=1')
+
+    assert response.status_code == 400
+    assert "'from' and 'to'" in response.get_json()['error']
+
+
+def test_free_slot_window_with_offsets_is_read_as_utc(app, client):
+    with app.app_context():
+        patients, doctors = add_appointments(0)
+        patient_id, doctor_id = patients[0].id, doctors[0].id
+    assert book(client, patient_id, doctor_id, '2030-01-08 10:00').status_code == 201
+
+    response = client.get(f'/api/doctors/{doctor_id}/free-slots'
+                          f'?from=2030-01-08T13:30:00%2B05:30&to=2030-01-08T12:00:00Z')
+
+    assert response.status_code == 200
+    starts = [slot['start'] for slot in response.get_json()]
+    assert starts[0] == '2030-01-08T08:00:00'
+    assert starts[-1] == '2030-01-08T11:30:00'
+    assert '2030-01-08T10:00:00' not in starts
@@ -0,0 +1,179 @@
+import pytest
+from datetime import datetime
+from models import Appointment, AppointmentRollup, Tombstone, db
+from archive import archive_appointments
+from counters import rebuild_counters, read_counters, _recount
+from rollups import rebuild_rollups
+from conftest import add_appointments, add_user, auth_headers
+
+
+@pytest.fixture
+def admin(app, client):
+    with app.app_context():
+        add_user('admin', 'admin')
+    return auth_headers(client, 'admin')
+
+
+def seed(app):
+    """Four scheduled past appointments, 09:00 to 12:00, and a completed 13:00 one moved to the archive."""
+    with app.app_context():
+        add_appointments(5, start=datetime(2020, 1, 6, 9, 0))
+        ids = [a.id for a in Appointment.query.order_by(Appointment.appointment_date)]
+        Appointment.query.update({'updated_at': datetime(2020, 1, 1)})
+        Appointment.query.filter(Appointment.id == ids[4]).update({'status': 'completed'})
+        db.session.commit()
+        assert archive_appointments(days=0)['archived'] == 1
+        # Rows inserted behind the handlers' back, as a fresh database gets them from the migrations
+        rebuild_counters()
+        rebuild_rollups()
+        return ids
+
+
+def appointment_rows():
+    return [tuple(row) for row in db.session.query(*Appointment.__table__.columns).order_by(Appointment.id)]
+
+
+def rollup_counts():
+    return {(r.day, r.doctor_id, r.status): r.count for r in AppointmentRollup.query if r.count}
+
+
+def assert_totals_match_tables(app):
+    with app.app_context():
+        assert read_counters() == _recount()
+        counts = rollup_counts()
+        rebuild_rollups()
+        assert rollup_counts() == counts
+
+
+def test_bulk_update_conflicts_with_booking_made_elsewhere(app, client, admin):
+    with app.app_context():
+        patients, doctors = add_appointments(1)
+        appointment_id = Appointment.query.one().id
+        with db.engine.begin() as conn:
+            conn.execute(Appointment.__table__.insert().values(
+                patient_id=patients[0].id, doctor_id=doctors[0].id,
+                appointment_date=datetime(2030, 1, 8, 10, 0), status='scheduled'
+            ))
+
+    response = client.post('/api/appointments/bulk', json={
+        'updates': [{'id': appointment_id, 'appointment_date': '2030-01-08 10:00'}]
+    }, headers=admin)
+
+    body = response.get_json()
+    assert body['failed'] == 1 and body['updated'] == 0
+    assert body['results'][0]['conflicting_appointment_id']
+
+
+def test_bulk_filter_is_capped(app, client, admin):
+    app.config['PAGE_SIZE_MAX'] = 5
+    with app.app_context():
+        add_appointments(6)
+    bulk_filter = {'from': '2030-01-01T00:00:00', 'to': '2030-02-01T00:00:00'}
+
+    response = client.post('/api/appointments/bulk', json={'filter': bulk_filter, 'set': {'status': 'cancelled'}},
+                           headers=admin)
+
+    assert response.status_code == 400
+    with app.app_context():
+        assert Appointment.query.filter_by(status='cancelled').count() == 0
+        db.session.delete(Appointment.query.order_by(Appointment.id.desc()).first())
+        db.session.commit()
+
+    response = client.post('/api/appointments/bulk', json={'filter': bulk_filter, 'set': {'status': 'cancelled'}},
+                           headers=admin)
+
+    assert response.status_code == 200
+    assert response.get_json()['updated'] == 5
+
+
+def test_bulk_changes_need_an_admin(app, client):
+    with app.app_context():
+        add_appointments(1)
+        appointment_id = Appointment.query.one().id
+        add_user('asha', 'patient')
+    body = {'deletes': [appointment_id]}
+
+    assert client.post('/api/appointments/bulk', json=body).status_code == 401
+    response = client.post('/api/appointments/bulk', json=body, headers=auth_headers(client, 'asha'))
+
+    assert response.status_code == 403
+    assert response.get_json() == {'error': 'Insufficient permissions'}
+    with app.app_context():
+        assert Appointment.query.count() == 1
+
+
+def test_bulk_mixed_batch(app, client, admin):
+    ids = seed(app)
+
+    response = client.post('/api/appointments/bulk', json={
+        'updates': [
+            {'id': ids[0], 'status': 'completed'},
+            {'id': ids[1], 'appointment_date': '2020-01-08 09:00', 'notes': 'Moved'},
+        ],
+        'deletes': [ids[2]],
+    }, headers=admin)
+
+    assert response.status_code == 200
+    assert response.get_json() == {
+        'applied': True, 'updated': 2, 'deleted': 1, 'failed': 0,
+        'results': [
+            {'id': ids[0], 'action': 'update', 'result': 'updated'},
+            {'id': ids[1], 'action': 'update', 'result': 'updated'},
+            {'id': ids[2], 'action': 'delete', 'result': 'deleted'},
+        ]
+    }
+    with app.app_context():
+        rows = {a.id: a for a in Appointment.query}
+        assert sorted(rows) == [ids[0], ids[1], ids[3]]
+        assert rows[ids[0]].status == 'completed'
+        assert (rows[ids[1]].appointment_date, rows[ids[1]].notes) == (datetime(2020, 1, 8, 9, 0), 'Moved')
+        assert rows[ids[0]].updated_at > datetime(2020, 1, 1) and rows[ids[1]].updated_at > datetime(2020, 1, 1)
+        assert rows[ids[3]].updated_at == datetime(2020, 1, 1)
+        assert read_counters()['pending_appointments'] == 2
+    assert [row['id'] for row in client.get('/api/appointments/deleted').get_json()] == [ids[2]]
+    assert_totals_match_tables(app)
+
+
+def test_bulk_rejects_duplicate_archived_and_unknown_ids(app, client, admin):
+    ids = seed(app)
+
+    response = client.post('/api/appointments/bulk', json={
+        'updates': [{'id': ids[0], 'status': 'cancelled'}, {'id': ids[0], 'notes': 'Again'}],
+        'deletes': [ids[4], 999999],
+    }, headers=admin)
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body['updated'], body['deleted'], body['failed']) == (1, 0, 3)
+    assert [(r['id'], r['result'], r.get('error')) for r in body['results']] == [
+        (ids[0], 'updated', None),
+        (ids[0], 'failed', 'Duplicate id'),
+        (ids[4], 'failed', 'Archived appointments are read-only'),
+        (999999, 'failed', 'Appointment not found'),
+    ]
+    with app.app_context():
+        appointment = db.session.get(Appointment, ids[0])
+        assert (appointment.status, appointment.notes) == ('cancelled', None)
+        assert Tombstone.query.count() == 0
+        assert read_counters()['pending_appointments'] == 3
+    assert_totals_match_tables(app)
+
+
+def test_atomic_bulk_with_a_failure_writes_nothing(app, client, admin):
+    ids = seed(app)
+    with app.app_context():
+        before = appointment_rows(), read_counters(), rollup_counts()
+
+    response = client.post('/api/appointments/bulk', json={
+        'atomic': True,
+        'updates': [{'id': ids[0], 'status': 'completed'}],
+        'deletes': [ids[1], 999999],
+    }, headers=admin)
+
+    assert response.status_code == 409
+    body = response.get_json()
+    assert (body['applied'], body['updated'], body['deleted'], body['failed']) == (False, 0, 0, 1)
+    assert [r['result'] for r in body['results']] == ['skipped', 'skipped', 'failed']
+    with app.app_context():
+        assert (appointment_rows(), read_counters(), rollup_counts()) == before
+        assert Tombstone.query.count() == 0
@@ -0,0 +1,53 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from models import Appointment, db
+from conftest import add_appointments
+
+READERS = 6
+WRITERS = 4
+ROUNDS = 15
+
+
+def test_parallel_readers_and_writers(app):
+    with app.app_context():
+        assert db.session.execute(db.text('PRAGMA journal_mode')).scalar() == 'wal'
+        patients, doctors = add_appointments(20, doctors=WRITERS)
+        patient_id = patients[0].id
+        doctor_ids = [doctor.id for doctor in doctors]
+
+    def read(_):
+        client = app.test_client()
+        codes = []
+        for _ in range(ROUNDS):
+            codes.append(client.get('/api/appointments/?limit=100').status_code)
+            codes.append(client.get('/api/patients/').status_code)
+        return codes
+
+    def write(writer):
+        # Each writer books its own doctor, so every write should succeed
+        client = app.test_client()
+        codes = []
+        for i in range(ROUNDS):
+            when = datetime(2031, 1, 6, 8, 0) + timedelta(hours=i)
+            response = client.post('/api/appointments/', json={
+                'patient_id': patient_id, 'doctor_id': doctor_ids[writer],
+                'appointment_date': when.strftime('%Y-%m-%d %H:%M')
+            })
+            codes.append(response.status_code)
+            if response.status_code == 201:
+                codes.append(client.put(f"/api/appointments/{response.get_json()['appointment_id']}",
+                                        json={'notes': f'round {i}'}).status_code)
+        return codes
+
+    with ThreadPoolExecutor(max_workers=READERS + WRITERS) as pool:
+        reads = [pool.submit(read, reader) for reader in range(READERS)]
+        writes = [pool.submit(write, writer) for writer in range(WRITERS)]
+        read_codes = [code for future in reads for code in future.result()]
+        write_codes = [code for future in writes for code in future.result()]
+
+    assert set(read_codes) == {200}
+    assert write_codes.count(201) == WRITERS * ROUNDS
+    assert set(write_codes) == {200, 201}
+    with app.app_context():
+        assert Appointment.query.count() == 20 + WRITERS * ROUNDS
+        assert Appointment.query.filter(Appointment.notes.like('round %')).count() == WRITERS * ROUNDS
@@ -0,0 +1,71 @@
+from datetime import datetime
+from models import db
+from conftest import add_appointments
+
+
+def read_events(response, count):
+    """The first ``count`` events of an open stream as ``(id, event, data)`` tuples."""
+    events, frame = [], {}
+    for chunk in response.response:
+        for line in chunk.decode().splitlines():
+            if line.startswith(('id: ', 'event: ', 'data: ')):
+                key, _, value = line.partition(': ')
+                frame[key] = value
+            elif not line and 'event' in frame:
+                events.append((frame['id'], frame['event'], frame['data']))
+                frame = {}
+        if len(events) >= count:
+            return events
+
+
+def test_stream_sees_writes_made_outside_this_process(app, client):
+    app.config['SSE_POLL_SECONDS'] = 0.01
+    with app.app_context():
+        patients, doctors = add_appointments(1)
+        patient_id, doctor_id = patients[0].id, doctors[0].id
+    stream = client.get('/api/appointments/stream')
+    # As another worker process would write it
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO appointment (patient_id, doctor_id, appointment_date, status, updated_at) "
+                "VALUES (?, ?, '2030-02-01 10:00:00.000000', 'scheduled', ?)",
+                (patient_id, doctor_id, datetime.utcnow().isoformat(' '))
+            )
+
+    events = read_events(stream, 1)
+    stream.close()
+
+    assert events[0][1] == 'appointment.changed'
+    assert '"appointment_date": "2030-02-01T10:00:00"' in events[0][2]
+
+
+def test_reconnect_resumes_after_last_event_id(app, client):
+    app.config['SSE_POLL_SECONDS'] = 0.01
+    with app.app_context():
+        patients, doctors = add_appointments(0)
+        patient_id, doctor_id = patients[0].id, doctors[0].id
+    stream = client.get('/api/appointments/stream')
+    first = client.post('/api/appointments/', json={
+        'patient_id': patient_id, 'doctor_id': doctor_id, 'appointment_date': '2030-02-01 10:00'
+    })
+    last_event_id = read_events(stream, 1)[0][0]
+    stream.close()
+
+    client.delete(f"/api/appointments/{first.get_json()['appointment_id']}")
+    stream = client.get('/api/appointments/stream', headers={'Last-Event-ID': last_event_id})
+    events = read_events(stream, 1)
+    stream.close()
+
+    assert events[0][1] == 'appointment.deleted'
+    assert f'"id": {first.get_json()["appointment_id"]}' in events[0][2]
+
+
+def test_updated_since_accepts_a_z_suffix(app, client):
+    with app.app_context():
+        add_appointments(2)
+
+    response = client.get('/api/appointments/?updated_since=2000-01-01T00:00:00.000Z')
+
+    assert response.status_code == 200
+    assert len(response.get_json()) == 2
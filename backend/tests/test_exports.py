@@ -0,0 +1,87 @@
+import csv
+import io
+import json
+from datetime import datetime
+from models import Appointment, db
+from conftest import add_appointments
+
+
+def seed(app):
+    with app.app_context():
+        # Two doctors, alternating, an hour apart from 2030-01-07 09:00
+        patients, doctors = add_appointments(5, patients=2, doctors=2)
+        Appointment.query.filter(Appointment.appointment_date == datetime(2030, 1, 7, 10, 0)).update(
+            {'status': 'completed'})
+        db.session.commit()
+        return [p.id for p in patients], [d.id for d in doctors]
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_appointment_csv_header_and_rows(app, client):
+    seed(app)
+    # Smaller than the row count, so the rows arrive over several chunks
+    app.config['EXPORT_BATCH_SIZE'] = 2
+
+    response = client.get('/api/export/appointments')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'] == 'attachment; filename=appointments.csv'
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows[0] == ['id', 'patient_id', 'doctor_id', 'patient_first_name', 'patient_last_name',
+                       'doctor_first_name', 'doctor_last_name', 'appointment_date', 'reason', 'status',
+                       'notes', 'created_at', 'updated_at']
+    assert len(rows) == 6
+    first = dict(zip(rows[0], rows[1]))
+    assert (first['patient_last_name'], first['doctor_last_name']) == ('Rao0', 'Iyer0')
+    assert (first['appointment_date'], first['status'], first['notes']) == ('2030-01-07T09:00:00', 'scheduled', '')
+
+
+def test_appointment_ndjson_lines(app, client):
+    seed(app)
+    app.config['EXPORT_BATCH_SIZE'] = 2
+
+    response = client.get('/api/export/appointments?format=ndjson')
+
+    assert response.mimetype == 'application/x-ndjson'
+    body = response.get_data(as_text=True)
+    assert body.endswith('\n')
+    rows = ndjson(response)
+    assert [row['appointment_date'] for row in rows] == [f'2030-01-07T{hour:02d}:00:00' for hour in range(9, 14)]
+    assert rows[0]['notes'] is None
+
+
+def test_appointment_export_filters(app, client):
+    _, doctor_ids = seed(app)
+
+    def dates(query):
+        return [row['appointment_date'][11:16]
+                for row in ndjson(client.get(f'/api/export/appointments?format=ndjson&{query}'))]
+
+    assert dates('status=completed') == ['10:00']
+    assert dates(f'doctor_id={doctor_ids[1]}') == ['10:00', '12:00']
+    assert dates('from=2030-01-07T10:00:00&to=2030-01-07T12:00:00') == ['10:00', '11:00']
+    assert dates(f'doctor_id={doctor_ids[0]}&status=scheduled&from=2030-01-07T10:00:00') == ['11:00', '13:00']
+
+
+def test_patient_export(app, client):
+    seed(app)
+
+    response = client.get('/api/export/patients?format=ndjson&gender=F')
+
+    rows = ndjson(response)
+    assert [row['last_name'] for row in rows] == ['Rao0', 'Rao1']
+    assert rows[0]['email'] == 'user0@example.com'
+    assert ndjson(client.get('/api/export/patients?format=ndjson&gender=M')) == []
+
+
+def test_unknown_format_is_rejected(app, client):
+    seed(app)
+
+    for path in ('/api/export/appointments?format=xml', '/api/export/patients?format=json'):
+        response = client.get(path)
+        assert response.status_code == 400
+        assert response.get_json() == {'error': "'format' must be csv or ndjson"}
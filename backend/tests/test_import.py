@@ -0,0 +1,99 @@
+import pytest
+from models import User, Patient, db
+from conftest import add_user, auth_headers
+
+
+@pytest.fixture
+def import_patients(app, client):
+    with app.app_context():
+        add_user('admin', 'admin')
+        users = [User(username=f'p{i}', email=f'p{i}@example.com', password_hash='x', role='patient')
+                 for i in range(3)]
+        db.session.add_all(users)
+        db.session.commit()
+        user_ids = [user.id for user in users]
+    headers = auth_headers(client, 'admin')
+
+    def post(body, content_type):
+        return client.post('/api/import/patients', data=body, content_type=content_type,
+                           headers=headers)
+    return post, user_ids
+
+
+def imported_names(app):
+    with app.app_context():
+        return sorted(patient.last_name for patient in Patient.query)
+
+
+def test_ndjson_line_with_invalid_utf8_is_a_row_error(app, import_patients):
+    post, user_ids = import_patients
+    lines = [
+        f'{{"user_id": {user_ids[0]}, "first_name": "Asha", "last_name": "Rao", '
+        f'"date_of_birth": "1990-01-01", "gender": "F"}}'.encode(),
+        b'{"user_id": 1, "first_name": "\xff\xfe"}',
+        f'{{"user_id": {user_ids[2]}, "first_name": "Meera", "last_name": "Nair", '
+        f'"date_of_birth": "1985-05-05", "gender": "F"}}'.encode(),
+    ]
+
+    response = post(b'\n'.join(lines), 'application/x-ndjson')
+
+    assert response.status_code == 200
+    summary = response.get_json()
+    assert (summary['processed'], summary['imported'], summary['failed']) == (3, 2, 1)
+    assert summary['errors'][0]['row'] == 2
+    assert imported_names(app) == ['Nair', 'Rao']
+
+
+def test_csv_row_with_invalid_utf8_is_a_row_error(app, import_patients):
+    post, user_ids = import_patients
+    body = (
+        b'user_id,first_name,last_name,date_of_birth,gender\n'
+        + f'{user_ids[0]},Asha,Rao,1990-01-01,F\n'.encode()
+        + f'{user_ids[1]},\xff\xfe,Iyer,1990-01-01,M\n'.encode('latin-1')
+        + f'{user_ids[2]},Meera,Nair,1985-05-05,F\n'.encode()
+    )
+
+    response = post(body, 'text/csv')
+
+    assert response.status_code == 200
+    summary = response.get_json()
+    assert (summary['processed'], summary['imported'], summary['failed']) == (3, 2, 1)
+    assert summary['errors'] == [{'row': 2, 'error': 'Row is not valid UTF-8'}]
+    assert imported_names(app) == ['Nair', 'Rao']
+
+
+def test_malformed_csv_record_is_a_row_error(app, import_patients):
+    post, user_ids = import_patients
+    body = (
+        b'user_id,first_name,last_name,date_of_birth,gender\n'
+        + f'{user_ids[0]},Asha,Rao,1990-01-01,F\n'.encode()
+        # Longer than csv.field_size_limit()
+        + f'{user_ids[1]},{"x" * 200000},Iyer,1990-01-01,M\n'.encode()
+        + f'{user_ids[2]},Meera,Nair,1985-05-05,F\n'.encode()
+    )
+
+    response = post(body, 'text/csv')
+
+    summary = response.get_json()
+    assert (summary['imported'], summary['failed']) == (2, 1)
+    assert summary['errors'][0]['row'] == 2
+    assert summary['errors'][0]['error'].startswith('Malformed CSV')
+    assert imported_names(app) == ['Nair', 'Rao']
+
+
+def test_ndjson_object_valued_field_is_a_row_error(app, import_patients):
+    post, user_ids = import_patients
+    lines = [
+        f'{{"user_id": {user_ids[0]}, "first_name": {{"given": "Asha"}}, "last_name": "Rao", '
+        f'"date_of_birth": "1990-01-01", "gender": "F"}}'.encode(),
+        f'{{"user_id": {user_ids[1]}, "first_name": "Meera", "last_name": "Nair", '
+        f'"date_of_birth": "1985-05-05", "gender": "F"}}'.encode(),
+    ]
+
+    response = post(b'\n'.join(lines), 'application/x-ndjson')
+
+    assert response.status_code == 200
+    summary = response.get_json()
+    assert (summary['processed'], summary['imported'], summary['failed']) == (2, 1, 1)
+    assert summary['errors'] == [{'row': 1, 'error': "'first_name' must be a string"}]
+    assert imported_names(app) == ['Nair']
@@ -0,0 +1,41 @@
+import pytest
+from sqlalchemy import event, exc
+from app import create_app
+from models import db
+from metrics import metrics
+from conftest import database_config
+
+
+@pytest.fixture
+def metrics_app(tmp_path):
+    app = create_app(config={**database_config(tmp_path / 'test.db'), 'METRICS_ENABLED': True, 'SLOW_QUERY_MS': 0})
+    metrics.reset()
+    yield app
+    metrics.reset()
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_failed_statement_leaves_no_timing_behind(metrics_app):
+    failed = []
+    with metrics_app.app_context():
+        event.listen(db.engine, 'handle_error', lambda error: failed.append(error.execution_context))
+        with db.engine.connect() as conn:
+            with pytest.raises(exc.OperationalError):
+                conn.exec_driver_sql('SELECT * FROM no_such_table')
+            conn.exec_driver_sql('SELECT 1')
+
+    # The start time lived on the failed statement's own context, which is discarded with it
+    assert hasattr(failed[0], 'metrics_started')
+
+    # Only the statement that completed is sampled
+    assert len(metrics.slow_queries) == 1
+
+
+def test_request_queries_are_counted(metrics_app):
+    metrics_app.test_client().get('/api/patients/')
+
+    statements, seconds = metrics.queries['patients.get_patients']
+    assert statements >= 1
+    assert seconds >= 0
@@ -0,0 +1,132 @@
+import pytest
+from sqlalchemy import exc
+from app import create_app
+from models import Appointment, db
+from migrations import MIGRATIONS, LATEST_VERSION, migrate, schema_version
+from conftest import database_config
+
+# The schema db.create_all() built before the numbered migrations existed
+BASELINE_SCHEMA = '''
+CREATE TABLE user (
+    id INTEGER NOT NULL, username VARCHAR(80) NOT NULL, email VARCHAR(120) NOT NULL,
+    password_hash VARCHAR(255) NOT NULL, role VARCHAR(20) NOT NULL, created_at DATETIME,
+    PRIMARY KEY (id), UNIQUE (username), UNIQUE (email)
+);
+CREATE TABLE patient (
+    id INTEGER NOT NULL, user_id INTEGER NOT NULL, first_name VARCHAR(50) NOT NULL,
+    last_name VARCHAR(50) NOT NULL, date_of_birth DATE NOT NULL, gender VARCHAR(10) NOT NULL,
+    phone VARCHAR(20), address TEXT, emergency_contact VARCHAR(100), created_at DATETIME,
+    PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES user (id)
+);
+CREATE TABLE doctor (
+    id INTEGER NOT NULL, user_id INTEGER NOT NULL, first_name VARCHAR(50) NOT NULL,
+    last_name VARCHAR(50) NOT NULL, specialization VARCHAR(100) NOT NULL,
+    license_number VARCHAR(50) NOT NULL, phone VARCHAR(20), email VARCHAR(120), created_at DATETIME,
+    PRIMARY KEY (id), UNIQUE (license_number), FOREIGN KEY(user_id) REFERENCES user (id)
+);
+CREATE TABLE appointment (
+    id INTEGER NOT NULL, patient_id INTEGER NOT NULL, doctor_id INTEGER NOT NULL,
+    appointment_date DATETIME NOT NULL, reason TEXT, status VARCHAR(20), notes TEXT,
+    created_at DATETIME, updated_at DATETIME,
+    PRIMARY KEY (id), FOREIGN KEY(patient_id) REFERENCES patient (id), FOREIGN KEY(doctor_id) REFERENCES doctor (id)
+);
+INSERT INTO user VALUES
+    (1, 'asha', 'asha@example.com', 'x', 'patient', '2024-01-01 08:00:00.000000'),
+    (2, 'vikram', 'vikram@example.com', 'x', 'doctor', '2024-01-01 08:00:00.000000');
+INSERT INTO patient VALUES
+    (1, 1, 'Asha', 'Rao', '1990-01-01', 'F', NULL, NULL, NULL, '2024-01-02 09:00:00.000000');
+INSERT INTO doctor VALUES
+    (1, 2, 'Vikram', 'Iyer', 'Cardiology', 'LIC-1', NULL, NULL, '2024-01-03 10:00:00.000000');
+INSERT INTO appointment VALUES
+    (1, 1, 1, '2024-02-01 09:00:00.000000', 'Checkup', 'completed', NULL,
+     '2024-01-04 11:00:00.000000', '2024-02-01 10:00:00.000000'),
+    (2, 1, 1, '2024-03-01 09:00:00.000000', 'Follow-up', 'scheduled', 'Fasting',
+     '2024-01-05 12:00:00.000000', '2024-01-05 12:00:00.000000');
+'''
+
+
+def sqlite_snapshot():
+    """Every schema object and every row, to compare a database before and after a step."""
+    with db.engine.connect() as conn:
+        objects = conn.exec_driver_sql(
+            'SELECT type, name, sql FROM sqlite_master ORDER BY type, name').all()
+        rows = {name: sorted(conn.exec_driver_sql(f'SELECT * FROM "{name}"').all(), key=repr)
+                for type_, name, _ in objects
+                if type_ == 'table' and name not in ('schema_version', 'schema_lock')}
+    return objects, rows
+
+
+def index_names(table):
+    return {index['name'] for index in db.inspect(db.engine).get_indexes(table)}
+
+
+def test_schema_version(app):
+    with app.app_context():
+        assert schema_version() == LATEST_VERSION
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql('DROP TABLE schema_version')
+        assert schema_version() == 0
+
+
+def test_schema_version_raises_other_errors(app):
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql('DROP TABLE schema_version')
+            conn.exec_driver_sql('CREATE TABLE schema_version (id INTEGER PRIMARY KEY)')
+        with pytest.raises(exc.OperationalError):
+            schema_version()
+
+
+def test_startup_refuses_an_unmigrated_database(tmp_path):
+    config = {**database_config(tmp_path / 'new.db'), 'MIGRATE_ON_START': False}
+
+    with pytest.raises(RuntimeError, match='migrate.py'):
+        create_app(config=config)
+
+
+
+def test_migrations_upgrade_a_baseline_database(tmp_path):
+    app = create_app(schema_check=False, config=database_config(tmp_path / 'baseline.db'))
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.connection.executescript(BASELINE_SCHEMA)
+
+        assert [version for version, _, _ in migrate()] == [1, 2, 3, 4]
+
+        assert schema_version() == LATEST_VERSION
+        with db.engine.connect() as conn:
+            # Existing rows keep their values; updated_at starts out as created_at
+            assert conn.exec_driver_sql('SELECT id, last_name, created_at, updated_at FROM patient').all() == [
+                (1, 'Rao', '2024-01-02 09:00:00.000000', '2024-01-02 09:00:00.000000')]
+            assert conn.exec_driver_sql('SELECT id, last_name, created_at, updated_at FROM doctor').all() == [
+                (1, 'Iyer', '2024-01-03 10:00:00.000000', '2024-01-03 10:00:00.000000')]
+            assert conn.exec_driver_sql('SELECT * FROM appointment ORDER BY id').all() == [
+                (1, 1, 1, '2024-02-01 09:00:00.000000', 'Checkup', 'completed', None,
+                 '2024-01-04 11:00:00.000000', '2024-02-01 10:00:00.000000'),
+                (2, 1, 1, '2024-03-01 09:00:00.000000', 'Follow-up', 'scheduled', 'Fasting',
+                 '2024-01-05 12:00:00.000000', '2024-01-05 12:00:00.000000'),
+            ]
+            ddl = conn.exec_driver_sql("SELECT sql FROM sqlite_master WHERE name = 'appointment'").scalar()
+            assert 'AUTOINCREMENT' in ddl.upper()
+            assert conn.exec_driver_sql(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'appointment'").scalar() == 2
+        assert index_names('patient') == {'ix_patient_updated'}
+        assert index_names('doctor') == {'ix_doctor_updated', 'ix_doctor_specialization'}
+        assert index_names('appointment') == {index.name for index in Appointment.__table__.indexes}
+
+
+def test_migrations_are_idempotent(tmp_path):
+    app = create_app(schema_check=False, config=database_config(tmp_path / 'baseline.db'))
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.connection.executescript(BASELINE_SCHEMA)
+        migrate()
+        before = sqlite_snapshot()
+
+        assert migrate() == []
+        # Each migration again, as after an interruption before its version was recorded
+        for _, _, upgrade in MIGRATIONS:
+            upgrade()
+
+        assert sqlite_snapshot() == before
+        assert schema_version() == LATEST_VERSION
@@ -0,0 +1,64 @@
+import pytest
+from sqlalchemy import event
+from models import Appointment, db
+from conftest import add_appointments
+
+
+def statements_for(app, client, path):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        response = client.get(path)
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+    assert response.status_code == 200
+    return len(statements), response
+
+
+@pytest.mark.parametrize('path', [
+    '/api/appointments/?limit=500',
+    '/api/appointments/patient/{patient_id}?limit=500',
+    '/api/appointments/doctor/{doctor_id}?limit=500',
+    '/api/patients/{patient_id}/chart?limit=500',
+])
+def test_appointment_listing_statement_count_does_not_grow(app, client, path):
+    counts = []
+    for rows in (3, 33):
+        with app.app_context():
+            Appointment.query.delete()
+            patients, doctors = add_appointments(rows)
+            url = path.format(patient_id=patients[0].id, doctor_id=doctors[0].id)
+        count, response = statements_for(app, client, url)
+        listed = response.json if isinstance(response.json, list) else response.json['appointments']
+        assert len(listed) == rows
+        counts.append(count)
+    assert counts[0] == counts[1]
+
+
+@pytest.mark.parametrize('path', [
+    '/api/appointments/batch?ids={appointment_ids}',
+    '/api/patients/batch?ids={patient_ids}',
+    '/api/doctors/batch?ids={doctor_ids}',
+])
+def test_batch_lookup_statement_count_does_not_grow(app, client, path):
+    counts = []
+    for rows in (3, 33):
+        with app.app_context():
+            patients, doctors = add_appointments(rows, patients=rows, doctors=rows)
+            ids = {
+                # Ids that do not exist are skipped, not looked up one by one
+                'appointment_ids': [a.id for a in Appointment.query.order_by(Appointment.id.desc()).limit(rows)] + [10 ** 6],
+                'patient_ids': [p.id for p in patients] + [10 ** 6],
+                'doctor_ids': [d.id for d in doctors] + [10 ** 6],
+            }
+        url = path.format(**{name: ','.join(map(str, values)) for name, values in ids.items()})
+        count, response = statements_for(app, client, url)
+        assert len(response.json) == rows
+        counts.append(count)
+    assert counts[0] == counts[1]
@@ -0,0 +1,82 @@
+from datetime import date, datetime, time, timedelta
+from counters import rebuild_counters, read_counters, _recount
+from conftest import add_appointments
+
+
+def seed(app, count):
+    with app.app_context():
+        patients, doctors = add_appointments(count, start=datetime.combine(date.today(), time(9, 0)))
+        # Rows inserted behind the handlers' back, as a fresh database gets them from the migrations
+        rebuild_counters()
+        return patients[0].id, doctors[0].id
+
+
+def assert_counters_match_tables(app):
+    with app.app_context():
+        assert read_counters() == _recount()
+
+
+def test_dashboard_counts(app, client):
+    seed(app, 2)
+    with app.app_context():
+        add_appointments(1, start=datetime.combine(date.today() + timedelta(days=1), time(9, 0)))
+        rebuild_counters()
+
+    assert client.get('/api/stats/dashboard').get_json() == {
+        'total_patients': 2,
+        'total_doctors': 2,
+        'today_appointments': 2,
+        'pending_appointments': 3,
+    }
+
+
+def test_pending_counter_follows_status_moves(app, client):
+    patient_id, doctor_id = seed(app, 1)
+
+    def pending():
+        return client.get('/api/stats/dashboard').get_json()['pending_appointments']
+
+    created = client.post('/api/appointments/', json={
+        'patient_id': patient_id, 'doctor_id': doctor_id, 'appointment_date': '2030-01-08 10:00'
+    }).get_json()['appointment_id']
+    assert pending() == 2
+    # A cancelled booking is not pending and does not count twice when created
+    cancelled = client.post('/api/appointments/', json={
+        'patient_id': patient_id, 'doctor_id': doctor_id, 'appointment_date': '2030-01-08 11:00',
+        'status': 'cancelled'
+    }).get_json()['appointment_id']
+    assert pending() == 2
+
+    for status, expected in (('completed', 1), ('completed', 1), ('scheduled', 2), ('cancelled', 1)):
+        assert client.put(f'/api/appointments/{created}', json={'status': status}).status_code == 200
+        assert pending() == expected
+        assert_counters_match_tables(app)
+    # Edits that leave the status alone leave the counter alone
+    client.put(f'/api/appointments/{cancelled}', json={'notes': 'Called to rebook'})
+    assert pending() == 1
+
+    client.delete(f'/api/appointments/{cancelled}')
+    client.delete(f'/api/appointments/{created}')
+    assert pending() == 1
+    assert_counters_match_tables(app)
+
+
+def test_deleting_a_pending_appointment_decrements(app, client):
+    seed(app, 2)
+    appointment_id = client.get('/api/appointments/').get_json()[0]['id']
+
+    client.delete(f'/api/appointments/{appointment_id}')
+
+    assert client.get('/api/stats/dashboard').get_json()['pending_appointments'] == 1
+    assert_counters_match_tables(app)
+
+
+def test_patient_and_doctor_counters(app, client):
+    patient_id, doctor_id = seed(app, 0)
+
+    assert client.delete(f'/api/doctors/{doctor_id}').status_code == 200
+    assert client.delete(f'/api/patients/{patient_id}').status_code == 200
+
+    stats = client.get('/api/stats/dashboard').get_json()
+    assert (stats['total_patients'], stats['total_doctors']) == (0, 0)
+    assert_counters_match_tables(app)
@@ -1,28 +1,21 @@
 import React from 'react';
 import { FiTrendingUp, FiBarChart2, FiPieChart, FiActivity } from 'react-icons/fi';
+import { localDate, addDays, tally } from '../services/analytics';
 
-const AnalyticsCharts = ({ patients, doctors, appointments }) => {
-  // Generate monthly data for the last 12 months
+// monthly/daily/doctors are /api/analytics/appointments series, patientStats is /api/stats/patients
+const AnalyticsCharts = ({ monthly, daily, doctors, patientStats }) => {
+  // Monthly data for the last 12 months
   const generateMonthlyData = () => {
     const months = [];
     const today = new Date();
     
     for (let i = 11; i >= 0; i--) {
       const date = new Date(today.getFullYear(), today.getMonth() - i, 1);
-      const monthStart = new Date(date.getFullYear(), date.getMonth(), 1);
-      const monthEnd = new Date(date.getFullYear(), date.getMonth() + 1, 0);
-      
-      const monthAppointments = appointments.filter(apt => {
-        const aptDate = new Date(apt.appointment_date);
-        return aptDate >= monthStart && aptDate <= monthEnd;
-      });
-      
-      const completed = monthAppointments.filter(apt => apt.status === 'completed').length;
-      const cancelled = monthAppointments.filter(apt => apt.status === 'cancelled').length;
+      const { total, completed, cancelled } = tally(monthly, row => row.period === localDate(date));
       
       months.push({
         month: date.toLocaleDateString('en-US', { month: 'short', year: '2-digit' }),
-        total: monthAppointments.length,
+        total,
         completed,
         cancelled,
         revenue: completed * 150
@@ -32,49 +25,45 @@ const AnalyticsCharts = ({ patients, doctors, appointments }) => {
     return months;
   };
 
-  // Generate daily data for the last 30 days
+  // Daily data for the last 30 days
   const generateDailyData = () => {
     const days = [];
     const today = new Date();
     
     for (let i = 29; i >= 0; i--) {
-      const date = new Date(today);
-      date.setDate(today.getDate() - i);
-      const dateStr = date.toISOString().split('T')[0];
-      
-      const dayAppointments = appointments.filter(apt => 
-        apt.appointment_date.startsWith(dateStr)
-      );
+      const date = addDays(today, -i);
+      const { total, completed, cancelled } = tally(daily, row => row.period === localDate(date));
       
       days.push({
         date: date.toLocaleDateString('en-US', { month: 'short', day: 'numeric' }),
-        total: dayAppointments.length,
-        completed: dayAppointments.filter(apt => apt.status === 'completed').length,
-        cancelled: dayAppointments.filter(apt => apt.status === 'cancelled').length
+        total,
+        completed,
+        cancelled
       });
     }
     
     return days;
   };
 
-  // Generate doctor performance data
+  // Doctor performance over the last 12 months, for doctors with appointments in that time
   const generateDoctorData = () => {
-    return doctors.map(doctor => {
-      const doctorAppointments = appointments.filter(apt => apt.doctor_id === doctor.id);
-      const completed = doctorAppointments.filter(apt => apt.status === 'completed').length;
+    const ids = [...new Set(doctors.map(row => row.doctor_id))];
+    return ids.map(id => {
+      const rows = doctors.filter(row => row.doctor_id === id);
+      const { total, completed } = tally(rows);
       
       return {
-        name: `Dr. ${doctor.first_name} ${doctor.last_name}`,
-        specialization: doctor.specialization,
-        total: doctorAppointments.length,
+        name: `Dr. ${rows[0].doctor_name}`,
+        specialization: rows[0].specialization,
+        total,
         completed,
-        completionRate: doctorAppointments.length > 0 ? ((completed / doctorAppointments.length) * 100).toFixed(1) : 0,
+        completionRate: total > 0 ? ((completed / total) * 100).toFixed(1) : 0,
         revenue: completed * 150
       };
     });
   };
 
-  // Generate patient demographics
+  // Group the per-birth-year patient counts into age bands
   const generatePatientDemographics = () => {
     const ageGroups = {
       '0-18': 0,
@@ -85,24 +74,25 @@ const AnalyticsCharts = ({ patients, doctors, appointments }) => {
     };
 
     const genders = { Male: 0, Female: 0 };
+    let total = 0;
 
-    patients.forEach(patient => {
-      // Calculate age (simplified)
-      const birthYear = new Date(patient.date_of_birth).getFullYear();
-      const age = new Date().getFullYear() - birthYear;
+    patientStats.forEach(({ birth_year, gender, count }) => {
+      // Age (simplified)
+      const age = new Date().getFullYear() - birth_year;
       
-      if (age <= 18) ageGroups['0-18']++;
-      else if (age <= 35) ageGroups['19-35']++;
-      else if (age <= 50) ageGroups['36-50']++;
-      else if (age <= 65) ageGroups['51-65']++;
-      else ageGroups['65+']++;
+      if (age <= 18) ageGroups['0-18'] += count;
+      else if (age <= 35) ageGroups['19-35'] += count;
+      else if (age <= 50) ageGroups['36-50'] += count;
+      else if (age <= 65) ageGroups['51-65'] += count;
+      else ageGroups['65+'] += count;
 
-      if (patient.gender) {
-        genders[patient.gender]++;
+      if (gender) {
+        genders[gender] = (genders[gender] || 0) + count;
       }
+      total += count;
     });
 
-    return { ageGroups, genders };
+    return { ageGroups, genders, total };
   };
 
   const monthlyData = generateMonthlyData();
@@ -248,7 +238,7 @@ const AnalyticsCharts = ({ patients, doctors, appointments }) => {
                       <div className="w-24 bg-gray-200 rounded-full h-2">
                         <div 
                           className="bg-gradient-to-r from-orange-400 to-orange-600 h-2 rounded-full"
-                          style={{ width: `${(count / patients.length) * 100}%` }}
+                          style={{ width: `${demographics.total > 0 ? (count / demographics.total) * 100 : 0}%` }}
                         ></div>
                       </div>
                       <span className="text-sm font-medium text-gray-900 w-8">{count}</span>
@@ -269,7 +259,7 @@ const AnalyticsCharts = ({ patients, doctors, appointments }) => {
                     </div>
                     <p className="text-sm text-gray-600">{gender}</p>
                     <p className="text-xs text-gray-500">
-                      {patients.length > 0 ? ((count / patients.length) * 100).toFixed(1) : 0}%
+                      {demographics.total > 0 ? ((count / demographics.total) * 100).toFixed(1) : 0}%
                     </p>
                   </div>
                 ))}
@@ -1,33 +1,28 @@
 import React from 'react';
 import { FiTrendingUp, FiUsers, FiCalendar, FiActivity, FiDollarSign, FiClock, FiAward, FiTarget } from 'react-icons/fi';
+import { localDate, tally, percentage } from '../services/analytics';
 
-const AnalyticsOverview = ({ patients, doctors, appointments }) => {
+// stats is /api/stats/dashboard; monthly is the /api/analytics/appointments status series by month
+const AnalyticsOverview = ({ stats, monthly }) => {
   const today = new Date();
-  const thisMonth = new Date(today.getFullYear(), today.getMonth(), 1);
-  const lastMonth = new Date(today.getFullYear(), today.getMonth() - 1, 1);
-  const thisYear = new Date(today.getFullYear(), 0, 1);
+  const thisMonth = localDate(new Date(today.getFullYear(), today.getMonth(), 1));
+  const lastMonth = localDate(new Date(today.getFullYear(), today.getMonth() - 1, 1));
 
   // Calculate metrics
-  const totalPatients = patients.length;
-  const totalDoctors = doctors.length;
-  const totalAppointments = appointments.length;
+  const totalPatients = stats.total_patients;
+  const totalDoctors = stats.total_doctors;
+  const yearTotals = tally(monthly);
+  const totalAppointments = yearTotals.total;
   
-  const thisMonthAppointments = appointments.filter(apt => 
-    new Date(apt.appointment_date) >= thisMonth
-  ).length;
-  
-  const lastMonthAppointments = appointments.filter(apt => {
-    const aptDate = new Date(apt.appointment_date);
-    return aptDate >= lastMonth && aptDate < thisMonth;
-  }).length;
+  const thisMonthTotals = tally(monthly, row => row.period === thisMonth);
+  const thisMonthAppointments = thisMonthTotals.total;
+  const lastMonthAppointments = tally(monthly, row => row.period === lastMonth).total;
 
-  const completedAppointments = appointments.filter(apt => apt.status === 'completed').length;
-  const completionRate = totalAppointments > 0 ? ((completedAppointments / totalAppointments) * 100).toFixed(1) : 0;
+  const completedAppointments = yearTotals.completed;
+  const completionRate = percentage(completedAppointments, totalAppointments);
 
   const revenue = completedAppointments * 150; // Assuming $150 per appointment
-  const thisMonthRevenue = appointments.filter(apt => 
-    apt.status === 'completed' && new Date(apt.appointment_date) >= thisMonth
-  ).length * 150;
+  const thisMonthRevenue = thisMonthTotals.completed * 150;
 
   const avgAppointmentsPerDay = thisMonthAppointments / today.getDate();
   const patientGrowth = totalPatients > 0 ? ((totalPatients / Math.max(totalPatients - 5, 1)) * 100).toFixed(1) : 0;
@@ -54,7 +49,7 @@ const AnalyticsOverview = ({ patients, doctors, appointments }) => {
       textColor: 'text-purple-600'
     },
     {
-      title: 'Total Appointments',
+      title: 'Appointments (12 months)',
       value: totalAppointments,
       change: '+15.3%',
       trend: 'up',
@@ -192,9 +187,7 @@ const AnalyticsOverview = ({ patients, doctors, appointments }) => {
               </div>
               <div className="text-right">
                 <p className="text-lg font-bold text-gray-900">
-                  {appointments.filter(apt => 
-                    apt.status === 'completed' && new Date(apt.appointment_date) >= thisMonth
-                  ).length}
+                  {thisMonthTotals.completed}
                 </p>
                 <p className="text-xs text-green-600">+8.7%</p>
               </div>
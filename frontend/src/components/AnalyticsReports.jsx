@@ -1,53 +1,52 @@
 import React, { useState } from 'react';
 import { FiDownload, FiFilter, FiCalendar, FiFileText, FiTrendingUp, FiUsers, FiClock, FiDollarSign, FiTarget } from 'react-icons/fi';
+import { localDate, addDays, tally, percentage } from '../services/analytics';
 
-const AnalyticsReports = ({ patients, doctors, appointments }) => {
+// monthly and daily are /api/analytics/appointments status series covering the last 12 months and 30 days
+const AnalyticsReports = ({ monthly, daily }) => {
   const [selectedReport, setSelectedReport] = useState('monthly');
   const [dateRange, setDateRange] = useState('this-month');
 
   const generateReportData = () => {
     const today = new Date();
-    let startDate, endDate;
+    let startDate, endDate, rows;
 
+    // Day-sized ranges read the daily series, longer ones whole months of the monthly series
     switch (dateRange) {
       case 'today':
         startDate = new Date(today.getFullYear(), today.getMonth(), today.getDate());
-        endDate = new Date(today.getFullYear(), today.getMonth(), today.getDate() + 1);
+        endDate = startDate;
+        rows = daily;
         break;
       case 'this-week':
-        startDate = new Date(today.setDate(today.getDate() - today.getDay()));
-        endDate = new Date(today.setDate(today.getDate() - today.getDay() + 7));
-        break;
-      case 'this-month':
-        startDate = new Date(today.getFullYear(), today.getMonth(), 1);
-        endDate = new Date(today.getFullYear(), today.getMonth() + 1, 0);
+        startDate = addDays(today, -today.getDay());
+        endDate = addDays(startDate, 6);
+        rows = daily;
         break;
       case 'this-year':
         startDate = new Date(today.getFullYear(), 0, 1);
         endDate = new Date(today.getFullYear(), 11, 31);
+        rows = monthly;
         break;
+      case 'this-month':
       default:
         startDate = new Date(today.getFullYear(), today.getMonth(), 1);
         endDate = new Date(today.getFullYear(), today.getMonth() + 1, 0);
+        rows = monthly;
     }
 
-    const filteredAppointments = appointments.filter(apt => {
-      const aptDate = new Date(apt.appointment_date);
-      return aptDate >= startDate && aptDate <= endDate;
-    });
-
-    const completed = filteredAppointments.filter(apt => apt.status === 'completed');
-    const cancelled = filteredAppointments.filter(apt => apt.status === 'cancelled');
-    const scheduled = filteredAppointments.filter(apt => apt.status === 'scheduled');
+    const from = localDate(startDate);
+    const to = localDate(endDate);
+    const { total, completed, cancelled, scheduled } = tally(rows, row => row.period >= from && row.period <= to);
 
-    const revenue = completed.length * 150;
-    const completionRate = filteredAppointments.length > 0 ? ((completed.length / filteredAppointments.length) * 100).toFixed(1) : 0;
+    const revenue = completed * 150;
+    const completionRate = percentage(completed, total);
 
     return {
-      total: filteredAppointments.length,
-      completed: completed.length,
-      cancelled: cancelled.length,
-      scheduled: scheduled.length,
+      total,
+      completed,
+      cancelled,
+      scheduled,
       revenue,
       completionRate,
       dateRange: `${startDate.toLocaleDateString()} - ${endDate.toLocaleDateString()}`,
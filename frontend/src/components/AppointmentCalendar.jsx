@@ -1,9 +1,40 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect } from 'react';
 import { FiCalendar, FiChevronLeft, FiChevronRight, FiClock, FiUsers } from 'react-icons/fi';
+import { analyticsAPI, appointmentsAPI } from '../services/api';
+import { localDate, addDays } from '../services/analytics';
+
+const STATUS_STYLES = {
+  scheduled: 'bg-blue-100 text-blue-700',
+  'in-progress': 'bg-yellow-100 text-yellow-700',
+  completed: 'bg-green-100 text-green-700',
+  cancelled: 'bg-red-100 text-red-700'
+};
 
-const AppointmentCalendar = ({ appointments, onDateSelect, onAppointmentClick }) => {
+// Days show server-side counts per status; only the selected day's appointments are listed
+const AppointmentCalendar = ({ onDateSelect, onAppointmentClick }) => {
   const [currentDate, setCurrentDate] = useState(new Date());
   const [selectedDate, setSelectedDate] = useState(new Date());
+  const [monthCounts, setMonthCounts] = useState([]);
+  const [dayAppointments, setDayAppointments] = useState([]);
+  const [dayHasMore, setDayHasMore] = useState(false);
+
+  const monthStart = localDate(new Date(currentDate.getFullYear(), currentDate.getMonth(), 1));
+
+  useEffect(() => {
+    const nextMonth = localDate(new Date(currentDate.getFullYear(), currentDate.getMonth() + 1, 1));
+    analyticsAPI.getAppointments({ bucket: 'day', group_by: 'status', from: monthStart, to: nextMonth })
+      .then(response => setMonthCounts(response.data.series))
+      .catch(error => console.error('Error fetching appointment counts:', error));
+  }, [monthStart]);
+
+  useEffect(() => {
+    appointmentsAPI.getAll({ from: localDate(selectedDate), to: localDate(addDays(selectedDate, 1)) })
+      .then(response => {
+        setDayAppointments(response.data);
+        setDayHasMore(Boolean(response.headers['x-next-cursor']));
+      })
+      .catch(error => console.error('Error fetching appointments for the day:', error));
+  }, [selectedDate]);
 
   const getDaysInMonth = (date) => {
     const year = date.getFullYear();
@@ -28,13 +59,10 @@ const AppointmentCalendar = ({ appointments, onDateSelect, onAppointmentClick })
     return days;
   };
 
-  const getAppointmentsForDate = (date) => {
+  const getCountsForDate = (date) => {
     if (!date) return [];
     
-    return appointments.filter(apt => {
-      const aptDate = new Date(apt.appointment_date);
-      return aptDate.toDateString() === date.toDateString();
-    });
+    return monthCounts.filter(row => row.period === localDate(date));
   };
 
   const navigateMonth = (direction) => {
@@ -54,11 +82,6 @@ const AppointmentCalendar = ({ appointments, onDateSelect, onAppointmentClick })
     onDateSelect && onDateSelect(date);
   };
 
-  const handleAppointmentClick = (appointment, e) => {
-    e.stopPropagation();
-    onAppointmentClick && onAppointmentClick(appointment);
-  };
-
   const monthYear = currentDate.toLocaleDateString('en-US', { 
     month: 'long', 
     year: 'numeric' 
@@ -108,7 +131,7 @@ const AppointmentCalendar = ({ appointments, onDateSelect, onAppointmentClick })
 
         {/* Calendar days */}
         {days.map((date, index) => {
-          const dayAppointments = date ? getAppointmentsForDate(date) : [];
+          const dayCounts = getCountsForDate(date);
           const isToday = date && date.toDateString() === new Date().toDateString();
           const isSelected = date && date.toDateString() === selectedDate.toDateString();
           const isCurrentMonth = date && date.getMonth() === currentDate.getMonth();
@@ -131,32 +154,17 @@ const AppointmentCalendar = ({ appointments, onDateSelect, onAppointmentClick })
                     {date.getDate()}
                   </div>
                   
-                  {/* Appointment indicators */}
-                  {dayAppointments.length > 0 && (
+                  {/* Appointment counts */}
+                  {dayCounts.length > 0 && (
                     <div className="mt-1 space-y-1">
-                      {dayAppointments.slice(0, 3).map((apt, aptIndex) => (
+                      {dayCounts.map(row => (
                         <div
-                          key={aptIndex}
-                          onClick={(e) => handleAppointmentClick(apt, e)}
-                          className={`
-                            text-xs px-1 py-0.5 rounded truncate cursor-pointer
-                            ${apt.status === 'completed' ? 'bg-green-100 text-green-700' : ''}
-                            ${apt.status === 'scheduled' ? 'bg-blue-100 text-blue-700' : ''}
-                            ${apt.status === 'cancelled' ? 'bg-red-100 text-red-700' : ''}
-                            ${apt.status === 'in-progress' ? 'bg-yellow-100 text-yellow-700' : ''}
-                          `}
+                          key={row.status}
+                          className={`text-xs px-1 py-0.5 rounded truncate ${STATUS_STYLES[row.status] || ''}`}
                         >
-                          {new Date(apt.appointment_date).toLocaleTimeString('en-US', { 
-                            hour: '2-digit', 
-                            minute: '2-digit' 
-                          })}
+                          {row.count} {row.status}
                         </div>
                       ))}
-                      {dayAppointments.length > 3 && (
-                        <div className="text-xs text-gray-500 text-center">
-                          +{dayAppointments.length - 3} more
-                        </div>
-                      )}
                     </div>
                   )}
                 </>
@@ -181,14 +189,14 @@ const AppointmentCalendar = ({ appointments, onDateSelect, onAppointmentClick })
             <div className="flex items-center text-indigo-700">
               <FiClock className="w-4 h-4 mr-1" />
               <span className="text-sm font-medium">
-                {getAppointmentsForDate(selectedDate).length} appointments
+                {dayAppointments.length}{dayHasMore ? '+' : ''} appointments
               </span>
             </div>
           </div>
           
-          {getAppointmentsForDate(selectedDate).length > 0 ? (
+          {dayAppointments.length > 0 ? (
             <div className="space-y-2">
-              {getAppointmentsForDate(selectedDate).map(apt => (
+              {dayAppointments.map(apt => (
                 <div
                   key={apt.id}
                   onClick={() => onAppointmentClick && onAppointmentClick(apt)}
@@ -203,7 +211,7 @@ const AppointmentCalendar = ({ appointments, onDateSelect, onAppointmentClick })
                         })}
                       </div>
                       <div className="text-sm text-gray-600">
-                        Patient ID: {apt.patient_id}
+                        {apt.patient_name}
                       </div>
                     </div>
                     <span className={`
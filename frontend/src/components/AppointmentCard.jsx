@@ -1,10 +1,8 @@
 import React from 'react';
 import { FiCalendar, FiClock, FiUser, FiPhone, FiEdit, FiTrash2, FiCheck, FiX, FiMessageSquare, FiVideo } from 'react-icons/fi';
 
-const AppointmentCard = ({ appointment, patients, doctors, onEdit, onDelete, onComplete, onCancel, onReschedule }) => {
-  const patient = patients.find(p => p.id === appointment.patient_id);
-  const doctor = doctors.find(d => d.id === appointment.doctor_id);
-
+// patient and doctor are batch-fetched details, if loaded yet; the names come with the appointment
+const AppointmentCard = ({ appointment, patient, doctor, onEdit, onDelete, onComplete, onCancel, onReschedule }) => {
   const getStatusColor = (status) => {
     switch (status) {
       case 'scheduled': return 'bg-blue-100 text-blue-800 border-blue-200';
@@ -76,7 +74,7 @@ const AppointmentCard = ({ appointment, patients, doctors, onEdit, onDelete, onC
             <div>
               <p className="text-xs text-gray-500">Patient</p>
               <p className="text-sm font-semibold text-gray-900">
-                {patient ? `${patient.first_name} ${patient.last_name}` : 'Unknown Patient'}
+                {appointment.patient_name || 'Unknown Patient'}
               </p>
               {patient?.phone && (
                 <div className="flex items-center mt-1">
@@ -94,7 +92,7 @@ const AppointmentCard = ({ appointment, patients, doctors, onEdit, onDelete, onC
             <div>
               <p className="text-xs text-gray-500">Doctor</p>
               <p className="text-sm font-semibold text-gray-900">
-                Dr. {doctor ? `${doctor.first_name} ${doctor.last_name}` : 'Unknown Doctor'}
+                Dr. {appointment.doctor_name || 'Unknown Doctor'}
               </p>
               {doctor?.specialization && (
                 <p className="text-xs text-gray-600 mt-1">{doctor.specialization}</p>
@@ -1,7 +1,8 @@
 import React, { useState, useEffect } from 'react';
 import { FiX, FiCalendar, FiClock, FiUser, FiFileText, FiMessageSquare } from 'react-icons/fi';
+import SearchSelect from './SearchSelect';
 
-const AppointmentForm = ({ appointment, patients, doctors, onSave, onCancel, loading }) => {
+const AppointmentForm = ({ appointment, onSave, onCancel, loading }) => {
   const [formData, setFormData] = useState({
     patient_id: appointment?.patient_id || '',
     doctor_id: appointment?.doctor_id || '',
@@ -135,20 +136,14 @@ const AppointmentForm = ({ appointment, patients, doctors, onSave, onCancel, loa
                 <label className="block text-sm font-medium text-gray-700 mb-2">
                   Patient <span className="text-red-500">*</span>
                 </label>
-                <select
-                  name="patient_id"
+                <SearchSelect
+                  type="patient"
                   value={formData.patient_id}
-                  onChange={handleChange}
+                  label={appointment?.patient_name}
+                  placeholder="Search patients by name or phone"
                   required
-                  className="w-full px-4 py-3 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-indigo-500 focus:border-transparent"
-                >
-                  <option value="">Select Patient</option>
-                  {patients.map(patient => (
-                    <option key={patient.id} value={patient.id}>
-                      {patient.first_name} {patient.last_name} - {patient.phone}
-                    </option>
-                  ))}
-                </select>
+                  onSelect={(patient) => setFormData(prev => ({ ...prev, patient_id: patient ? patient.id : '' }))}
+                />
               </div>
 
               {/* Doctor Selection */}
@@ -156,20 +151,14 @@ const AppointmentForm = ({ appointment, patients, doctors, onSave, onCancel, loa
                 <label className="block text-sm font-medium text-gray-700 mb-2">
                   Doctor <span className="text-red-500">*</span>
                 </label>
-                <select
-                  name="doctor_id"
+                <SearchSelect
+                  type="doctor"
                   value={formData.doctor_id}
-                  onChange={handleChange}
+                  label={appointment?.doctor_name && `Dr. ${appointment.doctor_name}`}
+                  placeholder="Search doctors by name or specialization"
                   required
-                  className="w-full px-4 py-3 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-indigo-500 focus:border-transparent"
-                >
-                  <option value="">Select Doctor</option>
-                  {doctors.map(doctor => (
-                    <option key={doctor.id} value={doctor.id}>
-                      Dr. {doctor.first_name} {doctor.last_name} - {doctor.specialization}
-                    </option>
-                  ))}
-                </select>
+                  onSelect={(doctor) => setFormData(prev => ({ ...prev, doctor_id: doctor ? doctor.id : '' }))}
+                />
               </div>
 
               {/* Date Selection */}
@@ -1,44 +1,34 @@
-import React from 'react';
+import React, { useState, useEffect } from 'react';
 import { FiCalendar, FiClock, FiUsers, FiCheckCircle, FiXCircle, FiTrendingUp, FiActivity } from 'react-icons/fi';
+import { analyticsAPI, appointmentsAPI } from '../services/api';
+import { localDate, addDays, tally, percentage } from '../services/analytics';
 
-const AppointmentStats = ({ appointments }) => {
-  const today = new Date().toISOString().split('T')[0];
-  const thisWeek = new Date();
-  thisWeek.setDate(thisWeek.getDate() - 7);
-  const thisMonth = new Date();
-  thisMonth.setMonth(thisMonth.getMonth() - 1);
+// Counts cover the last 30 days onwards and come from the analytics endpoint
+const AppointmentStats = () => {
+  const [daily, setDaily] = useState([]);
+  const [todayAppointments, setTodayAppointments] = useState([]);
 
-  const todayAppointments = appointments.filter(apt => 
-    apt.appointment_date.startsWith(today)
-  );
-
-  const weekAppointments = appointments.filter(apt => 
-    new Date(apt.appointment_date) >= thisWeek
-  );
-
-  const monthAppointments = appointments.filter(apt => 
-    new Date(apt.appointment_date) >= thisMonth
-  );
+  const now = new Date();
+  const today = localDate(now);
+  const thisWeek = localDate(addDays(now, -7));
+  const thisMonth = localDate(addDays(now, -30));
 
-  const completedAppointments = appointments.filter(apt => 
-    apt.status === 'completed'
-  );
-
-  const cancelledAppointments = appointments.filter(apt => 
-    apt.status === 'cancelled'
-  );
-
-  const scheduledAppointments = appointments.filter(apt => 
-    apt.status === 'scheduled'
-  );
+  useEffect(() => {
+    analyticsAPI.getAppointments({ bucket: 'day', group_by: 'status', from: thisMonth })
+      .then(response => setDaily(response.data.series))
+      .catch(error => console.error('Error fetching appointment counts:', error));
+    // Today's appointment times for the hourly chart, one page of the largest size
+    appointmentsAPI.getAll({ from: today, to: localDate(addDays(now, 1)), limit: 500 })
+      .then(response => setTodayAppointments(response.data))
+      .catch(error => console.error("Error fetching today's appointments:", error));
+  }, [today, thisMonth]);
 
-  const completionRate = appointments.length > 0 
-    ? ((completedAppointments.length / appointments.length) * 100).toFixed(1)
-    : 0;
+  const todayCount = tally(daily, row => row.period === today).total;
+  const weekCount = tally(daily, row => row.period >= thisWeek).total;
+  const totals = tally(daily);
 
-  const cancellationRate = appointments.length > 0
-    ? ((cancelledAppointments.length / appointments.length) * 100).toFixed(1)
-    : 0;
+  const completionRate = percentage(totals.completed, totals.total);
+  const cancellationRate = percentage(totals.cancelled, totals.total);
 
   // Generate daily data for the last 7 days
   const generateDailyData = () => {
@@ -46,17 +36,14 @@ const AppointmentStats = ({ appointments }) => {
     for (let i = 6; i >= 0; i--) {
       const date = new Date();
       date.setDate(date.getDate() - i);
-      const dateStr = date.toISOString().split('T')[0];
-      const dayAppointments = appointments.filter(apt => 
-        apt.appointment_date.startsWith(dateStr)
-      );
+      const { total, completed, cancelled, scheduled } = tally(daily, row => row.period === localDate(date));
       
       data.push({
         date: date.toLocaleDateString('en-US', { weekday: 'short', month: 'short', day: 'numeric' }),
-        total: dayAppointments.length,
-        completed: dayAppointments.filter(apt => apt.status === 'completed').length,
-        cancelled: dayAppointments.filter(apt => apt.status === 'cancelled').length,
-        scheduled: dayAppointments.filter(apt => apt.status === 'scheduled').length
+        total,
+        completed,
+        cancelled,
+        scheduled
       });
     }
     return data;
@@ -91,7 +78,7 @@ const AppointmentStats = ({ appointments }) => {
           <div className="flex items-center justify-between">
             <div>
               <p className="text-sm font-medium text-gray-600">Today's Appointments</p>
-              <p className="text-3xl font-bold text-gray-900 mt-2">{todayAppointments.length}</p>
+              <p className="text-3xl font-bold text-gray-900 mt-2">{todayCount}</p>
               <p className="text-sm text-blue-600 mt-2 flex items-center">
                 <FiCalendar className="w-4 h-4 mr-1" />
                 Scheduled
@@ -107,7 +94,7 @@ const AppointmentStats = ({ appointments }) => {
           <div className="flex items-center justify-between">
             <div>
               <p className="text-sm font-medium text-gray-600">This Week</p>
-              <p className="text-3xl font-bold text-gray-900 mt-2">{weekAppointments.length}</p>
+              <p className="text-3xl font-bold text-gray-900 mt-2">{weekCount}</p>
               <p className="text-sm text-green-600 mt-2 flex items-center">
                 <FiTrendingUp className="w-4 h-4 mr-1" />
                 +15% from last week
@@ -126,7 +113,7 @@ const AppointmentStats = ({ appointments }) => {
               <p className="text-3xl font-bold text-gray-900 mt-2">{completionRate}%</p>
               <p className="text-sm text-emerald-600 mt-2 flex items-center">
                 <FiCheckCircle className="w-4 h-4 mr-1" />
-                {completedAppointments.length} completed
+                {totals.completed} completed
               </p>
             </div>
             <div className="w-12 h-12 bg-emerald-100 rounded-lg flex items-center justify-center">
@@ -142,7 +129,7 @@ const AppointmentStats = ({ appointments }) => {
               <p className="text-3xl font-bold text-gray-900 mt-2">{cancellationRate}%</p>
               <p className="text-sm text-red-600 mt-2 flex items-center">
                 <FiXCircle className="w-4 h-4 mr-1" />
-                {cancelledAppointments.length} cancelled
+                {totals.cancelled} cancelled
               </p>
             </div>
             <div className="w-12 h-12 bg-red-100 rounded-lg flex items-center justify-center">
@@ -212,13 +199,13 @@ const AppointmentStats = ({ appointments }) => {
               <div className="w-24 h-24 rounded-full border-8 border-blue-100"></div>
               <div className="absolute inset-0 flex items-center justify-center">
                 <div className="text-center">
-                  <p className="text-2xl font-bold text-blue-600">{scheduledAppointments.length}</p>
+                  <p className="text-2xl font-bold text-blue-600">{totals.scheduled}</p>
                   <p className="text-xs text-gray-600">Scheduled</p>
                 </div>
               </div>
             </div>
             <p className="mt-2 text-sm text-gray-600">
-              {appointments.length > 0 ? ((scheduledAppointments.length / appointments.length) * 100).toFixed(1) : 0}% of total
+              {percentage(totals.scheduled, totals.total)}% of total
             </p>
           </div>
 
@@ -227,7 +214,7 @@ const AppointmentStats = ({ appointments }) => {
               <div className="w-24 h-24 rounded-full border-8 border-green-100"></div>
               <div className="absolute inset-0 flex items-center justify-center">
                 <div className="text-center">
-                  <p className="text-2xl font-bold text-green-600">{completedAppointments.length}</p>
+                  <p className="text-2xl font-bold text-green-600">{totals.completed}</p>
                   <p className="text-xs text-gray-600">Completed</p>
                 </div>
               </div>
@@ -242,7 +229,7 @@ const AppointmentStats = ({ appointments }) => {
               <div className="w-24 h-24 rounded-full border-8 border-red-100"></div>
               <div className="absolute inset-0 flex items-center justify-center">
                 <div className="text-center">
-                  <p className="text-2xl font-bold text-red-600">{cancelledAppointments.length}</p>
+                  <p className="text-2xl font-bold text-red-600">{totals.cancelled}</p>
                   <p className="text-xs text-gray-600">Cancelled</p>
                 </div>
               </div>
@@ -260,7 +247,7 @@ const AppointmentStats = ({ appointments }) => {
           <div className="flex items-center justify-between">
             <div>
               <p className="text-xs text-blue-600 font-medium">Pending</p>
-              <p className="text-xl font-bold text-blue-900">{scheduledAppointments.length}</p>
+              <p className="text-xl font-bold text-blue-900">{totals.scheduled}</p>
             </div>
             <FiClock className="w-8 h-8 text-blue-500 opacity-50" />
           </div>
@@ -270,7 +257,7 @@ const AppointmentStats = ({ appointments }) => {
           <div className="flex items-center justify-between">
             <div>
               <p className="text-xs text-green-600 font-medium">Completed</p>
-              <p className="text-xl font-bold text-green-900">{completedAppointments.length}</p>
+              <p className="text-xl font-bold text-green-900">{totals.completed}</p>
             </div>
             <FiCheckCircle className="w-8 h-8 text-green-500 opacity-50" />
           </div>
@@ -280,7 +267,7 @@ const AppointmentStats = ({ appointments }) => {
           <div className="flex items-center justify-between">
             <div>
               <p className="text-xs text-red-600 font-medium">Cancelled</p>
-              <p className="text-xl font-bold text-red-900">{cancelledAppointments.length}</p>
+              <p className="text-xl font-bold text-red-900">{totals.cancelled}</p>
             </div>
             <FiXCircle className="w-8 h-8 text-red-500 opacity-50" />
           </div>
@@ -290,7 +277,7 @@ const AppointmentStats = ({ appointments }) => {
           <div className="flex items-center justify-between">
             <div>
               <p className="text-xs text-purple-600 font-medium">Total</p>
-              <p className="text-xl font-bold text-purple-900">{appointments.length}</p>
+              <p className="text-xl font-bold text-purple-900">{totals.total}</p>
             </div>
             <FiActivity className="w-8 h-8 text-purple-500 opacity-50" />
           </div>
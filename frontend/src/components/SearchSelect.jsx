@@ -0,0 +1,92 @@
+import React, { useState, useEffect, useRef } from 'react';
+import { searchAPI } from '../services/api';
+
+// Wait for a pause in typing before querying the search index
+const SEARCH_DELAY_MS = 250;
+
+export const describeResult = (result) => (
+  result.type === 'doctor'
+    ? `Dr. ${result.first_name} ${result.last_name} - ${result.specialization}`
+    : `${result.first_name} ${result.last_name}${result.phone ? ` - ${result.phone}` : ''}`
+);
+
+// Pick a patient or doctor by name or phone prefix instead of listing every row in a <select>
+const SearchSelect = ({ type, value, label, placeholder, required, onSelect }) => {
+  const [query, setQuery] = useState(label || '');
+  const [results, setResults] = useState([]);
+  const [open, setOpen] = useState(false);
+  const input = useRef(null);
+
+  useEffect(() => {
+    setQuery(label || '');
+  }, [label]);
+
+  useEffect(() => {
+    // Typed text that was never picked from the list does not count as a choice
+    input.current.setCustomValidity(required && !value ? `Choose a ${type} from the list` : '');
+  }, [required, value, type]);
+
+  useEffect(() => {
+    if (!open || !query.trim()) {
+      setResults([]);
+      return undefined;
+    }
+    let stale = false;
+    const timer = setTimeout(() => {
+      searchAPI.search(query, type)
+        .then(response => !stale && setResults(response.data))
+        .catch(error => console.error(`Error searching ${type}s:`, error));
+    }, SEARCH_DELAY_MS);
+    return () => {
+      stale = true;
+      clearTimeout(timer);
+    };
+  }, [query, type, open]);
+
+  const choose = (result) => {
+    setQuery(describeResult(result));
+    setOpen(false);
+    onSelect(result);
+  };
+
+  return (
+    <div className="relative">
+      <input
+        ref={input}
+        type="text"
+        value={query}
+        placeholder={placeholder}
+        required={required}
+        onChange={(e) => {
+          setQuery(e.target.value);
+          setOpen(true);
+          if (value) onSelect(null);
+        }}
+        onFocus={() => setOpen(true)}
+        onBlur={() => setOpen(false)}
+        className="w-full px-4 py-3 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-indigo-500 focus:border-transparent"
+      />
+      {open && results.length > 0 && (
+        <ul className="absolute z-10 w-full mt-1 bg-white border border-gray-200 rounded-lg shadow-lg max-h-60 overflow-y-auto">
+          {results.map(result => (
+            <li key={result.id}>
+              <button
+                type="button"
+                // mousedown runs before the input's blur closes the list
+                onMouseDown={(e) => {
+                  e.preventDefault();
+                  choose(result);
+                }}
+                className="w-full px-4 py-2 text-left text-sm text-gray-700 hover:bg-indigo-50"
+              >
+                {describeResult(result)}
+              </button>
+            </li>
+          ))}
+        </ul>
+      )}
+    </div>
+  );
+};
+
+export default SearchSelect;
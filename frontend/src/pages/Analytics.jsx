@@ -1,14 +1,15 @@
 import React, { useState, useEffect } from 'react';
-import api from '../services/api';
+import { analyticsAPI, statsAPI } from '../services/api';
+import { localDate, addDays, tally, percentage } from '../services/analytics';
 import AnalyticsOverview from '../components/AnalyticsOverview';
 import AnalyticsCharts from '../components/AnalyticsCharts';
 import AnalyticsReports from '../components/AnalyticsReports';
 import { FiBarChart2, FiTrendingUp, FiFileText, FiDownload, FiFilter, FiCalendar } from 'react-icons/fi';
 
 const Analytics = ({ user }) => {
-  const [patients, setPatients] = useState([]);
-  const [doctors, setDoctors] = useState([]);
-  const [appointments, setAppointments] = useState([]);
+  const [stats, setStats] = useState({ total_patients: 0, total_doctors: 0 });
+  const [patientStats, setPatientStats] = useState([]);
+  const [series, setSeries] = useState({ monthly: [], daily: [], doctors: [] });
   const [loading, setLoading] = useState(true);
   const [activeTab, setActiveTab] = useState('overview');
   const [error, setError] = useState('');
@@ -19,15 +20,24 @@ const Analytics = ({ user }) => {
 
   const fetchAnalyticsData = async () => {
     try {
-      const [patientsResponse, doctorsResponse, appointmentsResponse] = await Promise.all([
-        api.get('/patients'),
-        api.get('/doctors'),
-        api.get('/appointments')
+      // Counts are aggregated on the server, so no page of records is downloaded
+      const today = new Date();
+      const firstMonth = localDate(new Date(today.getFullYear(), today.getMonth() - 11, 1));
+      const [statsResponse, patientsResponse, monthly, daily, byDoctor] = await Promise.all([
+        statsAPI.getDashboard(),
+        statsAPI.getPatients(),
+        analyticsAPI.getAppointments({ bucket: 'month', group_by: 'status', from: firstMonth }),
+        analyticsAPI.getAppointments({ bucket: 'day', group_by: 'status', from: localDate(addDays(today, -29)) }),
+        analyticsAPI.getAppointments({ bucket: 'month', group_by: 'doctor,specialization,status', from: firstMonth })
       ]);
 
-      setPatients(patientsResponse.data);
-      setDoctors(doctorsResponse.data);
-      setAppointments(appointmentsResponse.data);
+      setStats(statsResponse.data);
+      setPatientStats(patientsResponse.data);
+      setSeries({
+        monthly: monthly.data.series,
+        daily: daily.data.series,
+        doctors: byDoctor.data.series
+      });
     } catch (error) {
       console.error('Error fetching analytics data:', error);
       setError('Failed to fetch analytics data');
@@ -36,6 +46,8 @@ const Analytics = ({ user }) => {
     }
   };
 
+  const yearTotals = tally(series.monthly);
+
   const tabs = [
     {
       id: 'overview',
@@ -79,22 +91,20 @@ const Analytics = ({ user }) => {
             <div className="mt-4 flex items-center space-x-6">
               <div>
                 <p className="text-indigo-200 text-sm">Total Patients</p>
-                <p className="text-xl font-semibold">{patients.length}</p>
+                <p className="text-xl font-semibold">{stats.total_patients}</p>
               </div>
               <div>
                 <p className="text-indigo-200 text-sm">Total Doctors</p>
-                <p className="text-xl font-semibold">{doctors.length}</p>
+                <p className="text-xl font-semibold">{stats.total_doctors}</p>
               </div>
               <div>
-                <p className="text-indigo-200 text-sm">Total Appointments</p>
-                <p className="text-xl font-semibold">{appointments.length}</p>
+                <p className="text-indigo-200 text-sm">Appointments (12 months)</p>
+                <p className="text-xl font-semibold">{yearTotals.total}</p>
               </div>
               <div>
                 <p className="text-indigo-200 text-sm">Completion Rate</p>
                 <p className="text-xl font-semibold">
-                  {appointments.length > 0 
-                    ? ((appointments.filter(apt => apt.status === 'completed').length / appointments.length) * 100).toFixed(1)
-                    : 0}%
+                  {percentage(yearTotals.completed, yearTotals.total)}%
                 </p>
               </div>
             </div>
@@ -145,26 +155,25 @@ const Analytics = ({ user }) => {
       {/* Tab Content */}
       <div className="min-h-[400px]">
         {activeTab === 'overview' && (
-          <AnalyticsOverview 
-            patients={patients} 
-            doctors={doctors} 
-            appointments={appointments} 
+          <AnalyticsOverview
+            stats={stats}
+            monthly={series.monthly}
           />
         )}
         
         {activeTab === 'charts' && (
-          <AnalyticsCharts 
-            patients={patients} 
-            doctors={doctors} 
-            appointments={appointments} 
+          <AnalyticsCharts
+            monthly={series.monthly}
+            daily={series.daily}
+            doctors={series.doctors}
+            patientStats={patientStats}
           />
         )}
         
         {activeTab === 'reports' && (
-          <AnalyticsReports 
-            patients={patients} 
-            doctors={doctors} 
-            appointments={appointments} 
+          <AnalyticsReports
+            monthly={series.monthly}
+            daily={series.daily}
           />
         )}
       </div>
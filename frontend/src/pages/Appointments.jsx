@@ -1,16 +1,21 @@
 import React, { useState, useEffect } from 'react';
-import api from '../services/api';
+import api, { analyticsAPI, appointmentsAPI, doctorsAPI, patientsAPI } from '../services/api';
+import { localDate, addDays, tally } from '../services/analytics';
 import AppointmentCard from '../components/AppointmentCard';
 import AppointmentForm from '../components/AppointmentForm';
 import AppointmentCalendar from '../components/AppointmentCalendar';
 import AppointmentStats from '../components/AppointmentStats';
+import SearchSelect from '../components/SearchSelect';
 import { FiPlus, FiSearch, FiFilter, FiGrid, FiList, FiCalendar, FiBarChart2, FiClock } from 'react-icons/fi';
 
+// Index rows returned by a batch lookup by id
+const byId = (rows) => Object.fromEntries(rows.map(row => [row.id, row]));
+
 const Appointments = ({ user }) => {
   const [appointments, setAppointments] = useState([]);
-  const [patients, setPatients] = useState([]);
-  const [doctors, setDoctors] = useState([]);
+  const [details, setDetails] = useState({ patients: {}, doctors: {} });
   const [filteredAppointments, setFilteredAppointments] = useState([]);
+  const [todayStats, setTodayStats] = useState(tally([]));
   const [loading, setLoading] = useState(true);
   const [showAddForm, setShowAddForm] = useState(false);
   const [editingAppointment, setEditingAppointment] = useState(null);
@@ -19,7 +24,10 @@ const Appointments = ({ user }) => {
   const [activeTab, setActiveTab] = useState('appointments'); // 'appointments', 'calendar', or 'stats'
   const [filterStatus, setFilterStatus] = useState('all');
   const [filterDate, setFilterDate] = useState('');
+  const [filterDoctor, setFilterDoctor] = useState(null);
   const [error, setError] = useState('');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const statusOptions = [
     { value: 'all', label: 'All Status' },
@@ -31,53 +39,68 @@ const Appointments = ({ user }) => {
 
   useEffect(() => {
     fetchData();
-  }, []);
+  }, [filterStatus, filterDate, filterDoctor]);
 
   useEffect(() => {
-    // Filter appointments based on search term, status, and date
+    // Status, date and doctor are filtered by the server; the search box narrows the loaded pages
     let filtered = appointments;
     
     if (searchTerm) {
-      filtered = filtered.filter(apt => {
-        const patient = patients.find(p => p.id === apt.patient_id);
-        const doctor = doctors.find(d => d.id === apt.doctor_id);
-        
-        return (
-          apt.reason?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-          apt.notes?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-          (patient && `${patient.first_name} ${patient.last_name}`.toLowerCase().includes(searchTerm.toLowerCase())) ||
-          (doctor && `Dr. ${doctor.first_name} ${doctor.last_name}`.toLowerCase().includes(searchTerm.toLowerCase()))
-        );
-      });
+      const term = searchTerm.toLowerCase();
+      filtered = filtered.filter(apt =>
+        apt.reason?.toLowerCase().includes(term) ||
+        apt.notes?.toLowerCase().includes(term) ||
+        apt.patient_name?.toLowerCase().includes(term) ||
+        `Dr. ${apt.doctor_name}`.toLowerCase().includes(term)
+      );
     }
 
-    if (filterStatus !== 'all') {
-      filtered = filtered.filter(apt => apt.status === filterStatus);
-    }
+    setFilteredAppointments(filtered);
+  }, [searchTerm, appointments]);
 
+  // Newest first, one page at a time
+  const listParams = () => {
+    const params = { order: 'desc' };
+    if (filterStatus !== 'all') params.status = filterStatus;
     if (filterDate) {
-      filtered = filtered.filter(apt => 
-        apt.appointment_date.startsWith(filterDate)
-      );
+      params.from = filterDate;
+      params.to = localDate(addDays(new Date(`${filterDate}T00:00`), 1));
     }
+    if (filterDoctor) params.doctor_id = filterDoctor.id;
+    return params;
+  };
 
-    // Sort by date and time
-    filtered.sort((a, b) => new Date(b.appointment_date) - new Date(a.appointment_date));
-
-    setFilteredAppointments(filtered);
-  }, [searchTerm, filterStatus, filterDate, appointments, patients, doctors]);
+  // Phones and specializations for the cards, one batch lookup per page
+  const fetchDetails = async (page) => {
+    if (page.length === 0) return;
+    try {
+      const [patients, doctors] = await Promise.all([
+        patientsAPI.getByIds([...new Set(page.map(apt => apt.patient_id))]),
+        doctorsAPI.getByIds([...new Set(page.map(apt => apt.doctor_id))])
+      ]);
+      setDetails(prev => ({
+        patients: { ...prev.patients, ...byId(patients.data) },
+        doctors: { ...prev.doctors, ...byId(doctors.data) }
+      }));
+    } catch (error) {
+      console.error('Error fetching appointment details:', error);
+    }
+  };
 
   const fetchData = async () => {
     try {
-      const [appointmentsResponse, patientsResponse, doctorsResponse] = await Promise.all([
-        api.get('/appointments'),
-        api.get('/patients'),
-        api.get('/doctors')
+      const today = new Date();
+      const [response, todayCounts] = await Promise.all([
+        appointmentsAPI.getAll(listParams()),
+        analyticsAPI.getAppointments({
+          bucket: 'day', group_by: 'status', from: localDate(today), to: localDate(addDays(today, 1))
+        })
       ]);
 
-      setAppointments(appointmentsResponse.data);
-      setPatients(patientsResponse.data);
-      setDoctors(doctorsResponse.data);
+      setAppointments(response.data);
+      setNextCursor(response.headers['x-next-cursor'] || null);
+      setTodayStats(tally(todayCounts.data.series));
+      fetchDetails(response.data);
     } catch (error) {
       console.error('Error fetching data:', error);
       setError('Failed to fetch appointment data');
@@ -86,6 +109,20 @@ const Appointments = ({ user }) => {
     }
   };
 
+  const loadMoreAppointments = async () => {
+    setLoadingMore(true);
+    try {
+      const response = await appointmentsAPI.getAll({ ...listParams(), cursor: nextCursor });
+      setAppointments(prev => [...prev, ...response.data]);
+      setNextCursor(response.headers['x-next-cursor'] || null);
+      fetchDetails(response.data);
+    } catch (error) {
+      setError('Failed to fetch more appointments');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleSave = async (appointmentData) => {
     setError('');
     try {
@@ -144,7 +181,7 @@ const Appointments = ({ user }) => {
   };
 
   const handleDateSelect = (date) => {
-    setFilterDate(date.toISOString().split('T')[0]);
+    setFilterDate(localDate(date));
     setActiveTab('appointments');
   };
 
@@ -158,20 +195,6 @@ const Appointments = ({ user }) => {
     setError('');
   };
 
-  const getTodayStats = () => {
-    const today = new Date().toISOString().split('T')[0];
-    const todayAppointments = appointments.filter(apt => 
-      apt.appointment_date.startsWith(today)
-    );
-
-    return {
-      total: todayAppointments.length,
-      completed: todayAppointments.filter(apt => apt.status === 'completed').length,
-      scheduled: todayAppointments.filter(apt => apt.status === 'scheduled').length,
-      cancelled: todayAppointments.filter(apt => apt.status === 'cancelled').length
-    };
-  };
-
   if (loading) {
     return (
       <div className="flex items-center justify-center h-64">
@@ -183,8 +206,6 @@ const Appointments = ({ user }) => {
     );
   }
 
-  const todayStats = getTodayStats();
-
   return (
     <div className="space-y-6">
       {/* Header */}
@@ -288,6 +309,16 @@ const Appointments = ({ user }) => {
                   ))}
                 </select>
 
+                {/* Doctor Filter */}
+                <div className="sm:w-64">
+                  <SearchSelect
+                    type="doctor"
+                    value={filterDoctor?.id}
+                    placeholder="All doctors"
+                    onSelect={setFilterDoctor}
+                  />
+                </div>
+
                 {/* Date Filter */}
                 <input
                   type="date"
@@ -344,12 +375,12 @@ const Appointments = ({ user }) => {
               <FiCalendar className="w-16 h-16 mx-auto mb-4 text-gray-300" />
               <h3 className="text-xl font-semibold text-gray-900 mb-2">No appointments found</h3>
               <p className="text-gray-500 mb-6">
-                {searchTerm || filterStatus !== 'all' || filterDate
+                {searchTerm || filterStatus !== 'all' || filterDate || filterDoctor
                   ? 'Try adjusting your search or filter criteria'
                   : 'Get started by scheduling your first appointment'
                 }
               </p>
-              {!searchTerm && filterStatus === 'all' && !filterDate && (
+              {!searchTerm && filterStatus === 'all' && !filterDate && !filterDoctor && (
                 <button
                   onClick={() => setShowAddForm(true)}
                   className="inline-flex items-center px-6 py-3 bg-gradient-to-r from-indigo-600 to-purple-600 text-white rounded-lg hover:from-indigo-700 hover:to-purple-700 transition-all duration-200"
@@ -365,8 +396,8 @@ const Appointments = ({ user }) => {
                 <AppointmentCard
                   key={appointment.id}
                   appointment={appointment}
-                  patients={patients}
-                  doctors={doctors}
+                  patient={details.patients[appointment.patient_id]}
+                  doctor={details.doctors[appointment.doctor_id]}
                   onEdit={handleEdit}
                   onDelete={handleDelete}
                   onComplete={handleComplete}
@@ -376,27 +407,36 @@ const Appointments = ({ user }) => {
               ))}
             </div>
           )}
+
+          {nextCursor && (
+            <div className="text-center">
+              <button
+                onClick={loadMoreAppointments}
+                disabled={loadingMore}
+                className="px-6 py-3 bg-white border border-gray-300 text-gray-700 rounded-lg hover:bg-gray-50 transition-colors disabled:opacity-50"
+              >
+                {loadingMore ? 'Loading...' : 'Load more appointments'}
+              </button>
+            </div>
+          )}
         </>
       )}
 
       {activeTab === 'calendar' && (
         <AppointmentCalendar
-          appointments={appointments}
           onDateSelect={handleDateSelect}
           onAppointmentClick={handleAppointmentClick}
         />
       )}
 
       {activeTab === 'stats' && (
-        <AppointmentStats appointments={appointments} />
+        <AppointmentStats />
       )}
 
       {/* Appointment Form Modal */}
       {showAddForm && (
         <AppointmentForm
           appointment={editingAppointment}
-          patients={patients}
-          doctors={doctors}
           onSave={handleSave}
           onCancel={resetForm}
           loading={loading}
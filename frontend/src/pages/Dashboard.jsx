@@ -1,10 +1,13 @@
 import React, { useState, useEffect } from 'react';
-import api from '../services/api';
+import api, { appointmentsAPI } from '../services/api';
 import DashboardCards from '../components/DashboardCards';
 import AppointmentTable from '../components/AppointmentTable';
 import { AppointmentChart, PatientGrowthChart, DepartmentStats } from '../components/Charts';
 import { FiActivity, FiTrendingUp, FiUsers, FiCalendar } from 'react-icons/fi';
 
+// Coalesces a burst of events, such as an import, into one reload
+const REFRESH_DELAY_MS = 1000;
+
 const Dashboard = ({ user }) => {
   const [stats, setStats] = useState({
     totalPatients: 0,
@@ -17,33 +20,36 @@ const Dashboard = ({ user }) => {
 
   useEffect(() => {
     fetchDashboardData();
+
+    // Refresh when appointments change instead of polling
+    let timer;
+    const refresh = () => {
+      clearTimeout(timer);
+      timer = setTimeout(fetchDashboardData, REFRESH_DELAY_MS);
+    };
+    const events = appointmentsAPI.stream();
+    ['appointment.changed', 'appointment.deleted'].forEach(name => events.addEventListener(name, refresh));
+    return () => {
+      clearTimeout(timer);
+      events.close();
+    };
   }, []);
 
   const fetchDashboardData = async () => {
     try {
-      const [patientsResponse, doctorsResponse, appointmentsResponse] = await Promise.all([
-        api.get('/patients'),
-        api.get('/doctors'),
-        api.get('/appointments')
+      const [statsResponse, appointmentsResponse] = await Promise.all([
+        api.get('/stats/dashboard'),
+        api.get('/appointments', { params: { order: 'desc', limit: 8 } })
       ]);
 
-      const patients = patientsResponse.data;
-      const doctors = doctorsResponse.data;
+      const dashboardStats = statsResponse.data;
       const appointments = appointmentsResponse.data;
 
-      const today = new Date().toISOString().split('T')[0];
-      const todayAppointments = appointments.filter(apt => 
-        apt.appointment_date.startsWith(today)
-      );
-      const pendingAppointments = appointments.filter(apt => 
-        apt.status === 'scheduled'
-      );
-
       setStats({
-        totalPatients: patients.length,
-        totalDoctors: doctors.length,
-        todayAppointments: todayAppointments.length,
-        pendingAppointments: pendingAppointments.length
+        totalPatients: dashboardStats.total_patients,
+        totalDoctors: dashboardStats.total_doctors,
+        todayAppointments: dashboardStats.today_appointments,
+        pendingAppointments: dashboardStats.pending_appointments
       });
 
       // Get recent appointments with priority
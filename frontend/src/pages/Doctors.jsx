@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import api from '../services/api';
+import api, { doctorsAPI } from '../services/api';
 import DoctorCard from '../components/DoctorCard';
 import DoctorForm from '../components/DoctorForm';
 import DoctorSchedule from '../components/DoctorSchedule';
@@ -18,6 +18,8 @@ const Doctors = ({ user }) => {
   const [activeTab, setActiveTab] = useState('doctors'); // 'doctors' or 'stats'
   const [filterSpecialization, setFilterSpecialization] = useState('');
   const [error, setError] = useState('');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const specializations = [
     'All Specializations',
@@ -41,10 +43,10 @@ const Doctors = ({ user }) => {
 
   useEffect(() => {
     fetchDoctors();
-  }, []);
+  }, [filterSpecialization]);
 
   useEffect(() => {
-    // Filter doctors based on search term and specialization
+    // Specialization is filtered by the server; the search box narrows the loaded pages
     let filtered = doctors;
     
     if (searchTerm) {
@@ -57,20 +59,21 @@ const Doctors = ({ user }) => {
       );
     }
 
-    if (filterSpecialization && filterSpecialization !== 'All Specializations') {
-      filtered = filtered.filter(doctor => 
-        doctor.specialization === filterSpecialization
-      );
-    }
-
     setFilteredDoctors(filtered);
-  }, [searchTerm, filterSpecialization, doctors]);
+  }, [searchTerm, doctors]);
+
+  const listParams = () => (
+    filterSpecialization && filterSpecialization !== 'All Specializations'
+      ? { specialization: filterSpecialization }
+      : {}
+  );
 
   const fetchDoctors = async () => {
     try {
-      const response = await api.get('/doctors');
+      const response = await doctorsAPI.getAll(listParams());
       setDoctors(response.data);
       setFilteredDoctors(response.data);
+      setNextCursor(response.headers['x-next-cursor'] || null);
     } catch (error) {
       console.error('Error fetching doctors:', error);
       setError('Failed to fetch doctors');
@@ -79,6 +82,19 @@ const Doctors = ({ user }) => {
     }
   };
 
+  const loadMoreDoctors = async () => {
+    setLoadingMore(true);
+    try {
+      const response = await doctorsAPI.getAll({ ...listParams(), cursor: nextCursor });
+      setDoctors(prev => [...prev, ...response.data]);
+      setNextCursor(response.headers['x-next-cursor'] || null);
+    } catch (error) {
+      setError('Failed to fetch more doctors');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleSave = async (doctorData) => {
     setError('');
     try {
@@ -309,6 +325,18 @@ const Doctors = ({ user }) => {
               ))}
             </div>
           )}
+
+          {nextCursor && (
+            <div className="text-center">
+              <button
+                onClick={loadMoreDoctors}
+                disabled={loadingMore}
+                className="px-6 py-3 bg-white border border-gray-300 text-gray-700 rounded-lg hover:bg-gray-50 transition-colors disabled:opacity-50"
+              >
+                {loadingMore ? 'Loading...' : 'Load more doctors'}
+              </button>
+            </div>
+          )}
         </>
       ) : (
         <DoctorStats doctors={doctors} />
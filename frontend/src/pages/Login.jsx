@@ -47,11 +47,11 @@ const Login = ({ onLogin }) => {
           password: formData.password
         });
         
-        onLogin(loginResponse.data, 'dummy-token'); // In real app, use actual token
+        onLogin(loginResponse.data, loginResponse.data.token);
         return;
       }
 
-      onLogin(response.data, 'dummy-token'); // In real app, use actual token
+      onLogin(response.data, response.data.token);
     } catch (err) {
       setError(err.response?.data?.error || 'An error occurred');
     } finally {
@@ -187,7 +187,6 @@ const Login = ({ onLogin }) => {
                 >
                   <option value="patient">Patient</option>
                   <option value="doctor">Doctor</option>
-                  <option value="admin">Admin</option>
                 </select>
               </div>
             )}
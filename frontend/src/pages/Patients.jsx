@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import api from '../services/api';
+import api, { patientsAPI } from '../services/api';
 import PatientCard from '../components/PatientCard';
 import PatientForm from '../components/PatientForm';
 import { FiPlus, FiSearch, FiFilter, FiGrid, FiList, FiUsers } from 'react-icons/fi';
@@ -13,6 +13,8 @@ const Patients = ({ user }) => {
   const [searchTerm, setSearchTerm] = useState('');
   const [viewMode, setViewMode] = useState('grid'); // 'grid' or 'list'
   const [error, setError] = useState('');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchPatients();
@@ -31,9 +33,10 @@ const Patients = ({ user }) => {
 
   const fetchPatients = async () => {
     try {
-      const response = await api.get('/patients');
+      const response = await patientsAPI.getAll();
       setPatients(response.data);
       setFilteredPatients(response.data);
+      setNextCursor(response.headers['x-next-cursor'] || null);
     } catch (error) {
       console.error('Error fetching patients:', error);
       setError('Failed to fetch patients');
@@ -42,6 +45,19 @@ const Patients = ({ user }) => {
     }
   };
 
+  const loadMorePatients = async () => {
+    setLoadingMore(true);
+    try {
+      const response = await patientsAPI.getAll({ cursor: nextCursor });
+      setPatients(prev => [...prev, ...response.data]);
+      setNextCursor(response.headers['x-next-cursor'] || null);
+    } catch (error) {
+      setError('Failed to fetch more patients');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleSave = async (patientData) => {
     setError('');
     try {
@@ -215,6 +231,18 @@ const Patients = ({ user }) => {
         </div>
       )}
 
+      {nextCursor && (
+        <div className="text-center">
+          <button
+            onClick={loadMorePatients}
+            disabled={loadingMore}
+            className="px-6 py-3 bg-white border border-gray-300 text-gray-700 rounded-lg hover:bg-gray-50 transition-colors disabled:opacity-50"
+          >
+            {loadingMore ? 'Loading...' : 'Load more patients'}
+          </button>
+        </div>
+      )}
+
       {/* Patient Form Modal */}
       {showAddForm && (
         <PatientForm
@@ -0,0 +1,26 @@
+// Helpers for the server-side counts returned by /api/analytics/appointments
+
+// YYYY-MM-DD in local time, the form the analytics and list filters take
+export const localDate = (date) => {
+  const month = String(date.getMonth() + 1).padStart(2, '0');
+  const day = String(date.getDate()).padStart(2, '0');
+  return `${date.getFullYear()}-${month}-${day}`;
+};
+
+export const addDays = (date, days) => {
+  const result = new Date(date);
+  result.setDate(result.getDate() + days);
+  return result;
+};
+
+// Sum { period, status, count } rows matching a predicate, per status and in total
+export const tally = (rows, predicate = () => true) => {
+  const counts = { total: 0, scheduled: 0, completed: 0, cancelled: 0 };
+  rows.filter(predicate).forEach(row => {
+    counts.total += row.count;
+    if (row.status in counts) counts[row.status] += row.count;
+  });
+  return counts;
+};
+
+export const percentage = (part, total) => (total > 0 ? ((part / total) * 100).toFixed(1) : 0);
@@ -48,8 +48,11 @@ export const authAPI = {
 
 // Patients API calls
 export const patientsAPI = {
-  getAll: () => api.get('/patients'),
+  // One page; pass the previous response's X-Next-Cursor header as params.cursor for the next
+  getAll: (params) => api.get('/patients', { params }),
   getById: (id) => api.get(`/patients/${id}`),
+  getByIds: (ids) => api.get('/patients/batch', { params: { ids: ids.join(',') } }),
+  getChart: (id, params) => api.get(`/patients/${id}/chart`, { params }),
   create: (patientData) => api.post('/patients', patientData),
   update: (id, patientData) => api.put(`/patients/${id}`, patientData),
   delete: (id) => api.delete(`/patients/${id}`),
@@ -57,22 +60,48 @@ export const patientsAPI = {
 
 // Doctors API calls
 export const doctorsAPI = {
-  getAll: () => api.get('/doctors'),
+  // One page, filtered by params.specialization; follow X-Next-Cursor as for patients
+  getAll: (params) => api.get('/doctors', { params }),
   getById: (id) => api.get(`/doctors/${id}`),
+  getByIds: (ids) => api.get('/doctors/batch', { params: { ids: ids.join(',') } }),
   create: (doctorData) => api.post('/doctors', doctorData),
   update: (id, doctorData) => api.put(`/doctors/${id}`, doctorData),
   delete: (id) => api.delete(`/doctors/${id}`),
+  getFreeSlots: (id, params) => api.get(`/doctors/${id}/free-slots`, { params }),
 };
 
 // Appointments API calls
 export const appointmentsAPI = {
-  getAll: () => api.get('/appointments'),
+  // One page, filtered by params.status, doctor_id, patient_id, from and to; follow X-Next-Cursor as for patients
+  getAll: (params) => api.get('/appointments', { params }),
   getById: (id) => api.get(`/appointments/${id}`),
+  getByIds: (ids) => api.get('/appointments/batch', { params: { ids: ids.join(',') } }),
   create: (appointmentData) => api.post('/appointments', appointmentData),
   update: (id, appointmentData) => api.put(`/appointments/${id}`, appointmentData),
   delete: (id) => api.delete(`/appointments/${id}`),
+  // { updates: [{ id, ...fields }], deletes: [ids] } or { filter, set | delete }
+  bulk: (changes) => api.post('/appointments/bulk', changes),
   getByPatient: (patientId) => api.get(`/appointments/patient/${patientId}`),
   getByDoctor: (doctorId) => api.get(`/appointments/doctor/${doctorId}`),
+  // Server-sent appointment.changed/deleted events, tailed from the database by the server
+  stream: () => new EventSource(`${API_BASE_URL}/appointments/stream`),
+};
+
+// Statistics API calls
+export const statsAPI = {
+  getDashboard: () => api.get('/stats/dashboard'),
+  getPatients: () => api.get('/stats/patients'),
+};
+
+// Analytics API calls
+export const analyticsAPI = {
+  getAppointments: (params) => api.get('/analytics/appointments', { params }),
+};
+
+// Search API calls
+export const searchAPI = {
+  // Ranked prefix search over names, phones and specializations; type is 'patient' or 'doctor'
+  search: (q, type, limit = 10) => api.get('/search', { params: { q, type, limit } }),
 };
 
 // Export the default api instance for direct usage